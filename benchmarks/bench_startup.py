@@ -0,0 +1,91 @@
+"""Import-time and cold-start benchmarks.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py [--repeat 20] [--max-import-ms 50]
+
+Every measurement runs in a fresh interpreter, so nothing is cached
+between samples. ``--max-import-ms`` makes the script exit with status 1
+when the median ``import meteostat`` time exceeds the budget, which
+keeps startup regressions visible as features are added."""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('requests', 'csv', 'json', 'gzip', 'numpy', 'pandas', 'pyarrow')
+
+def _run(args:list) -> float:
+    """Runs a fresh interpreter and returns its wall time in ms."""
+
+    start = time.perf_counter()
+
+    subprocess.run([sys.executable] + args, cwd=ROOT, check=True,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    return (time.perf_counter() - start) * 1000
+
+def _import_time() -> float:
+    """Cumulative ``-X importtime`` of the meteostat package in ms."""
+
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import meteostat'],
+        cwd=ROOT, check=True, capture_output=True, text=True)
+
+    for line in result.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \| meteostat$', line)
+
+        if match:
+            return int(match.group(1)) / 1000
+
+    raise RuntimeError('meteostat not found in -X importtime output')
+
+def _loaded_heavy_modules() -> list:
+    """Heavy modules pulled in by ``import meteostat``."""
+
+    code = 'import sys, meteostat; print(" ".join(sorted(sys.modules)))'
+
+    result = subprocess.run([sys.executable, '-c', code],
+        cwd=ROOT, check=True, capture_output=True, text=True)
+
+    loaded = set(result.stdout.split())
+
+    return [ name for name in HEAVY_MODULES if name in loaded ]
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--max-import-ms', type=float, default=None)
+
+    args = parser.parse_args()
+
+    samples = {
+        'interpreter (python -c pass)': [ _run(['-c', 'pass']) for _ in range(args.repeat) ],
+        'cold start (import meteostat)': [ _run(['-c', 'import meteostat']) for _ in range(args.repeat) ],
+        'cli (python -m meteostat --help)': [ _run(['-m', 'meteostat', '--help']) for _ in range(args.repeat) ],
+        'import time (-X importtime)': [ _import_time() for _ in range(args.repeat) ]
+    }
+
+    for name, values in samples.items():
+        print('{:<36} median {:8.2f} ms   min {:8.2f} ms'.format(
+            name, statistics.median(values), min(values)))
+
+    print('heavy modules loaded on import: {}'.format(', '.join(_loaded_heavy_modules()) or 'none'))
+
+    median = statistics.median(samples['import time (-X importtime)'])
+
+    if args.max_import_ms is not None and median > args.max_import_ms:
+        print('import meteostat takes {:.2f} ms, budget is {:.2f} ms'.format(median, args.max_import_ms))
+
+        return 1
+
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -24,5 +24,25 @@
 """Meteostat API client for Python"""
 
 from meteostat.meteostat2 import *
+from meteostat.matrix import *
+from meteostat.catalog import *
+from meteostat.columnar import *
+from meteostat.prefetch import *
+from meteostat.query import *
+from meteostat.geo import *
+from meteostat.sharding import *
+from meteostat.metrics import *
+from meteostat.concurrency import *
+from meteostat.pipeline import *
+from meteostat.memory import *
+from meteostat.offsets import *
+from meteostat.summary import *
+from meteostat.storage import *
+from meteostat.parquet import *
+from meteostat.follow import *
+from meteostat.compression import *
+from meteostat.sources import *
+from meteostat.diff import *
+from meteostat.compact import *
 
 __version__="0.0.1"
@@ -26,15 +26,131 @@
 import argparse
 import sys
 
-import json
-import csv
+AVAILABLE_CMDS = ['stations', 'data', 'all', 'diff', 'mirror']
 
-import meteostat2
+def _open_output(args):
+    """Text output of a command: the output file or stdout, compressed in
+    parallel blocks when asked to or when the file name ends in .gz or
+    .zst."""
 
-AVAILABLE_CMDS = ['data']
+    import contextlib
+
+    from meteostat.compression import CompressedWriter, get_codec
+
+    output = args.output
+
+    codec = getattr(args, 'compress', None) or get_codec(output)
+
+    if codec is not None:
+        return CompressedWriter(output if output else sys.stdout.buffer, codec=codec,
+            level=getattr(args, 'level', None), threads=getattr(args, 'threads', None))
+
+    if output is None:
+        # stdout, left open on exit.
+        return contextlib.nullcontext(sys.stdout)
+
+    return open(output, 'w', encoding='utf-8', newline='')
+
+def _write(data, args) -> None:
+    """Writes csv text or json data to the output of a command."""
+
+    if not isinstance(data, str):
+        import json
+
+        data = json.dumps(data)
+
+    with _open_output(args) as file:
+        file.write(data)
+
+        if args.output is None:
+            file.write('\n')
+
+def _stations(args) -> None:
+    """Runs the stations command."""
+
+    from meteostat import meteostat2
+
+    if args.lite:
+        data = meteostat2.get_stations_lite()
+    else:
+        data = meteostat2.get_stations_full()
+
+    _write(data, args)
+
+def _data(args) -> None:
+    """Runs the data command."""
+
+    from meteostat import meteostat2
+
+    if args.granularity == 'normals':
+        name = 'get_normals_station'
+    else:
+        name = 'get_{}_{}_station'.format(args.granularity, args.variant)
+
+    data = getattr(meteostat2, name)(station=args.station, format=args.format)
+
+    _write(data, args)
+
+def _all(args) -> None:
+    """Runs the all command."""
+
+    from meteostat import meteostat2
+
+    if args.granularity == 'normals':
+        name = 'get_normals_all_stations'
+    else:
+        name = 'get_{}_{}_all_stations'.format(args.granularity, args.variant)
+
+    data = getattr(meteostat2, name)(format='csv', memory_limit=args.memory_limit,
+        shard_index=args.shard_index, shard_count=args.shard_count, balance=args.balance)
+
+    if isinstance(data, meteostat2.SpooledResult):
+        with data, _open_output(args) as file:
+            for chunk in data.iter_chunks():
+                file.write(chunk)
+
+        return
+
+    _write(data, args)
+
+def _diff(args) -> None:
+    """Runs the diff command."""
+
+    from pathlib import Path
+
+    from meteostat.diff import diff_snapshots
+
+    data = diff_snapshots(Path(args.old), Path(args.new), granularity=args.granularity, variant=args.variant,
+        station=args.station, format=args.format)
+
+    _write(data, args)
+
+def _mirror(args) -> None:
+    """Runs the mirror command."""
+
+    from meteostat.mirror import MirrorServer
+
+    server = MirrorServer(cache_dir=args.cache_dir, host=args.host, port=args.port,
+        max_age=args.max_age, quiet=args.quiet)
+
+    print(server)
+
+    try:
+        server.serve_forever()
+
+    except KeyboardInterrupt:
+        pass
+
+def _add_compression_arguments(parser:argparse.ArgumentParser) -> None:
+
+    parser.add_argument('--compress', choices=['gzip', 'zstd'], default=None,
+        help='compress the output, implied by a .gz or .zst output file')
+    parser.add_argument('--level', type=int, default=None, help='compression level')
+    parser.add_argument('--threads', type=int, default=None, help='compressing threads, default one per CPU')
+
+def _get_parser() -> argparse.ArgumentParser:
+    """Builds the command line parser."""
 
-def main():
-    
     parser = argparse.ArgumentParser(
         prog=sys.argv[0],
         description="""
@@ -60,7 +176,78 @@ def main():
         """,
         argument_default=None)
 
+    commands = parser.add_subparsers(dest='command', metavar='{}'.format('|'.join(AVAILABLE_CMDS)))
+
+    stations = commands.add_parser('stations', help='get the list of stations')
+    stations.add_argument('--lite', action='store_true', help='use the lite station list')
+    stations.add_argument('-o', '--output', help='output file, default stdout')
+    _add_compression_arguments(stations)
+    stations.set_defaults(func=_stations)
+
+    data = commands.add_parser('data', help='get data for a station')
+    data.add_argument('station', help='the station identifier')
+    data.add_argument('-g', '--granularity', default='hourly', choices=['hourly', 'daily', 'monthly', 'normals'])
+    data.add_argument('-v', '--variant', default='full', choices=['full', 'obs'])
+    data.add_argument('-f', '--format', default='csv', choices=['csv', 'json'])
+    data.add_argument('-o', '--output', help='output file, default stdout')
+    _add_compression_arguments(data)
+    data.set_defaults(func=_data)
+
+    every = commands.add_parser('all', help='get csv data for all the stations, or one shard of them')
+    every.add_argument('-g', '--granularity', default='hourly', choices=['hourly', 'daily', 'monthly', 'normals'])
+    every.add_argument('-v', '--variant', default='full', choices=['full', 'obs'])
+    every.add_argument('--shard-index', type=int, default=None, help='this shard, 0 based')
+    every.add_argument('--shard-count', type=int, default=None, help='the number of shards')
+    every.add_argument('--balance', action='store_true', help='balance shards by expected file size')
+    every.add_argument('--memory-limit', type=int, default=None, help='spill to disk above this many characters')
+    every.add_argument('-o', '--output', help='output file, default stdout')
+    _add_compression_arguments(every)
+    every.set_defaults(func=_all)
+
+    diff = commands.add_parser('diff', help='get the rows changed between two snapshots of a station file')
+    diff.add_argument('old', help='the previous .csv or .csv.gz file')
+    diff.add_argument('new', help='the current .csv or .csv.gz file')
+    diff.add_argument('-g', '--granularity', default='hourly', choices=['hourly', 'daily', 'monthly', 'normals'])
+    diff.add_argument('-v', '--variant', default='full', choices=['full', 'obs'])
+    diff.add_argument('-s', '--station', default=None, help='station id written in the id column')
+    diff.add_argument('-f', '--format', default='csv', choices=['csv', 'json'])
+    diff.add_argument('-o', '--output', help='output file, default stdout')
+    _add_compression_arguments(diff)
+    diff.set_defaults(func=_diff)
+
+    mirror = commands.add_parser('mirror', help='serve a local mirror of the bulk endpoint')
+    mirror.add_argument('cache_dir', help='the bulk cache directory')
+    mirror.add_argument('--host', default='0.0.0.0')
+    mirror.add_argument('--port', type=int, default=8080)
+    mirror.add_argument('--max-age', type=float, default=3600, help='seconds before a file is revalidated upstream')
+    mirror.add_argument('--quiet', action='store_true', help='do not log requests')
+    mirror.set_defaults(func=_mirror)
+
+    return parser
+
+def main(argv:list = None) -> int:
+
+    parser = _get_parser()
+
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        parser.print_help()
+
+        return 2
+
+    if args.command == 'all':
+        from meteostat.sharding import _check_shard
+
+        try:
+            _check_shard(args.shard_index, args.shard_count)
+
+        except ValueError as error:
+            parser.error(str(error))
+
+    args.func(args)
+
+    return 0
 
-        
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
@@ -0,0 +1,319 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Compact indexed station catalog"""
+
+__all__ = ['StationCatalog']
+
+import os
+import sys
+import math
+import struct
+from array import array
+
+from meteostat import meteostat2
+
+SNAPSHOT_MAGIC = b'MSCAT\x01'
+
+STRING_COLUMNS = ('id', 'name', 'country', 'region', 'national', 'wmo', 'icao', 'timezone',
+    'hourly_start', 'hourly_end', 'daily_start', 'daily_end',
+    'monthly_start', 'monthly_end', 'normals_start', 'normals_end')
+FLOAT_COLUMNS = ('latitude', 'longitude', 'elevation')
+
+INVENTORY = ('hourly', 'daily', 'monthly', 'normals')
+
+def _get(record:dict, *keys):
+    """Nested dict lookup, None when any level is missing."""
+
+    for key in keys:
+        if not isinstance(record, dict):
+            return None
+
+        record = record.get(key)
+
+    return record
+
+def _to_string(value) -> str:
+    return '' if value is None else str(value)
+
+def _to_float(value) -> float:
+    return math.nan if value is None else float(value)
+
+class StationCatalog(object):
+    """Struct-of-arrays view of the station network.
+
+    Every attribute is stored as one column (``catalog.latitude`` is an
+    ``array('d')``, ``catalog.id`` a tuple of str, ...), missing strings
+    are '' and missing numbers NaN. Lookups by id, WMO, ICAO and country
+    go through hash indexes built once."""
+
+    def __init__(self, columns:dict) -> None:
+
+        for name in STRING_COLUMNS:
+            setattr(self, name, tuple(columns[name]))
+
+        for name in FLOAT_COLUMNS:
+            setattr(self, name, array('d', columns[name]))
+
+        self._build_indexes()
+
+    def _build_indexes(self) -> None:
+        """Builds the id, WMO, ICAO and country hash indexes."""
+
+        self._by_id = { id: row for row, id in enumerate(self.id) }
+        self._by_wmo = { code: row for row, code in enumerate(self.wmo) if code }
+        self._by_icao = { code: row for row, code in enumerate(self.icao) if code }
+
+        self._by_country = {}
+
+        for row, country in enumerate(self.country):
+            self._by_country.setdefault(country, array('I')).append(row)
+
+    @classmethod
+    def from_stations(cls, stations:list) -> 'StationCatalog':
+        """Builds a catalog from get_stations_full() records."""
+
+        columns = { name: [] for name in STRING_COLUMNS + FLOAT_COLUMNS }
+
+        for record in stations:
+            columns['id'].append(_to_string(record.get('id')))
+            columns['name'].append(_to_string(_get(record, 'name', 'en')))
+            columns['country'].append(_to_string(record.get('country')))
+            columns['region'].append(_to_string(record.get('region')))
+            columns['timezone'].append(_to_string(record.get('timezone')))
+
+            for code in ('national', 'wmo', 'icao'):
+                columns[code].append(_to_string(_get(record, 'identifiers', code)))
+
+            for name in FLOAT_COLUMNS:
+                columns[name].append(_to_float(_get(record, 'location', name)))
+
+            for dataset in INVENTORY:
+                for bound in ('start', 'end'):
+                    columns['{}_{}'.format(dataset, bound)].append(
+                        _to_string(_get(record, 'inventory', dataset, bound)))
+
+        return cls(columns)
+
+    @classmethod
+    def fetch(cls, snapshot:str = None, max_age:float = 86400, **kwargs) -> 'StationCatalog':
+        """retrieves the catalog.
+
+        Parameters
+        ----------
+        snapshot: str
+            Path of a binary snapshot. When it exists, and is not older
+            than max_age, the catalog is loaded from it. Otherwise the
+            catalog is downloaded with get_stations_full() and saved
+            there. Default None, always download.
+
+        max_age: float
+            Seconds after which a snapshot is downloaded again. Default
+            one day, None keeps a snapshot forever. A stale snapshot is
+            still used when the download fails.
+
+        Returns
+        -------
+        StationCatalog
+            the station catalog."""
+
+        import time
+
+        exists = snapshot is not None and os.path.exists(snapshot)
+
+        if exists and (max_age is None or time.time() - os.path.getmtime(snapshot) <= max_age):
+            return cls.load(snapshot)
+
+        try:
+            catalog = cls.from_stations(meteostat2.get_stations_full(**kwargs))
+
+        except Exception as error:
+            if not exists:
+                raise
+
+            print('Using stale station catalog {}: {}'.format(snapshot, error))
+
+            return cls.load(snapshot)
+
+        if snapshot is not None:
+            catalog.save(snapshot)
+
+        return catalog
+
+    def save(self, filename:str) -> None:
+        """Writes a binary snapshot of the catalog.
+
+        Strings are stored as NUL separated utf-8 blobs and numbers as
+        raw little-endian doubles, so loading is a handful of bulk
+        copies instead of a json parse. The snapshot is written to a
+        unique temporary file first, concurrent writers never mix."""
+
+        import tempfile
+
+        descriptor, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)),
+            prefix=os.path.basename(filename) + '.', suffix='.tmp')
+
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(SNAPSHOT_MAGIC)
+                file.write(struct.pack('<I', len(self)))
+
+                for name in STRING_COLUMNS:
+                    blob = '\x00'.join(getattr(self, name)).encode('utf-8')
+
+                    file.write(struct.pack('<Q', len(blob)))
+                    file.write(blob)
+
+                for name in FLOAT_COLUMNS:
+                    values = array('d', getattr(self, name))
+
+                    if sys.byteorder != 'little':
+                        values.byteswap()
+
+                    file.write(values.tobytes())
+
+            os.replace(tmp, filename)
+
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+            raise
+
+    @classmethod
+    def load(cls, filename:str) -> 'StationCatalog':
+        """Reads a snapshot written by save()."""
+
+        with open(filename, 'rb') as file:
+            data = file.read()
+
+        if not data.startswith(SNAPSHOT_MAGIC):
+            raise ValueError('{} is not a station catalog snapshot'.format(filename))
+
+        offset = len(SNAPSHOT_MAGIC)
+
+        size, = struct.unpack_from('<I', data, offset)
+        offset += 4
+
+        columns = {}
+
+        for name in STRING_COLUMNS:
+            length, = struct.unpack_from('<Q', data, offset)
+            offset += 8
+
+            values = data[offset:offset + length].decode('utf-8').split('\x00')
+            offset += length
+
+            columns[name] = values if size else []
+
+        for name in FLOAT_COLUMNS:
+            values = array('d')
+            values.frombytes(data[offset:offset + size * 8])
+            offset += size * 8
+
+            if sys.byteorder != 'little':
+                values.byteswap()
+
+            columns[name] = values
+
+        return cls(columns)
+
+    def __len__(self) -> int:
+        return len(self.id)
+
+    def __contains__(self, id:str) -> bool:
+        return id in self._by_id
+
+    def __iter__(self):
+        return iter(self.id)
+
+    def __str__(self) -> str:
+        return "StationCatalog: {} stations, {} countries".format(
+            len(self), len(self._by_country)
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+    def index(self, id:str) -> int:
+        """Row of a station id, KeyError if unknown."""
+
+        return self._by_id[id]
+
+    def record(self, row:int) -> dict:
+        """Rebuilds the get_stations_full() style record of a row."""
+
+        def string(name):
+            return getattr(self, name)[row] or None
+
+        def number(name):
+            value = getattr(self, name)[row]
+
+            return None if math.isnan(value) else value
+
+        inventory = {}
+
+        for dataset in INVENTORY:
+            bounds = { bound: string('{}_{}'.format(dataset, bound)) for bound in ('start', 'end') }
+
+            if dataset in ('monthly', 'normals'):
+                bounds = { bound: None if value is None else int(value) for bound, value in bounds.items() }
+
+            inventory[dataset] = bounds
+
+        return {
+            'id': self.id[row],
+            'name': { 'en': string('name') },
+            'country': string('country'),
+            'region': string('region'),
+            'identifiers': { code: string(code) for code in ('national', 'wmo', 'icao') },
+            'location': { name: number(name) for name in FLOAT_COLUMNS },
+            'timezone': string('timezone'),
+            'inventory': inventory
+        }
+
+    def get(self, id:str) -> dict:
+        """Station record by id, None if unknown."""
+
+        row = self._by_id.get(id)
+
+        return None if row is None else self.record(row)
+
+    def by_wmo(self, code:str) -> dict:
+        """Station record by WMO code, None if unknown."""
+
+        row = self._by_wmo.get(code)
+
+        return None if row is None else self.record(row)
+
+    def by_icao(self, code:str) -> dict:
+        """Station record by ICAO code, None if unknown."""
+
+        row = self._by_icao.get(code)
+
+        return None if row is None else self.record(row)
+
+    def by_country(self, country:str) -> list:
+        """Station ids of a country (ISO 3166-1 alpha-2 code)."""
+
+        return [ self.id[row] for row in self._by_country.get(country, ()) ]
@@ -0,0 +1,260 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Typed column buffers and DataFrame / Arrow interop"""
+
+__all__ = ['ColumnBuffers', 'COLUMN_TYPES']
+
+import datetime
+from array import array
+
+# Storage type of every csv column, anything else is a float.
+#   category: one station string per result, not stored per row
+#   date:     days since 1970-01-01, array('i')
+#   int:      array('q')
+#   float:    array('d'), NaN when missing
+COLUMN_TYPES = {
+    'id': 'category',
+    'date': 'date',
+    'hour': 'int',
+    'year': 'int',
+    'month': 'int',
+    'start': 'int',
+    'end': 'int'
+}
+
+EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+NAN = float('nan')
+
+_TYPECODES = { 'date': 'i', 'int': 'q', 'float': 'd' }
+
+def get_column_type(name:str) -> str:
+    """Storage type of a csv column."""
+
+    return COLUMN_TYPES.get(name, 'float')
+
+class ColumnBuffers(object):
+    """Parsed station csv stored column by column.
+
+    ``values[name]`` is a flat ``array`` of the column and
+    ``validity[name]`` an Arrow style bitmap (bit i set, least
+    significant bit first, when row i is present). The id column is
+    not materialised, every row belongs to ``station``."""
+
+    def __init__(self, fieldnames:tuple, station:str = None) -> None:
+
+        self.fieldnames=tuple(fieldnames)
+        self.station=station
+        self.length=0
+        self.values={}
+        self.validity={}
+        self.null_counts={}
+
+        for name in self.fieldnames:
+            kind = get_column_type(name)
+
+            if kind == 'category':
+                continue
+
+            self.values[name] = array(_TYPECODES[kind])
+            self.validity[name] = bytearray()
+            self.null_counts[name] = 0
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __str__(self) -> str:
+        return "ColumnBuffers: {} rows of {} for station {}".format(
+            self.length, ",".join(self.fieldnames), self.station
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+def _parse_columns(data:str = None, fieldnames:tuple = None, station:str = None, **kwargs) -> ColumnBuffers:
+    """Parses raw station csv (without the id column) into typed column
+    buffers, one field at a time."""
+
+    buffers = ColumnBuffers(fieldnames, station=station)
+
+    columns = []
+
+    # Raw station files come without the id column.
+    for position, name in enumerate(fieldnames[1:]):
+        kind = get_column_type(name)
+
+        columns.append((position, kind, buffers.values[name], buffers.validity[name], name))
+
+    last_date = None
+    last_days = 0
+
+    nulls = { name: 0 for name in buffers.null_counts }
+
+    for row, line in enumerate(data.splitlines()):
+        fields = line.split(',')
+
+        bit = 1 << (row & 7)
+
+        if bit == 1:
+            for column in columns:
+                column[3].append(0)
+
+        for position, kind, values, validity, name in columns:
+            value = fields[position] if position < len(fields) else ''
+
+            if not value:
+                values.append(NAN if kind == 'float' else 0)
+
+                nulls[name] += 1
+
+                continue
+
+            validity[-1] |= bit
+
+            if kind == 'float':
+                values.append(float(value))
+
+            elif kind == 'int':
+                values.append(int(value))
+
+            else:
+                # Consecutive rows share the date, avoid re-parsing it.
+                if value != last_date:
+                    last_date = value
+                    last_days = datetime.date.fromisoformat(value).toordinal() - EPOCH
+
+                values.append(last_days)
+
+        buffers.length = row + 1
+
+    buffers.null_counts = nulls
+
+    return buffers
+
+def _to_numpy(values:array):
+    """Zero-copy numpy view of an array."""
+
+    import numpy
+
+    return numpy.frombuffer(values, dtype=values.typecode if values.typecode != 'q' else 'int64')
+
+def _to_mask(validity:bytearray, length:int):
+    """Boolean missing-value mask of an Arrow bitmap."""
+
+    import numpy
+
+    bits = numpy.unpackbits(numpy.frombuffer(bytes(validity), dtype='uint8'), count=length, bitorder='little')
+
+    return bits == 0
+
+def to_pandas(buffers:ColumnBuffers):
+    """Builds a pandas DataFrame over the column buffers.
+
+    Float columns are numpy views of the parsed buffers (NaN for gaps),
+    dates are datetime64, integer columns with gaps become nullable
+    Int64 and the station id is a single-category Categorical."""
+
+    try:
+        import numpy
+        import pandas
+
+    except ImportError:
+        raise ImportError("format='pandas' requires pandas, install meteostat2[pandas]")
+
+    columns = {}
+
+    for name in buffers.fieldnames:
+        kind = get_column_type(name)
+
+        if kind == 'category':
+            codes = numpy.zeros(buffers.length, dtype='int8')
+
+            columns[name] = pandas.Categorical.from_codes(codes, categories=[ buffers.station ])
+
+            continue
+
+        values = _to_numpy(buffers.values[name])
+
+        if kind == 'date':
+            # The only converted column, days to seconds in one pass.
+            columns[name] = (values.astype('int64') * 86400).view('datetime64[s]')
+
+        elif kind == 'int' and buffers.null_counts[name]:
+            columns[name] = pandas.arrays.IntegerArray(values, _to_mask(buffers.validity[name], buffers.length))
+
+        else:
+            columns[name] = values
+
+    return pandas.DataFrame(columns, copy=False)
+
+def to_arrow(buffers:ColumnBuffers):
+    """Builds a pyarrow Table straight over the column buffers.
+
+    Data buffers and validity bitmaps are handed to Arrow as they are,
+    without a copy. The station id is dictionary encoded."""
+
+    try:
+        import pyarrow
+
+    except ImportError:
+        raise ImportError("format='arrow' requires pyarrow, install meteostat2[arrow]")
+
+    types = { 'date': pyarrow.date32(), 'int': pyarrow.int64(), 'float': pyarrow.float64() }
+
+    columns = []
+
+    for name in buffers.fieldnames:
+        kind = get_column_type(name)
+
+        if kind == 'category':
+            indices = pyarrow.py_buffer(bytes(4 * buffers.length))
+
+            columns.append(pyarrow.DictionaryArray.from_arrays(
+                pyarrow.Array.from_buffers(pyarrow.int32(), buffers.length, [ None, indices ]),
+                pyarrow.array([ buffers.station ], type=pyarrow.string())
+            ))
+
+            continue
+
+        nulls = buffers.null_counts[name]
+
+        validity = pyarrow.py_buffer(buffers.validity[name]) if nulls else None
+
+        columns.append(pyarrow.Array.from_buffers(
+            types[kind], buffers.length,
+            [ validity, pyarrow.py_buffer(buffers.values[name]) ],
+            null_count=nulls
+        ))
+
+    return pyarrow.Table.from_arrays(columns, names=list(buffers.fieldnames))
+
+def _get_frame_from_csv(data:str = None, fieldnames:tuple = None, station:str = None, format:str = 'pandas', **kwargs):
+    """Parses raw station csv into a DataFrame or an Arrow table."""
+
+    buffers = _parse_columns(data=data, fieldnames=fieldnames, station=station)
+
+    if format == 'arrow':
+        return to_arrow(buffers)
+
+    return to_pandas(buffers)
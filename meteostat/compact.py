@@ -0,0 +1,437 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""Compact, dictionary encoded station data"""
+
+from __future__ import annotations
+
+__all__ = ['CompactTable', 'COCO_LABELS', 'get_coco_label']
+
+import datetime
+from array import array
+
+from meteostat.columnar import EPOCH, NAN, get_column_type
+
+# Weather condition codes of the coco column.
+COCO_LABELS = {
+    1: 'Clear', 2: 'Fair', 3: 'Cloudy', 4: 'Overcast', 5: 'Fog', 6: 'Freezing Fog',
+    7: 'Light Rain', 8: 'Rain', 9: 'Heavy Rain', 10: 'Freezing Rain', 11: 'Heavy Freezing Rain',
+    12: 'Sleet', 13: 'Heavy Sleet', 14: 'Light Snowfall', 15: 'Snowfall', 16: 'Heavy Snowfall',
+    17: 'Rain Shower', 18: 'Heavy Rain Shower', 19: 'Sleet Shower', 20: 'Heavy Sleet Shower',
+    21: 'Snow Shower', 22: 'Heavy Snow Shower', 23: 'Lightning', 24: 'Hail', 25: 'Thunderstorm',
+    26: 'Heavy Thunderstorm', 27: 'Storm'
+}
+
+# Columns with few distinct values, stored as codes into a dictionary.
+# Wind directions are reported in 10 degree bins, 37 values at most.
+DICTIONARY_COLUMNS = {
+    'id': str,
+    'coco': int,
+    'wdir': float
+}
+
+#   dictionary: array('B'), widened to 'H' and 'I' as the dictionary grows
+#   date:       days since 1970-01-01, array('i')
+#   int:        array('h')
+#   float:      array('d'), NaN when missing
+_TYPECODES = { 'date': 'i', 'int': 'h', 'float': 'd' }
+
+_WIDER = { 'B': ('H', 1 << 16), 'H': ('I', 1 << 32) }
+
+def get_coco_label(code) -> str:
+    """Label of a weather condition code, None when unknown or missing."""
+
+    if code is None or code != code:
+        return None
+
+    return COCO_LABELS.get(int(code))
+
+def _get_kind(name:str) -> str:
+
+    if name in DICTIONARY_COLUMNS:
+        return 'dictionary'
+
+    return get_column_type(name)
+
+def _decode(name:str, value:str):
+    """Typed dictionary entry of a raw field."""
+
+    kind = DICTIONARY_COLUMNS[name]
+
+    if kind is int:
+        return int(float(value))
+
+    return kind(value)
+
+class CompactTable(object):
+    """Station data of one or many stations, column by column.
+
+    id, coco and wdir are dictionary encoded: ``codes[name]`` holds one
+    small integer per row into ``dictionaries[name]``, so a station id
+    costs a byte per row instead of a string. Other columns are typed
+    arrays as in ColumnBuffers. Every column has an Arrow style
+    ``validity`` bitmap (bit i set, least significant bit first, when
+    row i is present), missing values are None once decoded.
+
+    Parameters
+    ----------
+    fieldnames: tuple
+        The columns, id first as in the csv headers."""
+
+    def __init__(self, fieldnames:tuple) -> None:
+
+        self.fieldnames=tuple(fieldnames)
+        self.length=0
+        self.values={}
+        self.codes={}
+        self.dictionaries={}
+        self.validity={}
+        self.null_counts={}
+
+        # Raw field to code and decoded value to code, per dictionary
+        # column.
+        self._lookup={}
+        self._index={}
+
+        for name in self.fieldnames:
+            kind = _get_kind(name)
+
+            if kind == 'dictionary':
+                self.codes[name] = array('B')
+                self.dictionaries[name] = []
+                self._lookup[name] = {}
+                self._index[name] = {}
+            else:
+                self.values[name] = array(_TYPECODES[kind])
+
+            self.validity[name] = bytearray()
+            self.null_counts[name] = 0
+
+    def _get_code(self, name:str, value:str) -> int:
+        """Code of a raw field, added to the dictionary when new."""
+
+        lookup = self._lookup[name]
+
+        code = lookup.get(value)
+
+        if code is None:
+            entry = _decode(name, value)
+
+            index = self._index[name]
+
+            # '10' and '10.0' share an entry.
+            code = index.get(entry)
+
+            if code is None:
+                dictionary = self.dictionaries[name]
+
+                code = index[entry] = len(dictionary)
+
+                dictionary.append(entry)
+
+                codes = self.codes[name]
+
+                if codes.typecode in _WIDER and code >= (1 << (8 * codes.itemsize)):
+                    self.codes[name] = array(_WIDER[codes.typecode][0], codes)
+
+            lookup[value] = code
+
+        return code
+
+    def append(self, data:str = None, station:str = None) -> CompactTable:
+        """Appends raw csv rows.
+
+        Parameters
+        ----------
+        data: str
+            csv rows without a header. Rows of a raw station file come
+            without the id column, pass its station. Rows with the id
+            column, as in all-stations results, need no station.
+
+        station: str
+            The station of every row. Default None, read from the rows.
+
+        Returns
+        -------
+        CompactTable
+            the table itself."""
+
+        if not data:
+            return self
+
+        # Raw station rows start at the second column.
+        names = self.fieldnames[1:] if station is not None else self.fieldnames
+
+        if station is not None:
+            id_code = self._get_code(self.fieldnames[0], station)
+
+        nulls = self.null_counts
+
+        last_date = None
+        last_days = 0
+
+        row = self.length
+
+        for line in data.splitlines():
+            if not line:
+                continue
+
+            fields = line.split(',')
+
+            bit = 1 << (row & 7)
+
+            if bit == 1:
+                for validity in self.validity.values():
+                    validity.append(0)
+
+            if station is not None:
+                self.codes[self.fieldnames[0]].append(id_code)
+                self.validity[self.fieldnames[0]][-1] |= bit
+
+            for position, name in enumerate(names):
+                value = fields[position] if position < len(fields) else ''
+
+                values = self.values.get(name)
+
+                if not value:
+                    if values is None:
+                        self.codes[name].append(0)
+                    else:
+                        values.append(NAN if values.typecode == 'd' else 0)
+
+                    nulls[name] += 1
+
+                    continue
+
+                self.validity[name][-1] |= bit
+
+                if values is None:
+                    code = self._get_code(name, value)
+
+                    self.codes[name].append(code)
+
+                elif values.typecode == 'd':
+                    values.append(float(value))
+
+                elif values.typecode == 'h':
+                    values.append(int(value))
+
+                else:
+                    # Consecutive rows share the date, avoid re-parsing it.
+                    if value != last_date:
+                        last_date = value
+                        last_days = datetime.date.fromisoformat(value).toordinal() - EPOCH
+
+                    values.append(last_days)
+
+            row += 1
+
+        self.length = row
+
+        return self
+
+    def extend(self, other:CompactTable) -> CompactTable:
+        """Appends the rows of another table with the same columns, e.g.
+        results of several stations."""
+
+        if other.fieldnames != self.fieldnames:
+            raise ValueError('Tables with different columns')
+
+        row = self.length
+
+        for name in self.fieldnames:
+            if name in self.codes:
+                # Codes are local to their dictionary.
+                mapping = [ self._get_code(name, str(entry)) for entry in other.dictionaries[name] ]
+
+                codes = self.codes[name]
+
+                codes.extend(mapping[code] if mapping else 0 for code in other.codes[name])
+            else:
+                self.values[name].extend(other.values[name])
+
+            self.null_counts[name] += other.null_counts[name]
+
+        validity = { name: other.validity[name] for name in self.fieldnames }
+
+        for position in range(other.length):
+            target = row + position
+
+            if target & 7 == 0:
+                for bitmap in self.validity.values():
+                    bitmap.append(0)
+
+            for name, bitmap in validity.items():
+                if bitmap[position >> 3] >> (position & 7) & 1:
+                    self.validity[name][-1] |= 1 << (target & 7)
+
+        self.length = row + other.length
+
+        return self
+
+    def is_missing(self, name:str, row:int) -> bool:
+        """Whether the value of a column is missing at a row."""
+
+        return not self.validity[name][row >> 3] >> (row & 7) & 1
+
+    def get_dictionary(self, name:str) -> list:
+        """The distinct values of a dictionary encoded column, indexed by
+        code."""
+
+        return list(self.dictionaries[name])
+
+    def get_coco_labels(self) -> list:
+        """Label of every entry of the coco dictionary, so
+        ``get_coco_labels()[codes['coco'][row]]`` labels a row without
+        expanding the column."""
+
+        return [ get_coco_label(code) for code in self.dictionaries['coco'] ]
+
+    def get_column(self, name:str) -> list:
+        """Decoded values of a column, None when missing. Dates are
+        datetime.date."""
+
+        missing = [ self.is_missing(name, row) for row in range(self.length) ]
+
+        if name in self.codes:
+            dictionary = self.dictionaries[name]
+
+            values = [ dictionary[code] for code in self.codes[name] ]
+
+        elif _get_kind(name) == 'date':
+            values = [ datetime.date.fromordinal(days + EPOCH) for days in self.values[name] ]
+
+        else:
+            values = list(self.values[name])
+
+        return [ None if gap else value for value, gap in zip(values, missing) ]
+
+    def rows(self):
+        """Yields every row as a dict, see get_column."""
+
+        columns = [ self.get_column(name) for name in self.fieldnames ]
+
+        for row in zip(*columns):
+            yield dict(zip(self.fieldnames, row))
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by codes, values and bitmaps, dictionaries aside."""
+
+        return sum(len(values) * values.itemsize for values in list(self.codes.values()) + list(self.values.values())) + \
+            sum(len(bitmap) for bitmap in self.validity.values())
+
+    def to_pandas(self):
+        """Builds a pandas DataFrame, dictionary columns as Categorical."""
+
+        try:
+            import numpy
+            import pandas
+
+        except ImportError:
+            raise ImportError("to_pandas() requires pandas, install meteostat2[pandas]")
+
+        from meteostat.columnar import _to_mask, _to_numpy
+
+        columns = {}
+
+        for name in self.fieldnames:
+            kind = _get_kind(name)
+
+            mask = _to_mask(self.validity[name], self.length)
+
+            if kind == 'dictionary':
+                codes = numpy.frombuffer(self.codes[name], dtype=self.codes[name].typecode).astype('int64')
+
+                codes[mask] = -1
+
+                columns[name] = pandas.Categorical.from_codes(codes, categories=self.dictionaries[name])
+
+                continue
+
+            values = _to_numpy(self.values[name])
+
+            if kind == 'date':
+                columns[name] = (values.astype('int64') * 86400).view('datetime64[s]')
+
+            elif kind == 'int' and self.null_counts[name]:
+                columns[name] = pandas.arrays.IntegerArray(values, mask)
+
+            else:
+                columns[name] = values
+
+        return pandas.DataFrame(columns, copy=False)
+
+    def to_arrow(self):
+        """Builds a pyarrow Table, dictionary columns as DictionaryArray.
+        Values and validity bitmaps are handed over without a copy."""
+
+        try:
+            import pyarrow
+
+        except ImportError:
+            raise ImportError("to_arrow() requires pyarrow, install meteostat2[arrow]")
+
+        types = { 'B': pyarrow.uint8(), 'H': pyarrow.uint16(), 'I': pyarrow.uint32(),
+            'i': pyarrow.date32(), 'h': pyarrow.int16(), 'd': pyarrow.float64() }
+
+        # Dictionaries keep their declared type, even when a column is all
+        # missing and its dictionary empty.
+        value_types = { str: pyarrow.string(), int: pyarrow.int64(), float: pyarrow.float64() }
+
+        columns = []
+
+        for name in self.fieldnames:
+            nulls = self.null_counts[name]
+
+            validity = pyarrow.py_buffer(self.validity[name]) if nulls else None
+
+            if name in self.codes:
+                codes = self.codes[name]
+
+                columns.append(pyarrow.DictionaryArray.from_arrays(
+                    pyarrow.Array.from_buffers(types[codes.typecode], self.length,
+                        [ validity, pyarrow.py_buffer(codes) ], null_count=nulls),
+                    pyarrow.array(self.dictionaries[name], type=value_types[DICTIONARY_COLUMNS[name]])
+                ))
+
+                continue
+
+            values = self.values[name]
+
+            columns.append(pyarrow.Array.from_buffers(types[values.typecode], self.length,
+                [ validity, pyarrow.py_buffer(values) ], null_count=nulls))
+
+        return pyarrow.Table.from_arrays(columns, names=list(self.fieldnames))
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __str__(self) -> str:
+        return "CompactTable: {} rows of {}, {} stations".format(
+            self.length, ",".join(self.fieldnames), len(self.dictionaries.get(self.fieldnames[0], ()))
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,232 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Parallel block compression of bulk output"""
+
+__all__ = ['CompressedWriter', 'get_codec']
+
+import os
+import threading
+from collections import deque
+
+CODECS = {
+    '.gz': 'gzip',
+    '.gzip': 'gzip',
+    '.zst': 'zstd'
+}
+
+DEFAULT_LEVELS = {
+    'gzip': 6,
+    'zstd': 3
+}
+
+def get_codec(path:str) -> str:
+    """Codec implied by the extension of a path, None for plain files."""
+
+    return CODECS.get(os.path.splitext(path or '')[1].lower())
+
+def _get_compress(codec:str, level:int):
+    """Function compressing one block into a self-contained gzip member
+    or zstd frame."""
+
+    if codec == 'gzip':
+        import gzip
+
+        # A fixed mtime keeps the output reproducible.
+        return lambda block: gzip.compress(block, compresslevel=level, mtime=0)
+
+    if codec == 'zstd':
+        try:
+            import zstandard
+
+        except ImportError:
+            raise ImportError('zstd output requires zstandard, install meteostat2[zstd]')
+
+        local = threading.local()
+
+        def compress(block):
+            # Compressors are not thread-safe, one per thread.
+            compressor = getattr(local, 'compressor', None)
+
+            if compressor is None:
+                compressor = local.compressor = zstandard.ZstdCompressor(level=level)
+
+            return compressor.compress(block)
+
+        return compress
+
+    raise ValueError('Unknown codec {}, use gzip or zstd'.format(codec))
+
+class CompressedWriter(object):
+    """Writes a compressed stream, compressing blocks in parallel.
+
+    Data is cut in blocks of block_size bytes, each compressed on its own
+    by a pool of threads (zlib and zstd release the GIL) into a gzip
+    member or a zstd frame, as pigz does. Blocks are written in order, and
+    concatenated members (frames) are a standard stream any gzip (zstd)
+    reader decodes, so outputs of several writers or shards can simply be
+    concatenated too.
+
+    Parameters
+    ----------
+    file: str or binary file
+        The output path, or an open binary file (left open on close).
+
+    codec: str
+        gzip or zstd. Default None, from the extension of file, gzip
+        otherwise.
+
+    level: int
+        Compression level. Default 6 for gzip, 3 for zstd.
+
+    threads: int
+        Compressing threads. Default None, the number of CPUs.
+
+    block_size: int
+        Bytes per block. Default 1 MiB, larger blocks compress slightly
+        better."""
+
+    def __init__(self, file = None, codec:str = None, level:int = None, threads:int = None,
+        block_size:int = 1 << 20) -> None:
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        if codec is None:
+            codec = get_codec(file if isinstance(file, str) else getattr(file, 'name', None)) or 'gzip'
+
+        self.codec=codec
+        self.level=DEFAULT_LEVELS[codec] if level is None and codec in DEFAULT_LEVELS else level
+        self.threads=max(1, threads or os.cpu_count() or 1)
+        self.block_size=block_size
+
+        self._compress=_get_compress(codec, self.level)
+
+        if isinstance(file, str):
+            self._file=open(file, 'wb')
+            self._owned=True
+        else:
+            self._file=file
+            self._owned=False
+
+        self._executor=ThreadPoolExecutor(max_workers=self.threads)
+        self._pending=deque()
+        self._chunks=[]
+        self._size=0
+        self.closed=False
+
+    def write(self, data) -> int:
+        """Adds str (utf-8 encoded) or bytes to the stream."""
+
+        if isinstance(data, str):
+            # Encoded block by block, a large write is never copied whole.
+            for offset in range(0, len(data), self.block_size):
+                self._add(data[offset:offset + self.block_size].encode('utf-8'))
+
+            return len(data)
+
+        self._add(data)
+
+        return len(data)
+
+    def writelines(self, lines) -> None:
+
+        for line in lines:
+            self.write(line)
+
+    def _add(self, data) -> None:
+        """Buffers data, submitting every full block."""
+
+        if self._size + len(data) < self.block_size:
+            self._chunks.append(bytes(data))
+            self._size += len(data)
+
+            return
+
+        view = memoryview(data)
+
+        # Complete the buffered block first.
+        offset = self.block_size - self._size
+
+        self._chunks.append(view[:offset])
+
+        self._submit(b''.join(self._chunks))
+
+        while len(view) - offset >= self.block_size:
+            self._submit(bytes(view[offset:offset + self.block_size]))
+
+            offset += self.block_size
+
+        self._chunks = [ bytes(view[offset:]) ] if offset < len(view) else []
+        self._size = len(view) - offset
+
+    def _submit(self, block:bytes) -> None:
+
+        # Bounded read-ahead, at most two blocks per thread in memory.
+        while len(self._pending) >= 2 * self.threads:
+            self._file.write(self._pending.popleft().result())
+
+        self._pending.append(self._executor.submit(self._compress, block))
+
+    def flush(self) -> None:
+        """Compresses and writes everything written so far."""
+
+        if self._size:
+            self._submit(b''.join(self._chunks))
+
+            self._chunks = []
+            self._size = 0
+
+        while self._pending:
+            self._file.write(self._pending.popleft().result())
+
+        self._file.flush()
+
+    def close(self) -> None:
+
+        if self.closed:
+            return
+
+        try:
+            self.flush()
+
+        finally:
+            self.closed = True
+
+            self._executor.shutdown()
+
+            if self._owned:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __str__(self) -> str:
+        return "CompressedWriter: {} level {} with {} threads".format(
+            self.codec, self.level, self.threads
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,233 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Adaptive concurrency control for bulk fetches"""
+
+__all__ = ['AdaptiveLimiter']
+
+import time
+import threading
+
+from meteostat import metrics
+
+class AdaptiveLimiter(object):
+    """AIMD limit on the number of requests in flight.
+
+    Completions are grouped in windows of ``limit`` requests. After a
+    clean window the limit grows by one (additive increase), unless the
+    previous increase did not improve throughput. A failed request, or a
+    window whose mean latency went over ``latency_tolerance`` times the
+    best window seen, multiplies the limit by ``backoff`` (multiplicative
+    decrease, at most once per window). The limit stays within
+    [minimum, maximum].
+
+    The limit, requests in flight, latency, throughput and errors are
+    published as 'concurrency.*' metrics."""
+
+    def __init__(self, initial:int = 2, minimum:int = 1, maximum:int = 16,
+        backoff:float = 0.5, latency_tolerance:float = 2.0) -> None:
+
+        self.minimum=max(1, minimum)
+        self.maximum=max(self.minimum, maximum)
+        self.limit=min(self.maximum, max(self.minimum, initial))
+        self.backoff=backoff
+        self.latency_tolerance=latency_tolerance
+
+        self.in_flight=0
+
+        self._condition=threading.Condition()
+
+        self._window_count=0
+        self._window_latency=0.0
+        self._window_bytes=0
+        self._window_start=time.monotonic()
+        self._window_failed=False
+
+        self._best_latency=None
+        self._last_throughput=None
+        self._increased=False
+        self._plateau=False
+
+        self._publish()
+
+    def _publish(self) -> None:
+
+        metrics.set_gauge('concurrency.limit', self.limit)
+        metrics.set_gauge('concurrency.in_flight', self.in_flight)
+
+    def acquire(self) -> None:
+        """Blocks until a request may start."""
+
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+
+            self.in_flight += 1
+
+            self._publish()
+
+    def release(self, latency:float = 0.0, nbytes:int = 0, failed:bool = False) -> None:
+        """Reports a finished request and adapts the limit."""
+
+        with self._condition:
+            self.in_flight -= 1
+
+            if failed:
+                self._fail()
+
+            self._window_count += 1
+            self._window_latency += latency
+            self._window_bytes += nbytes
+
+            if self._window_count >= self.limit:
+                self._close_window()
+
+            self._publish()
+
+            self._condition.notify_all()
+
+    def fail(self) -> None:
+        """Reports that a request, already released, turned out to have
+        failed (e.g. its payload is unreadable)."""
+
+        with self._condition:
+            self._fail()
+
+            self._publish()
+
+    def _fail(self) -> None:
+
+        metrics.increment('concurrency.errors')
+
+        if not self._window_failed:
+            self._decrease()
+
+        self._window_failed = True
+
+    def call(self, function, *args, failed = None, **kwargs):
+        """Runs function(*args, **kwargs) as one request under the limit.
+        ``failed(result)`` tells whether a call that returned counts as an
+        error; exceptions always do."""
+
+        self.acquire()
+
+        start = time.monotonic()
+
+        try:
+            result = function(*args, **kwargs)
+
+        except Exception:
+            self.release(time.monotonic() - start, failed=True)
+
+            raise
+
+        self.release(time.monotonic() - start,
+            nbytes=len(result) if isinstance(result, (str, bytes)) else 0,
+            failed=bool(failed and failed(result)))
+
+        return result
+
+    def _decrease(self) -> None:
+
+        self.limit = max(self.minimum, int(self.limit * self.backoff))
+
+        self._increased = False
+
+        # Conditions changed, allow probing upwards again later.
+        self._plateau = False
+
+    def _close_window(self) -> None:
+
+        elapsed = max(time.monotonic() - self._window_start, 1e-6)
+
+        latency = self._window_latency / self._window_count
+        throughput = self._window_bytes / elapsed
+
+        metrics.set_gauge('concurrency.latency_ms', latency * 1000)
+        metrics.set_gauge('concurrency.throughput_bps', throughput)
+
+        if self._best_latency is None or latency < self._best_latency:
+            self._best_latency = latency
+
+        if not self._window_failed:
+            if latency > self._best_latency * self.latency_tolerance:
+                self._decrease()
+
+            elif self._increased and self._last_throughput is not None and throughput < self._last_throughput * 1.05:
+                # The last step up bought nothing, stop probing.
+                self._plateau = True
+                self._increased = False
+
+            elif not self._plateau and self.limit < self.maximum:
+                self.limit += 1
+
+                self._increased = True
+
+            else:
+                self._increased = False
+
+        self._last_throughput = throughput
+
+        self._window_count = 0
+        self._window_latency = 0.0
+        self._window_bytes = 0
+        self._window_failed = False
+        self._window_start = time.monotonic()
+
+    def __str__(self) -> str:
+        return "AdaptiveLimiter: limit {} in [{}, {}], {} in flight".format(
+            self.limit, self.minimum, self.maximum, self.in_flight
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+def map_ordered(function, items, limiter:AdaptiveLimiter = None, failed = None):
+    """Yields function(item) for every item, in order, running up to
+    limiter.maximum calls in threads while the limiter decides how many
+    are actually in flight. ``failed(result)`` tells whether a call that
+    returned counts as an error for the limiter; exceptions always do."""
+
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+
+    if limiter is None:
+        limiter = AdaptiveLimiter()
+
+    def run(item):
+        return limiter.call(function, item, failed=failed)
+
+    items = iter(items)
+
+    with ThreadPoolExecutor(max_workers=limiter.maximum) as executor:
+        # Bounded read-ahead, results are handed out in order.
+        pending = deque()
+
+        for item in items:
+            pending.append(executor.submit(run, item))
+
+            if len(pending) >= 2 * limiter.maximum:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
@@ -0,0 +1,196 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""Changed rows between two snapshots of a station file"""
+
+__all__ = ['get_block_hashes', 'diff_snapshots']
+
+import os
+
+from meteostat.storage import KEY_COLUMNS
+
+CHANGES = ('insert', 'update', 'delete')
+
+def _get_block(line:str, granularity:str) -> str:
+    """The time block of a raw station row: its day for hourly rows, its
+    month for daily rows, its year for monthly rows and its period for
+    normals."""
+
+    if granularity == 'daily':
+        return line[:7]
+
+    if granularity == 'normals':
+        return line[:9]
+
+    return line.split(',', 1)[0]
+
+def _read_lines(snapshot) -> list:
+    """Non-empty lines of a snapshot: csv text (str), a payload (bytes,
+    gzip or not) or the path of a file (os.PathLike, gzip or not)."""
+
+    import gzip
+
+    if isinstance(snapshot, os.PathLike):
+        with open(snapshot, 'rb') as file:
+            snapshot = file.read()
+
+    if isinstance(snapshot, (bytes, bytearray, memoryview)):
+        snapshot = bytes(snapshot)
+
+        if snapshot[:2] == b'\x1f\x8b':
+            snapshot = gzip.decompress(snapshot)
+
+        snapshot = snapshot.decode('utf-8')
+
+    return [ line for line in snapshot.splitlines() if line ]
+
+def _get_blocks(lines:list, granularity:str) -> dict:
+    """Rows of every block, in file order."""
+
+    blocks = {}
+
+    for line in lines:
+        blocks.setdefault(_get_block(line, granularity), []).append(line)
+
+    return blocks
+
+def _get_hash(lines:list) -> str:
+
+    import hashlib
+
+    digest = hashlib.blake2b(digest_size=16)
+
+    for line in lines:
+        digest.update(line.encode('utf-8'))
+        digest.update(b'\n')
+
+    return digest.hexdigest()
+
+def get_block_hashes(snapshot, granularity:str = 'hourly') -> dict:
+    """hashes a station file block by block.
+
+    Parameters
+    ----------
+    snapshot: str, bytes or os.PathLike
+        Raw station file as served by the bulk endpoint: csv text (a str
+        is never taken for a path), its payload (gzip compressed or
+        not), or a pathlib.Path of such a file.
+
+    granularity: str
+        hourly, daily, monthly or normals. Default hourly.
+
+    Returns
+    -------
+    dict
+        block (a day for hourly files, a month for daily files, a year
+        for monthly files, a period for normals) to the hex blake2b of
+        its rows."""
+
+    blocks = _get_blocks(_read_lines(snapshot), granularity)
+
+    return { block: _get_hash(lines) for block, lines in blocks.items() }
+
+def diff_snapshots(old, new, granularity:str = 'hourly', variant:str = 'full', station:str = None,
+    format:str = 'csv', **kwargs):
+    """gets the rows inserted, updated and deleted between two snapshots
+    of a station file.
+
+    Both snapshots are cut in time blocks and only the blocks whose hash
+    differs are compared row by row, on the row key (date and hour for
+    hourly files, date for daily files, year and month for monthly files,
+    period and month for normals).
+
+    Parameters
+    ----------
+    old: str, bytes or os.PathLike
+        The previous snapshot, see get_block_hashes. None or "" for an
+        empty file.
+
+    new: str, bytes or os.PathLike
+        The current snapshot.
+
+    granularity: str
+        hourly, daily, monthly or normals. Default hourly.
+
+    variant: str
+        full or obs, sets the columns. Default full.
+
+    station: str
+        Station id written in the id column. Default None, left empty.
+
+    format: str
+        Default csv.
+        csv: comma separated text with a header, the first column is the
+        change (insert, update or delete).
+        json: a list of dicts, with a 'change' key.
+
+    Returns
+    -------
+    str or list
+        the changed rows, block by block in time order. Inserted and
+        updated rows are the current ones, deleted rows the previous
+        ones."""
+
+    from meteostat.meteostat2 import _get_dataset
+
+    header = _get_dataset(granularity, variant)[1]
+
+    width = len(KEY_COLUMNS[granularity]) - 1
+
+    old_blocks = _get_blocks(_read_lines(old or ""), granularity)
+    new_blocks = _get_blocks(_read_lines(new or ""), granularity)
+
+    changes = []
+
+    for block in sorted(set(old_blocks) | set(new_blocks)):
+        previous = old_blocks.get(block, [])
+        current = new_blocks.get(block, [])
+
+        if previous and current and _get_hash(previous) == _get_hash(current):
+            continue
+
+        rows = { tuple(line.split(',', width)[:width]): line for line in previous }
+
+        for line in current:
+            before = rows.pop(tuple(line.split(',', width)[:width]), None)
+
+            if before is None:
+                changes.append(('insert', line))
+
+            elif before != line:
+                changes.append(('update', line))
+
+        changes.extend(('delete', line) for line in rows.values())
+
+    station = station or ''
+
+    if format == 'json':
+        fieldnames = ('change',) + header
+
+        return [ dict(zip(fieldnames, [ change, station ] + line.split(','))) for change, line in changes ]
+
+    return ''.join(
+        [ '{}\r\n'.format(','.join(('change',) + header)) ] +
+        [ '{},{},{}\r\n'.format(change, station, line) for change, line in changes ]
+    )
@@ -0,0 +1,363 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Follow mode, new observations of a station set as a stream"""
+
+__all__ = ['Follower', 'follow_stations']
+
+import time
+import threading
+
+from meteostat import metrics
+from meteostat import meteostat2
+
+def _get_key(granularity:str, line:str) -> tuple:
+    """Time key of a raw csv row."""
+
+    fields = line.split(',', 3)
+
+    if granularity == 'monthly':
+        return (int(fields[0]), int(fields[1]))
+
+    if granularity == 'daily':
+        return (fields[0], )
+
+    return (fields[0], int(fields[1]))
+
+def _get_since(granularity:str, since) -> tuple:
+    """Time key of a datetime, date or ISO string."""
+
+    import datetime
+
+    if isinstance(since, str):
+        since = datetime.datetime.fromisoformat(since)
+
+    if granularity == 'monthly':
+        return (since.year, since.month)
+
+    if granularity == 'daily':
+        return ('{:%Y-%m-%d}'.format(since), )
+
+    return ('{:%Y-%m-%d}'.format(since), getattr(since, 'hour', 0))
+
+class _StationState(object):
+    """Validators and last row seen of a followed station."""
+
+    __slots__ = ('etag', 'last_modified', 'last_key')
+
+    def __init__(self, last_key:tuple = None) -> None:
+
+        # HTTP validators, or (mtime, size) / a payload hash for other
+        # sources in etag.
+        self.etag=None
+        self.last_modified=None
+        self.last_key=last_key
+
+class Follower(object):
+    """Watches stations and hands out the rows they gain.
+
+    Each poll requests every station file conditionally (If-None-Match /
+    If-Modified-Since) over a keep-alive session, so an unchanged file is
+    a bodiless 304. Files of a FileSource are only read when their mtime
+    or size changed, files of other sources when their hash did. Changed
+    files are only split from their end back to the last row seen, as
+    rows are appended in time order.
+
+    A station that fails (connection error, timeout, bad status) is
+    counted in the 'follow.errors' metric, its error kept in errors, and
+    is polled again on the next interval.
+
+    Parameters
+    ----------
+    stations: str or list
+        The station identifiers.
+
+    granularity, variant: str
+        The dataset. Default hourly obs.
+
+    interval: float
+        Seconds between the start of two polls. Default 300.
+
+    since: datetime, date or str
+        Only rows after it are handed out. Default None, only rows that
+        appear after the first poll.
+
+    format: str
+        Default json, rows are dicts. csv for 'id,...' lines.
+
+    timeout: float
+        Seconds before a request is given up. Default 30."""
+
+    def __init__(self, stations = None, granularity:str = 'hourly', variant:str = 'obs', interval:float = 300,
+        since = None, format:str = 'json', timeout:float = 30) -> None:
+
+        if granularity == 'normals':
+            raise ValueError('normals have no time axis, they cannot be followed')
+
+        if isinstance(stations, (str, int)):
+            stations = [ stations ]
+
+        self.stations=[ str(station).strip() for station in stations ]
+        self.granularity=granularity
+        self.interval=interval
+        self.format=format
+        self.timeout=timeout
+
+        # Last error of each failing station.
+        self.errors={}
+
+        self.action, self.fieldnames = meteostat2._get_dataset(granularity, variant)
+
+        last_key = None if since is None else _get_since(granularity, since)
+
+        self.states={ station: _StationState(last_key) for station in self.stations }
+
+        # Without since, the first poll only sets the starting point.
+        self._primed=since is not None
+
+        self._session=None
+        self._stopped=threading.Event()
+
+    def _get_session(self):
+
+        if self._session is None:
+            import requests
+
+            self._session = requests.Session()
+
+        return self._session
+
+    def _fetch_http(self, state:_StationState, url:str) -> bytes:
+        """Payload of a changed file over HTTP, None when unchanged."""
+
+        headers = {}
+
+        if state.etag:
+            headers['If-None-Match'] = state.etag
+
+        if state.last_modified:
+            headers['If-Modified-Since'] = state.last_modified
+
+        response = self._get_session().get(url, headers=headers, timeout=self.timeout)
+
+        if response.status_code == 304:
+            return None
+
+        if response.status_code != 200:
+            raise OSError('HTTP {}'.format(response.status_code))
+
+        state.etag = response.headers.get('ETag')
+        state.last_modified = response.headers.get('Last-Modified')
+
+        return response.content
+
+    def _fetch_source(self, state:_StationState, url:str, source) -> bytes:
+        """Payload of a changed file of any other source, None when
+        unchanged."""
+
+        import os
+        import hashlib
+
+        from meteostat.sources import FileSource
+
+        if isinstance(source, FileSource):
+            stat = os.stat(source.get_path(url))
+
+            validator = (stat.st_mtime_ns, stat.st_size)
+
+            if validator == state.etag:
+                return None
+
+        payload = source.get_payload(url=url)
+
+        if payload is None:
+            raise OSError('{} not found'.format(url))
+
+        if not isinstance(source, FileSource):
+            validator = hashlib.blake2b(payload, digest_size=16).digest()
+
+            if validator == state.etag:
+                return None
+
+        state.etag = validator
+
+        return payload
+
+    def _poll_station(self, station:str) -> str:
+        """New raw rows of a station, "" when there are none or the
+        request failed."""
+
+        import gzip
+
+        from meteostat.sources import HTTPSource
+
+        state = self.states[station]
+
+        url = meteostat2._get_station_url(action=self.action, station=station)
+
+        source = meteostat2._get_source()
+
+        validators = (state.etag, state.last_modified)
+
+        try:
+            if isinstance(source, HTTPSource):
+                payload = self._fetch_http(state, url)
+            else:
+                payload = self._fetch_source(state, url, source)
+
+            if payload is not None:
+                data = gzip.decompress(payload).decode('utf-8').rstrip('\r\n')
+
+        # requests exceptions are OSErrors too, truncated files EOFErrors.
+        except (OSError, EOFError, ValueError) as error:
+            metrics.increment('follow.errors')
+
+            self.errors[station] = error
+
+            # Read again on the next poll.
+            state.etag, state.last_modified = validators
+
+            return ""
+
+        self.errors.pop(station, None)
+
+        if payload is None:
+            metrics.increment('follow.not_modified')
+
+            return ""
+
+        metrics.increment('follow.modified')
+
+        if not data:
+            return ""
+
+        latest = _get_key(self.granularity, data[data.rfind('\n') + 1:].rstrip('\r'))
+
+        last_key, state.last_key = state.last_key, max(latest, state.last_key or latest)
+
+        # A station seen for the first time only sets its starting point.
+        if last_key is None or not self._primed:
+            return ""
+
+        begin = len(data)
+
+        # Walk back from the end over the rows newer than the last seen.
+        while begin > 0:
+            start = data.rfind('\n', 0, begin - 1) + 1
+
+            line = data[start:begin].rstrip('\r\n')
+
+            if line and _get_key(self.granularity, line) <= last_key:
+                break
+
+            begin = start
+
+        return data[begin:]
+
+    def poll(self) -> list:
+        """polls every station once.
+
+        Returns
+        -------
+        list
+            the new rows, station by station in time order, as dicts
+            (json) or 'id,...' lines (csv)."""
+
+        rows = []
+
+        for station, data in zip(self.stations, meteostat2._map_stations(self._poll_station, self.stations)):
+            if not data:
+                continue
+
+            data = meteostat2._add_station(data=data, station=station)
+
+            if self.format == 'json':
+                rows.extend(meteostat2._get_json_from_csv(data=data, fieldnames=self.fieldnames))
+            else:
+                rows.extend(data.splitlines())
+
+        self._primed = True
+
+        return rows
+
+    def stop(self) -> None:
+        """Ends iteration after the current poll."""
+
+        self._stopped.set()
+
+    def __iter__(self):
+        """Yields new rows as they appear, polling every interval."""
+
+        while not self._stopped.is_set():
+            start = time.monotonic()
+
+            for row in self.poll():
+                yield row
+
+            self._stopped.wait(max(0, self.interval - (time.monotonic() - start)))
+
+    async def __aiter__(self):
+        """Same as iterating, polls run in a worker thread."""
+
+        import asyncio
+
+        while not self._stopped.is_set():
+            start = time.monotonic()
+
+            for row in await asyncio.get_running_loop().run_in_executor(None, self.poll):
+                yield row
+
+            delay = self.interval - (time.monotonic() - start)
+
+            # Sleep in short steps so stop() is noticed.
+            while delay > 0 and not self._stopped.is_set():
+                await asyncio.sleep(min(delay, 1))
+
+                delay -= 1
+
+    def __str__(self) -> str:
+        return "Follower: {} stations of {} every {}s".format(
+            len(self.stations), self.action, self.interval
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+def follow_stations(stations = None, granularity:str = 'hourly', variant:str = 'obs', interval:float = 300,
+    since = None, format:str = 'json', timeout:float = 30, **kwargs) -> Follower:
+    """follows stations, new rows come out as they are published.
+
+    Iterate the result, or use ``async for``::
+
+        for row in follow_stations([ '10637', '47423' ], interval=300):
+            ...
+
+    See Follower for the parameters and stop() to end it.
+
+    Returns
+    -------
+    Follower
+        an iterable and async iterable of new rows."""
+
+    return Follower(stations=stations, granularity=granularity, variant=variant, interval=interval,
+        since=since, format=format, timeout=timeout)
@@ -0,0 +1,268 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Batch point to station matching"""
+
+__all__ = ['get_nearest_stations']
+
+import math
+
+EARTH_RADIUS = 6371008.8
+
+def _haversine(numpy, lat1, lon1, lat2, lon2):
+    """Great-circle distances in meters between (n, 1) points and (1, m)
+    stations, all in radians."""
+
+    a = numpy.sin((lat2 - lat1) / 2) ** 2 + numpy.cos(lat1) * numpy.cos(lat2) * numpy.sin((lon2 - lon1) / 2) ** 2
+
+    return 2 * EARTH_RADIUS * numpy.arcsin(numpy.sqrt(numpy.minimum(a, 1.0)))
+
+def _covers(catalog, inventory:str, start:str, end:str) -> list:
+    """Whether each station's inventory of a dataset covers [start, end]."""
+
+    first = getattr(catalog, '{}_start'.format(inventory))
+    last = getattr(catalog, '{}_end'.format(inventory))
+
+    result = []
+
+    for low, high in zip(first, last):
+        result.append(bool(low) and bool(high)
+            and (start is None or low <= start[:len(low)])
+            and (end is None or high >= end[:len(high)]))
+
+    return result
+
+def _to_cartesian(numpy, lat, lon):
+    """Unit vectors of points in radians, shape (n, 3)."""
+
+    return numpy.stack((numpy.cos(lat) * numpy.cos(lon), numpy.cos(lat) * numpy.sin(lon), numpy.sin(lat)), axis=1)
+
+class _Grid(object):
+    """Stations bucketed in cubic cells of the unit sphere's bounding box.
+
+    Working on unit vectors instead of latitude / longitude keeps cells
+    the same size everywhere, poles and antimeridian included. A station
+    outside the block of cells at most ring cells away from a point's
+    cell differs from it by at least ring cells along one axis, so its
+    chord, and great-circle, distance is bounded from below."""
+
+    def __init__(self, numpy, points, cell_size:float) -> None:
+
+        # Chord length of cell_size degrees.
+        self.size=2 * math.sin(math.radians(cell_size) / 2)
+        self.count=int(math.ceil(2 / self.size))
+
+        self.cells={}
+
+        keys = self.get_cells(numpy, points)
+
+        order = numpy.lexsort(keys.T[::-1])
+
+        boundaries = numpy.flatnonzero(numpy.any(numpy.diff(keys[order], axis=0), axis=1)) + 1
+
+        for group in numpy.split(order, boundaries):
+            if len(group):
+                self.cells[tuple(keys[group[0]].tolist())] = group
+
+    def get_cells(self, numpy, points):
+        """Integer cell coordinates of unit vectors, shape (n, 3)."""
+
+        return numpy.clip(((points + 1) // self.size).astype('int64'), 0, self.count - 1)
+
+    def get_block(self, numpy, cell:tuple, ring:int):
+        """Station indexes in the cells at most ring cells away."""
+
+        x, y, z = cell
+
+        found = []
+
+        for cell_x in range(max(0, x - ring), min(self.count, x + ring + 1)):
+            for cell_y in range(max(0, y - ring), min(self.count, y + ring + 1)):
+                for cell_z in range(max(0, z - ring), min(self.count, z + ring + 1)):
+                    stations = self.cells.get((cell_x, cell_y, cell_z))
+
+                    if stations is not None:
+                        found.append(stations)
+
+        if not found:
+            return numpy.zeros(0, dtype='int64')
+
+        return numpy.concatenate(found)
+
+    def get_bound(self, ring:int) -> float:
+        """Lower bound, in meters, of the distance between a point and any
+        station outside its ring block."""
+
+        if ring >= self.count:
+            return math.inf
+
+        chord = ring * self.size
+
+        if chord >= 2:
+            return math.inf
+
+        return EARTH_RADIUS * 2 * math.asin(chord / 2)
+
+def get_nearest_stations(lat, lon, k:int = 1, catalog = None, inventory:str = None, start:str = None, end:str = None,
+    max_distance:float = None, cell_size:float = 2.0, **kwargs) -> tuple:
+    """matches many points to their nearest stations at once.
+
+    Distances are great-circle (haversine) distances computed with numpy
+    for every point of a grid cell at once, against the stations of the
+    surrounding cells only. The search widens ring by ring until no
+    station further away can be closer, so results are exact.
+
+    Parameters
+    ----------
+    lat, lon: array-like
+        The coordinates of the points, in degrees.
+
+    k: int
+        The number of stations per point. Default 1.
+
+    catalog: StationCatalog
+        The stations to match against. Default None,
+        StationCatalog.fetch().
+
+    inventory: str
+        hourly, daily, monthly or normals. Only stations with that
+        inventory covering [start, end] are matched. Default None, every
+        station.
+
+    start, end: str
+        ISO dates bounding the inventory filter. Default None, unbounded.
+
+    max_distance: float
+        Stations further than this many meters are not matched. Default
+        None.
+
+    cell_size: float
+        The size, in degrees, of the grid cells. Default 2.
+
+    Returns
+    -------
+    tuple
+        (ids, distances), two (points, k) numpy arrays sorted by
+        distance. Missing matches have id '' and distance inf."""
+
+    try:
+        import numpy
+
+    except ImportError:
+        raise ImportError('get_nearest_stations requires numpy, install meteostat2[numpy]')
+
+    if catalog is None:
+        from meteostat.catalog import StationCatalog
+
+        catalog = StationCatalog.fetch()
+
+    lat = numpy.atleast_1d(numpy.asarray(lat, dtype='float64'))
+    lon = numpy.atleast_1d(numpy.asarray(lon, dtype='float64'))
+
+    if lat.shape != lon.shape:
+        raise ValueError('lat and lon must have the same shape')
+
+    station_lat = numpy.frombuffer(catalog.latitude, dtype='float64')
+    station_lon = numpy.frombuffer(catalog.longitude, dtype='float64')
+
+    usable = numpy.isfinite(station_lat) & numpy.isfinite(station_lon)
+
+    if inventory is not None:
+        usable &= numpy.array(_covers(catalog, inventory, start, end), dtype=bool)
+
+    selected = numpy.flatnonzero(usable)
+
+    ids = numpy.array(catalog.id, dtype=object)[selected]
+
+    station_lat = numpy.radians(station_lat[selected])
+    station_lon = numpy.radians(station_lon[selected])
+
+    grid = _Grid(numpy, _to_cartesian(numpy, station_lat, station_lon), cell_size)
+
+    result_ids = numpy.full((lat.size, k), '', dtype=object)
+    result_distances = numpy.full((lat.size, k), numpy.inf)
+
+    if not len(selected):
+        return result_ids, result_distances
+
+    cells = grid.get_cells(numpy, _to_cartesian(numpy, numpy.radians(lat), numpy.radians(lon)))
+
+    points = numpy.lexsort(cells.T[::-1])
+
+    # Points of the same cell share their candidate stations.
+    boundaries = numpy.flatnonzero(numpy.any(numpy.diff(cells[points], axis=0), axis=1)) + 1
+
+    for group in numpy.split(points, boundaries):
+        cell = tuple(cells[group[0]].tolist())
+
+        point_lat = numpy.radians(lat[group])[:, None]
+        point_lon = numpy.radians(lon[group])[:, None]
+
+        ring = 1
+
+        while True:
+            candidates = grid.get_block(numpy, cell, ring)
+
+            bound = grid.get_bound(ring)
+
+            # Stations outside the block are at least bound away.
+            final = bound == math.inf or (max_distance is not None and bound >= max_distance)
+
+            if len(candidates) >= k or (final and len(candidates)):
+                distances = _haversine(numpy, point_lat, point_lon, station_lat[candidates][None, :], station_lon[candidates][None, :])
+
+                kth = min(k, len(candidates))
+
+                if kth < len(candidates):
+                    nearest = numpy.argpartition(distances, kth - 1, axis=1)[:, :kth]
+                else:
+                    nearest = numpy.broadcast_to(numpy.arange(kth), (len(group), kth))
+
+                nearest_distances = numpy.take_along_axis(distances, nearest, axis=1)
+
+                if final or (nearest_distances.max(axis=1) <= bound).all():
+                    break
+
+            elif final:
+                break
+
+            ring = ring + 1 if ring < 4 else ring * 2
+
+        if not len(candidates):
+            continue
+
+        order = numpy.argsort(nearest_distances, axis=1)
+
+        nearest = numpy.take_along_axis(nearest, order, axis=1)
+        nearest_distances = numpy.take_along_axis(nearest_distances, order, axis=1)
+
+        result_ids[group, :kth] = ids[candidates[nearest]]
+        result_distances[group, :kth] = nearest_distances
+
+    if max_distance is not None:
+        far = result_distances > max_distance
+
+        result_ids[far] = ''
+        result_distances[far] = numpy.inf
+
+    return result_ids, result_distances
@@ -0,0 +1,238 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Time-aligned station x timestamp matrices"""
+
+__all__ = ['StationMatrix', 'build_station_matrix']
+
+import datetime
+
+from meteostat import meteostat2
+
+class StationMatrix(object):
+    """A (column, station, time) array aligned on a regular time axis.
+
+    ``values[c, s, t]`` holds column ``columns[c]`` of station
+    ``stations[s]`` at step ``t`` after ``start``. Gaps are NaN."""
+
+    def __init__(self, values, columns:tuple, stations:tuple, start:datetime.datetime, granularity:str) -> None:
+
+        self.values=values
+        self.columns=columns
+        self.stations=stations
+        self.start=start
+        self.granularity=granularity
+
+    def __getitem__(self, column:str):
+        """Returns the (station, time) view of a single column."""
+
+        return self.values[self.columns.index(column)]
+
+    def timestamps(self) -> list:
+        """Returns the timestamp of every step on the time axis."""
+
+        return [ _get_timestamp(self.start, self.granularity, step) for step in range(self.values.shape[2]) ]
+
+    def __str__(self) -> str:
+        return "StationMatrix: {} columns, {} stations, {} steps from {} ({})".format(
+            len(self.columns), len(self.stations), self.values.shape[2], self.start, self.granularity
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+def _to_datetime(value) -> datetime.datetime:
+    """Accepts datetimes, dates or ISO strings."""
+
+    if isinstance(value, datetime.datetime):
+        return value
+
+    if isinstance(value, datetime.date):
+        return datetime.datetime(value.year, value.month, value.day)
+
+    return datetime.datetime.fromisoformat(value)
+
+def _get_step(start:datetime.datetime, granularity:str, when:datetime.datetime) -> int:
+    """Number of steps between start and when."""
+
+    if granularity == 'hourly':
+        delta = when - start
+
+        return delta.days * 24 + delta.seconds // 3600
+
+    if granularity == 'daily':
+        return when.toordinal() - start.toordinal()
+
+    return (when.year * 12 + when.month) - (start.year * 12 + start.month)
+
+def _get_timestamp(start:datetime.datetime, granularity:str, step:int) -> datetime.datetime:
+    """Inverse of _get_step."""
+
+    if granularity == 'hourly':
+        return start + datetime.timedelta(hours=step)
+
+    if granularity == 'daily':
+        return start + datetime.timedelta(days=step)
+
+    months = start.year * 12 + start.month - 1 + step
+
+    return datetime.datetime(months // 12, months % 12 + 1, 1)
+
+def _get_row_step(granularity:str, fields:list, origin:int, hour:int, cache:dict) -> int:
+    """Step of a raw csv row. ``origin`` is the start expressed in the
+    granularity's natural unit (ordinal day or month count)."""
+
+    if granularity == 'monthly':
+        return int(fields[0]) * 12 + int(fields[1]) - origin
+
+    date = fields[0]
+
+    # Consecutive rows share the date, avoid re-parsing it.
+    if date != cache.get('date'):
+        cache['date'] = date
+        cache['ordinal'] = datetime.date.fromisoformat(date).toordinal()
+
+    if granularity == 'daily':
+        return cache['ordinal'] - origin
+
+    return (cache['ordinal'] - origin) * 24 + int(fields[1]) - hour
+
+def build_station_matrix(stations:list = None, columns = 'temp', start = None, end = None,
+    granularity:str = 'hourly', variant:str = 'full', filename:str = None, dtype:str = 'float32', **kwargs) -> StationMatrix:
+    """builds a time-aligned station x timestamp matrix.
+
+    Station files are streamed one line at a time and every requested
+    column is written straight into a preallocated array, so peak memory
+    stays around the size of the output.
+
+    Parameters
+    ----------
+    stations: list
+        The station identifiers, one matrix row each. Default None, every
+        station listed in get_stations_full().
+
+    columns: str or tuple
+        The variable(s) to extract, e.g. 'temp'. Default 'temp'.
+
+    start, end: datetime, date or str
+        The inclusive time range of the matrix.
+
+    granularity: str
+        hourly, daily or monthly. Default hourly.
+
+    variant: str
+        full or obs. Default full.
+
+    filename: str
+        When given, the matrix is a ``numpy.memmap`` stored in this file
+        instead of an in-memory array. Default None.
+
+    dtype: str
+        The numpy dtype of the matrix. Default float32.
+
+    Returns
+    -------
+    StationMatrix
+        the matrix, with NaN for gaps."""
+
+    try:
+        import numpy
+
+    except ImportError:
+        raise ImportError('build_station_matrix requires numpy, install meteostat2[numpy]')
+
+    if granularity not in ('hourly', 'daily', 'monthly'):
+        raise ValueError('Cannot build a time-aligned matrix for {}'.format(granularity))
+
+    if start is None or end is None:
+        raise ValueError('Both start and end are required')
+
+    if isinstance(columns, str):
+        columns = (columns, )
+
+    columns = tuple(columns)
+
+    action, header = meteostat2._get_dataset(granularity, variant)
+
+    # Raw station files come without the id column.
+    positions = [ header.index(column) - 1 for column in columns ]
+
+    if stations is None:
+        stations = [ line['id'] for line in meteostat2.get_stations_full() ]
+
+    stations = tuple(stations)
+
+    start = _to_datetime(start)
+    end = _to_datetime(end)
+
+    if granularity != 'hourly':
+        start = start.replace(hour=0)
+
+    if granularity == 'monthly':
+        start = start.replace(day=1)
+
+    steps = _get_step(start, granularity, end) + 1
+
+    if steps <= 0:
+        raise ValueError('end must not be before start')
+
+    shape = (len(columns), len(stations), steps)
+
+    if filename is None:
+        values = numpy.full(shape, numpy.nan, dtype=dtype)
+    else:
+        values = numpy.memmap(filename, dtype=dtype, mode='w+', shape=shape)
+
+        values[:] = numpy.nan
+
+    if granularity == 'monthly':
+        origin = start.year * 12 + start.month
+    else:
+        origin = start.toordinal()
+
+    for row, station in enumerate(stations):
+        url = meteostat2._get_station_url(action=action, station=station)
+
+        cache = {}
+
+        for line in meteostat2._iter_lines_from_endpoint(url=url, station=station):
+            fields = line.split(',')
+
+            step = _get_row_step(granularity, fields, origin, start.hour, cache)
+
+            if step < 0:
+                continue
+
+            if step >= steps:
+                break
+
+            for column, position in enumerate(positions):
+                value = fields[position] if position < len(fields) else ''
+
+                if value:
+                    values[column, row, step] = float(value)
+
+    if filename is not None:
+        values.flush()
+
+    return StationMatrix(values, columns, stations, start, granularity)
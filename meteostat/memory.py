@@ -0,0 +1,168 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Memory accounting of bulk jobs"""
+
+__all__ = ['MemoryBudget', 'sample_memory']
+
+import sys
+import time
+import threading
+
+from meteostat import metrics
+
+def _get_size(value) -> int:
+    """Bytes (characters) held by a stage result: strings and bytes,
+    directly or in a tuple / list."""
+
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+
+    if isinstance(value, (tuple, list)):
+        return sum(len(item) for item in value if isinstance(item, (str, bytes, bytearray)))
+
+    return 0
+
+def sample_memory() -> dict:
+    """samples the memory of the process and publishes it as metrics.
+
+    Returns
+    -------
+    dict
+        'memory.rss_bytes' (Linux only), 'memory.peak_rss_bytes' and,
+        while tracemalloc is tracing, 'memory.traced_bytes' and
+        'memory.peak_traced_bytes'."""
+
+    sample = {}
+
+    try:
+        import os
+
+        with open('/proc/self/statm') as file:
+            sample['memory.rss_bytes'] = int(file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        # Kilobytes, except on macOS.
+        sample['memory.peak_rss_bytes'] = peak if sys.platform == 'darwin' else peak * 1024
+
+    except ImportError:
+        pass
+
+    import tracemalloc
+
+    if tracemalloc.is_tracing():
+        sample['memory.traced_bytes'], sample['memory.peak_traced_bytes'] = tracemalloc.get_traced_memory()
+
+    for name, value in sample.items():
+        metrics.set_gauge(name, value)
+
+    return sample
+
+class MemoryBudget(object):
+    """Bytes buffered by the stages of a bulk job, against a limit.
+
+    Stages add what they hold and remove it once handed over. While the
+    total is at or over the limit, wait_for_room() blocks the admission
+    of new work (new downloads) until buffered data drains or is spilled.
+    Work admitted before still completes, so the limit is soft by up to
+    the data of the items in flight.
+    Per stage and total bytes are published as 'memory.<stage>.bytes',
+    'memory.buffered_bytes' and 'memory.peak_buffered_bytes'.
+
+    Parameters
+    ----------
+    limit: int
+        The budget in bytes. Default None, account only."""
+
+    def __init__(self, limit:int = None) -> None:
+
+        self.limit=limit
+        self.stages={}
+        self.total=0
+        self.peak=0
+
+        self._condition=threading.Condition()
+
+    def add(self, stage:str, nbytes:int) -> None:
+        """Adds (or removes, when negative) bytes held by a stage."""
+
+        if not nbytes:
+            return
+
+        with self._condition:
+            self.stages[stage] = self.stages.get(stage, 0) + nbytes
+            self.total += nbytes
+
+            self.peak = max(self.peak, self.total)
+
+            metrics.set_gauge('memory.{}.bytes'.format(stage), self.stages[stage])
+            metrics.set_gauge('memory.buffered_bytes', self.total)
+            metrics.set_gauge('memory.peak_buffered_bytes', self.peak)
+
+            if nbytes < 0:
+                self._condition.notify_all()
+
+    def set(self, stage:str, nbytes:int) -> None:
+        """Sets the bytes held by a stage."""
+
+        with self._condition:
+            self.add(stage, nbytes - self.stages.get(stage, 0))
+
+    @property
+    def exceeded(self) -> bool:
+
+        return self.limit is not None and self.total >= self.limit
+
+    def wait_for_room(self, stop:threading.Event = None) -> None:
+        """Blocks while the budget is exceeded and something is buffered
+        that can drain, or until stop is set."""
+
+        start = None
+
+        with self._condition:
+            while self.exceeded and self.total > 0:
+                if stop is not None and stop.is_set():
+                    break
+
+                if start is None:
+                    start = time.monotonic()
+
+                self._condition.wait(0.1)
+
+        if start is not None:
+            metrics.increment('memory.throttled_seconds', time.monotonic() - start)
+
+    def __str__(self) -> str:
+        return "MemoryBudget: {} of {} bytes buffered".format(
+            self.total, self.limit
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
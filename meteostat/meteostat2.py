@@ -23,106 +23,1133 @@
 
 """Meteostat API client for Python"""
 
+from __future__ import annotations
+
 __all__ = ['get_stations_full', 'get_stations_lite', 'get_hourly_full_station'
 , 'get_hourly_obs_station', 'get_daily_full_station', 'get_daily_obs_station'
 ,'get_monthly_full_station', 'get_monthly_obs_station', 'get_normals_station'
 , 'get_hourly_full_all_stations', 'get_hourly_obs_all_stations', 'get_daily_full_all_stations'
 , 'get_daily_obs_all_stations', 'get_monthly_full_all_stations', 'get_monthly_obs_all_stations'
-, 'get_normals_all_stations', 'get_nearby_stations']
+, 'get_normals_all_stations', 'get_nearby_stations', 'get_bundle', 'SpooledResult', 'clear_cache']
+
+import io
+import os
+import threading
+from collections import OrderedDict
+
+# requests, csv, json and gzip are imported where they are used, so that
+# ``import meteostat`` stays cheap for short-lived processes.
+
+ENDPOINT = '//bulk.meteostat.net/v2/'
+
+HOURLY_CSV_DATA_HEADER = ('id', 'date', 'hour', 'temp', 'dwpt', 'rhum', 'prcp', 'snow', 'wdir', 'wspd', 'wpgt', 'pres', 'tsun', 'coco')
+DAILY_CSV_DATA_HEADER = ('id', 'date', 'tavg', 'tmin', 'tmax', 'prcp', 'snow', 'wdir', 'wspd', 'wpgt', 'pres', 'tsun')
+MONTHLY_CSV_DATA_HEADER = ('id', 'year', 'month', 'tavg', 'tmin', 'tmax', 'prcp', 'snow', 'wdir', 'wspd', 'wpgt', 'pres', 'tsun')
+NORMALS_CSV_DATA_HEADER = ('id', 'start', 'end', 'month', 'tmin', 'tmax', 'prcp', 'wspd', 'pres', 'tsun')
+
+_DATASETS = {
+    ('hourly', 'full'): ('hourly/full/', HOURLY_CSV_DATA_HEADER),
+    ('hourly', 'obs'): ('hourly/obs/', HOURLY_CSV_DATA_HEADER),
+    ('daily', 'full'): ('daily/full/', DAILY_CSV_DATA_HEADER),
+    ('daily', 'obs'): ('daily/obs/', DAILY_CSV_DATA_HEADER),
+    ('monthly', 'full'): ('monthly/full/', MONTHLY_CSV_DATA_HEADER),
+    ('monthly', 'obs'): ('monthly/obs/', MONTHLY_CSV_DATA_HEADER),
+    ('normals', None): ('normals/', NORMALS_CSV_DATA_HEADER)
+}
+
+class OptionsManager(object):
+    """Class for option managment"""
+
+    def __init__(self) -> None:
+
+        self.api_version='0'
+        self.use_https=True
+
+        # Where bulk files are requested from, e.g. '//mirror:8080/v2/'
+        # for a local mirror (see meteostat.mirror).
+        self.endpoint=ENDPOINT
+
+        # A meteostat.sources.Source to read bulk files from instead of
+        # the endpoint, e.g. FileSource('/mnt/meteostat/v2/'). An endpoint
+        # starting with file: selects a FileSource too.
+        self.source=None
+
+        proxies={
+            'http': os.environ.get('http_proxy', None),
+            'https': os.environ.get('https_proxy', None)
+        }
+
+        self.requests={'proxies': proxies}
+
+        # Seconds a bulk download may wait to connect or between bytes
+        # before it fails with a Timeout. None waits forever.
+        self.timeout=30
+
+        # Accumulated size (in characters) above which all-stations
+        # results spill to temporary files. None keeps everything in memory.
+        self.spill_threshold=None
+        self.spill_dir=None
+
+        # Concurrent identical requests share one download and parse.
+        self.single_flight=True
+
+        # Seconds a downloaded file is served from memory, None disables
+        # the response cache. Its size is bounded in characters.
+        self.cache_ttl=None
+        self.cache_max_size=256 << 20
+
+        # Directory where compressed bulk files are kept along with their
+        # validators, so they are only downloaded again when they change.
+        # None disables the on-disk bulk cache.
+        self.cache_dir=None
+
+        # Also keep decompressed station files in cache_dir, each with a
+        # sparse date -> offset index, so ranged queries (fetch() with
+        # start / end) seek instead of scanning whole files.
+        self.cache_decompressed=False
+
+        # Directory where parsed station results (json, pandas, arrow,
+        # csv) are pickled, keyed by a hash of the compressed payload and
+        # the output format. A file keeps one entry, replaced when its
+        # payload changes. Only point it at a trusted location. None
+        # disables the parsed cache.
+        self.parsed_cache_dir=None
+
+        # Ceiling of concurrent downloads in all-stations fetches, 1
+        # downloads one station at a time. The actual number adapts to
+        # latency, throughput and throttling below it (AIMD) unless
+        # adaptive_concurrency is False.
+        self.max_concurrency=8
+        self.adaptive_concurrency=True
+
+        # Workers of the other stages of all-stations fetches (download
+        # uses max_concurrency) and the capacity of the queues between
+        # them, which bounds the data held in between.
+        self.pipeline_workers={'decompress': 2, 'parse': 2}
+        self.pipeline_queue_size=16
+
+        # Bytes all-stations fetches may buffer, across pipeline stages
+        # and the result. Once reached, the result spills to a temporary
+        # file and no new download starts until buffered data drains.
+        # None only accounts (see get_metrics(), 'memory.*').
+        self.memory_budget=None
+
+    def __str__(self) -> str:
+        return "Endpoint: {}, Use https: {}".format(
+            self.endpoint, self.use_https
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+#    def __getattribute__(self, name: str) -> Any:
+#        return super().__getattribute__(name)
+    
+#    def __setattr__(self, name: str, value: Any) -> None:
+#        return super().__setattr__(name, value)
+
+def _get_options() -> OptionsManager:
+    """Returns the module options, built on first use."""
+
+    options = globals().get('options')
+
+    if options is None:
+        options = globals()['options'] = OptionsManager()
+
+    return options
+
+def __getattr__(name:str):
+    """Builds ``options`` lazily on first access."""
+
+    if name == 'options':
+        return _get_options()
+
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+def _get_endpoint_url() -> str:
+    """Create the endpoint url."""
+
+    options = _get_options()
+
+    if options.source is not None:
+        return options.source.base
+
+    return _get_configured_endpoint_url()
+
+def _get_configured_endpoint_url() -> str:
+    """The endpoint url of options.endpoint, whatever options.source."""
+
+    options = _get_options()
+
+    if options.endpoint.startswith(('http:', 'https:', 'file:')):
+        return options.endpoint
+
+    components = {
+        "http": "https:" if options.use_https else "http:",
+        "endpoint": options.endpoint
+    }
+
+    return "{http}{endpoint}".format(**components)
+
+# Default sources, by endpoint.
+_sources = {}
+
+def _get_source():
+    """The source bulk files are read from: options.source, a FileSource
+    for file: endpoints, an HTTPSource otherwise."""
+
+    from meteostat import sources
+
+    options = _get_options()
+
+    if options.source is not None:
+        return options.source
+
+    endpoint = _get_endpoint_url()
+
+    source = _sources.get(endpoint)
+
+    if source is None:
+        if endpoint.startswith('file:'):
+            source = sources.FileSource(endpoint)
+        else:
+            source = sources.HTTPSource()
+
+        _sources[endpoint] = source
+
+    return source
+
+def _fetch_payload(url:str = None, station:str = None, **kwargs) -> bytes:
+    """Compressed payload of url from the source, once for concurrent
+    callers. None on failure."""
+
+    source = _get_source()
+
+    if _get_options().single_flight:
+        return _single_flight.do(('payload', url), source.get_payload, url=url, station=station, **kwargs)
+
+    return source.get_payload(url=url, station=station, **kwargs)
+
+def _get_dataset(granularity:str = 'hourly', variant:str = 'full') -> tuple:
+    """Resolves a (granularity, variant) pair to its action and csv header."""
+
+    if granularity == 'normals':
+        variant = None
+
+    try:
+        return _DATASETS[(granularity, variant)]
+
+    except KeyError:
+        raise ValueError('Unknown dataset {}/{}'.format(granularity, variant))
+
+def _get_station_url(action:str = None, station:str = None) -> str:
+    """Create the url of a station file for the given action."""
+
+    components={
+        "action": action,
+        "station": station,
+        "extension": ".csv.gz"
+    }
+
+    return "{}{action}{station}{extension}".format(_get_endpoint_url(), **components)
+
+class _Flight(object):
+    """A call in progress, shared by every concurrent caller."""
+
+    def __init__(self) -> None:
+
+        self.done=threading.Event()
+        self.result=None
+        self.error=None
+        self.cancelled=False
+
+class _SingleFlight(object):
+    """Coalesces concurrent calls with the same key into one.
+
+    The first caller runs the function, the others wait for it and get
+    the same result (or the same exception). The key is forgotten as
+    soon as the call returns, so a failure is never served to later
+    callers. If the running call is cancelled (KeyboardInterrupt,
+    SystemExit, ...) the waiting callers retry on their own."""
+
+    def __init__(self) -> None:
+
+        self._lock=threading.Lock()
+        self._flights={}
+
+    def do(self, key, function, *args, **kwargs):
+
+        while True:
+            with self._lock:
+                flight = self._flights.get(key)
+
+                leader = flight is None
+
+                if leader:
+                    flight = self._flights[key] = _Flight()
+
+            if leader:
+                break
+
+            flight.done.wait()
+
+            if flight.cancelled:
+                continue
+
+            if flight.error is not None:
+                raise flight.error
+
+            return flight.result
+
+        try:
+            flight.result = function(*args, **kwargs)
+
+        except Exception as error:
+            flight.error = error
+
+            raise
+
+        except BaseException:
+            flight.cancelled = True
+
+            raise
+
+        finally:
+            with self._lock:
+                del self._flights[key]
+
+            flight.done.set()
+
+        return flight.result
+
+_single_flight = _SingleFlight()
+
+class _ResponseCache(object):
+    """In-memory LRU cache of decompressed endpoint data, keyed by url.
+
+    Entries expire after options.cache_ttl seconds and the least
+    recently used ones are dropped once the cached data goes over
+    options.cache_max_size characters. Every request is counted, hit or
+    miss, so the prefetch scheduler can tell which urls are hot."""
+
+    def __init__(self) -> None:
+
+        self._lock=threading.Lock()
+        self._entries=OrderedDict()
+        self._size=0
+        self.hits={}
+
+    def record(self, url:str) -> None:
+        """Counts a request for url."""
+
+        with self._lock:
+            self.hits[url] = self.hits.get(url, 0) + 1
+
+    def get(self, url:str, ttl:float = None) -> str:
+        """Cached data of url, None when missing or expired."""
+
+        import time
+
+        with self._lock:
+            entry = self._entries.get(url)
+
+            if entry is None or ttl is None or time.time() - entry[0] > ttl:
+                return None
+
+            self._entries.move_to_end(url)
+
+            return entry[1]
+
+    def age(self, url:str) -> float:
+        """Seconds since url was stored, None when missing."""
+
+        import time
+
+        with self._lock:
+            entry = self._entries.get(url)
+
+        return None if entry is None else time.time() - entry[0]
+
+    def put(self, url:str, data:str, max_size:int = None) -> None:
+        """Stores data for url, evicting least recently used entries."""
+
+        import time
+
+        with self._lock:
+            previous = self._entries.pop(url, None)
+
+            if previous is not None:
+                self._size -= len(previous[1])
+
+            self._entries[url] = (time.time(), data)
+            self._size += len(data)
+
+            while max_size is not None and self._size > max_size and len(self._entries) > 1:
+                evicted_url, (_, evicted) = self._entries.popitem(last=False)
+
+                self._size -= len(evicted)
+
+                # Its counter goes too, so counters stay bounded by the cache.
+                self.hits.pop(evicted_url, None)
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits.clear()
+
+_cache = _ResponseCache()
+
+def clear_cache() -> None:
+    """Empties the response cache and its access counters."""
+
+    _cache.clear()
+
+def _get_data_from_endpoint(url:str = None, isstation:bool = True, station:str = None, **kwargs) -> str:
+    """Gets data from the stablished endpoint, through the response cache.
+    Concurrent requests for the same url share one download."""
+
+    _cache.record(url)
+
+    options = _get_options()
+
+    my_string = _cache.get(url, ttl=options.cache_ttl)
+
+    if my_string is None:
+        my_string = _refresh_data_from_endpoint(url=url, station=station, **kwargs)
+
+    if my_string is None:
+        return ""
+
+    if isstation == True:
+        return _add_station(data=my_string, station=station)
+
+    return my_string
+
+def _add_station(data:str = None, station:str = None) -> str:
+    """Prefixes every row of a raw station file with the station id."""
+
+    result = [ '{},{}'.format( station, row ) for row in data.splitlines() ]
+
+    return "\r\n".join( result )
+
+def _refresh_data_from_endpoint(url:str = None, station:str = None, **kwargs) -> str:
+    """Downloads url (once for concurrent callers) and stores it in the
+    response cache when enabled."""
+
+    options = _get_options()
+
+    if options.single_flight:
+        my_string = _single_flight.do(('data', url), _download_data_from_endpoint, url=url, station=station, **kwargs)
+    else:
+        my_string = _download_data_from_endpoint(url=url, station=station, **kwargs)
+
+    if my_string is not None and options.cache_ttl is not None:
+        _cache.put(url, my_string, max_size=options.cache_max_size)
+
+    return my_string
+
+def _download_data_from_endpoint(url:str = None, station:str = None, **kwargs) -> str:
+    """Downloads and decompresses data from the stablished endpoint, None
+    on failure."""
+
+    import gzip
+
+    payload = _get_source().get_payload(url=url, station=station, **kwargs)
+
+    if payload is None:
+        return None
+
+    data = gzip.decompress(payload)
+
+    return data.decode('utf-8')
+
+def _get_cache_path(url:str = None, cache_dir:str = None) -> str:
+    """Path of url in the on-disk bulk cache, None when disabled or when
+    url is not under the endpoint. An explicit cache_dir (the mirror's)
+    is used instead of options.cache_dir, for urls of options.endpoint."""
+
+    if cache_dir is not None:
+        endpoint = _get_configured_endpoint_url()
+
+    else:
+        cache_dir = _get_options().cache_dir
+
+        endpoint = _get_endpoint_url()
+
+        # Local sources are read directly, there is nothing to cache.
+        if cache_dir is not None and not _get_source().remote:
+            return None
+
+    if cache_dir is None or not url.startswith(endpoint):
+        return None
+
+    relative = url[len(endpoint):]
+
+    parts = [ part for part in relative.split('/') if part ]
+
+    if not parts or any(part in ('.', '..') for part in parts):
+        return None
+
+    return os.path.join(cache_dir, *parts)
+
+def _read_cache_meta(path:str = None) -> dict:
+    """Validators stored next to a cached file, None when not cached."""
+
+    import json
+
+    try:
+        with open(path + '.meta', 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+
+    except (OSError, ValueError):
+        return None
+
+    return meta if os.path.exists(path) else None
+
+def _replace_file(path:str = None, data:bytes = None) -> None:
+    """Atomically replaces path with data, through a temporary file of its
+    own, so concurrent writers (threads or processes) never share one."""
+
+    import tempfile
+
+    descriptor, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+        prefix=os.path.basename(path) + '.', suffix='.tmp')
+
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(data)
+
+        os.replace(tmp, path)
+
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+        raise
+
+def _write_cache_file(path:str = None, payload:bytes = None, meta:dict = None) -> None:
+    """Atomically stores a file and its validators in the bulk cache."""
+
+    import json
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    _replace_file(path, payload)
+
+    _replace_file(path + '.meta', json.dumps(meta).encode('utf-8'))
+
+def _get_decompressed_path(path:str = None) -> str:
+    """Path of the decompressed copy of a cached bulk file."""
+
+    return path[:-3] if path.endswith('.gz') else path + '.csv'
+
+def _write_decompressed_file(path:str = None, data:bytes = None) -> None:
+    """Stores a decompressed bulk file. When the new data only adds rows
+    to the stored copy they are appended, so its index is extended
+    rather than rebuilt."""
+
+    from meteostat.offsets import INDEX_SUFFIX, build_offset_index
+
+    try:
+        with open(path, 'rb') as file:
+            current = file.read()
+
+    except OSError:
+        current = None
+
+    if current is not None and data.startswith(current):
+        if len(data) > len(current):
+            with open(path, 'ab') as file:
+                file.write(data[len(current):])
+        else:
+            # Unchanged, mark the copy as up to date.
+            os.utime(path)
+
+    else:
+        if os.path.exists(path + INDEX_SUFFIX):
+            os.remove(path + INDEX_SUFFIX)
+
+        _replace_file(path, data)
+
+    build_offset_index(path)
+
+def _get_range_from_endpoint(url:str = None, station:str = None, start:int = None, end:int = None, **kwargs) -> str:
+    """Raw rows of url between two days (YYYYMMDD, inclusive), read
+    through the decompressed copy in the bulk cache. Falls back to the
+    whole file when that cache is disabled."""
+
+    options = _get_options()
+
+    path = _get_cache_path(url) if options.cache_decompressed else None
+
+    if path is None:
+        return _get_data_from_endpoint(url=url, isstation=False, station=station, **kwargs)
+
+    import gzip
+
+    from meteostat.offsets import read_range
+
+    payload = _fetch_payload(url=url, station=station, **kwargs)
+
+    if payload is None:
+        return ""
+
+    decompressed = _get_decompressed_path(path)
+
+    # The copy is current unless the compressed file was written since.
+    if not os.path.exists(decompressed) or os.path.getmtime(decompressed) < os.path.getmtime(path):
+        _single_flight.do(('decompressed', url), _write_decompressed_file, decompressed, gzip.decompress(payload))
+
+    return read_range(decompressed, start=start, end=end)
+
+# Outcome of the last download of the current thread.
+_transfer = threading.local()
+
+def _download_payload(url:str = None, station:str = None, cache_dir:str = None, timeout:float = None, **kwargs) -> bytes:
+    """Downloads the compressed payload of url, None on failure.
+
+    With the on-disk bulk cache enabled (or an explicit cache_dir) the
+    request is conditional (If-None-Match / If-Modified-Since) and an
+    unchanged file is read from disk instead of downloaded again. timeout
+    defaults to options.timeout."""
+
+    import requests
+    from requests.exceptions import HTTPError
+
+    path = _get_cache_path(url, cache_dir=cache_dir)
+
+    meta = _read_cache_meta(path) if path is not None else None
+
+    headers = {}
+
+    if meta is not None:
+        if meta.get('etag'):
+            headers['If-None-Match'] = meta['etag']
+
+        if meta.get('last_modified'):
+            headers['If-Modified-Since'] = meta['last_modified']
+
+    try:
+        response = requests.get(url, headers=headers,
+            timeout=timeout if timeout is not None else _get_options().timeout)
+
+        response.raise_for_status()
+    
+    except HTTPError as http_err:
+        # Throttling and server errors slow down bulk fetches, a missing
+        # station does not.
+        _transfer.throttled = response.status_code == 429 or response.status_code >= 500
+
+        print('Invalid request for stations {}. Retrieved: {}'.format(
+            station, response.text
+            )
+        )
+
+        return None
+
+    if response.status_code == 304 and meta is not None:
+        # Remember when the cached copy was last confirmed.
+        os.utime(path + '.meta')
+
+        with open(path, 'rb') as file:
+            return file.read()
+
+    if path is not None:
+        _write_cache_file(path, response.content, {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        })
+
+    return response.content
+
+def _iter_lines_from_endpoint(url:str = None, station:str = None, **kwargs):
+    """Streams decompressed lines from the stablished endpoint, without
+    holding the whole file in memory."""
+
+    return _get_source().iter_lines(url=url, station=station, **kwargs)
+
+def _iter_lines_from_http(url:str = None, station:str = None, timeout:float = None, **kwargs):
+    """Streams decompressed lines of an HTTP url, timeout defaults to
+    options.timeout."""
+
+    import gzip
+
+    import requests
+    from requests.exceptions import HTTPError
+
+    response = requests.get(url, stream=True,
+        timeout=timeout if timeout is not None else _get_options().timeout)
+
+    try:
+        response.raise_for_status()
+
+    except HTTPError as http_err:
+        print('Invalid request for stations {}. Retrieved: {}'.format(
+            station, response.text
+            )
+        )
+
+        return
+
+    response.raw.decode_content = True
+
+    with gzip.GzipFile(fileobj=response.raw) as file:
+        for line in io.TextIOWrapper(file, encoding='utf-8', newline=''):
+            line = line.rstrip('\r\n')
+
+            if line:
+                yield line
+
+def _get_json_from_csv(data:str = None, fieldnames:tuple = None, **kwargs) -> list:
+    """Parses data from csv to json dict."""
+
+    import csv
+
+    reader = csv.DictReader(data.splitlines(), fieldnames=fieldnames, delimiter=',', lineterminator='\r\n')
+
+    result = [ row for row in reader ]
+
+    return result
+
+class SpooledResult(object):
+    """File-backed result of an all-stations request.
+
+    Returned instead of a str (csv) or a list (json) once the accumulated
+    data goes over the spill threshold. Iterating yields csv lines, or
+    dicts for json, read straight from the temporary file."""
+
+    def __init__(self, file, format:str = 'csv', fieldnames:tuple = None) -> None:
+
+        self.file = file
+        self.format = format
+        self.fieldnames = fieldnames
+
+        # The spill leaves the file at its end, read() starts over.
+        self.file.seek(0)
+
+    def __iter__(self):
+        self.file.seek(0)
+
+        if self.format == 'json':
+            import csv
+
+            # Skip the header, fieldnames are known.
+            self.file.readline()
+
+            return iter(csv.DictReader(self.file, fieldnames=self.fieldnames, delimiter=',', lineterminator='\r\n'))
+
+        return ( line.rstrip('\r\n') for line in self.file )
+
+    def read(self, size:int = -1) -> str:
+        """Reads up to size characters of csv, from the current position
+        (the start of the csv for a new result)."""
+
+        return self.file.read(size)
+
+    def iter_chunks(self, size:int = 1 << 20):
+        """Yields the csv text in chunks of up to size characters."""
+
+        self.file.seek(0)
+
+        while True:
+            chunk = self.file.read(size)
+
+            if not chunk:
+                break
+
+            yield chunk
+
+    def close(self) -> None:
+        """Closes and removes the temporary file."""
+
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __str__(self) -> str:
+        return "SpooledResult: {} spilled to disk".format(self.format)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class _SpillBuffer(object):
+    """Accumulates csv text in memory, moving it to a temporary file once
+    it goes over threshold."""
+
+    def __init__(self, threshold:int = None, directory:str = None) -> None:
+
+        self.threshold=threshold
+        self.directory=directory
+        self.chunks=[]
+        self.size=0
+        self.file=None
+
+    def write(self, text:str) -> None:
+
+        if self.file is not None:
+            self.file.write(text)
+
+            return
+
+        self.chunks.append(text)
+        self.size += len(text)
+
+        if self.threshold is not None and self.size > self.threshold:
+            self.spill()
+
+    def spill(self) -> None:
+        """Moves the data to the temporary file, e.g. when the memory
+        budget of a bulk job is reached."""
+
+        if self.file is not None:
+            return
+
+        import tempfile
+
+        self.file = tempfile.TemporaryFile(mode='w+', encoding='utf-8', newline='', dir=self.directory)
+        self.file.writelines(self.chunks)
+
+        self.chunks = []
+
+    @property
+    def in_memory(self) -> int:
+        """Characters held in memory."""
+
+        return 0 if self.file is not None else self.size
+
+    def getvalue(self) -> str:
+        return ''.join(self.chunks)
+
+def _get_station(action:str = None, fieldnames:tuple = None, station:str = None, format:str = 'csv', **kwargs):
+    """Gets the given action for a station in the requested format.
+
+    Concurrent requests for the same station, action and format share
+    one download and one parse, hence the same result object: treat it
+    as read-only."""
+
+    url = _get_station_url(action=action, station=station)
+
+    if not _get_options().single_flight:
+        return _load_station(url=url, fieldnames=fieldnames, station=station, format=format, **kwargs)
+
+    return _single_flight.do(('station', url, format),
+        _load_station, url=url, fieldnames=fieldnames, station=station, format=format, **kwargs)
+
+def _load_station(url:str = None, fieldnames:tuple = None, station:str = None, format:str = 'csv', **kwargs):
+    """Downloads and parses a station file."""
+
+    if _get_options().parsed_cache_dir is not None:
+        return _load_station_from_parsed_cache(url=url, fieldnames=fieldnames, station=station, format=format)
+
+    data = _get_data_from_endpoint(url=url, isstation=False, station=station)
+
+    return _parse_station(data=data, fieldnames=fieldnames, station=station, format=format)
+
+def _parse_station(data:str = None, fieldnames:tuple = None, station:str = None, format:str = 'csv'):
+    """Parses a raw station file into the requested format."""
+
+    if format in ('pandas', 'arrow'):
+        from meteostat import columnar
+
+        return columnar._get_frame_from_csv(data=data, fieldnames=fieldnames, station=station, format=format)
+
+    if format == 'compact':
+        from meteostat.compact import CompactTable
+
+        return CompactTable(fieldnames).append(data, station=station)
+
+    response = _add_station(data=data, station=station)
+
+    if format == 'json':
+        return _get_json_from_csv(data=response, fieldnames=fieldnames)
+
+    header = ",".join(fieldnames)
+
+    return header + '\r\n' + response
+
+# Bump when the parsed form of a format or the layout of the cache
+# changes, older entries are then ignored.
+PARSED_CACHE_VERSION = 2
+
+def _get_parsed_cache_path(payload:bytes = None, fieldnames:tuple = None, station:str = None, format:str = 'csv',
+    url:str = None) -> str:
+    """Path of the parsed form of a compressed payload,
+    ``<parsed_cache_dir>/<slot>/<digest>.pickle``. The slot is a hash of
+    the url and of everything that shapes the parsed result, the digest a
+    hash of the payload as well."""
+
+    import hashlib
+
+    key = repr((PARSED_CACHE_VERSION, url, format, tuple(fieldnames), station)).encode('utf-8')
+
+    slot = hashlib.blake2b(key, digest_size=16).hexdigest()
+
+    digest = hashlib.blake2b(payload, digest_size=20)
+
+    digest.update(key)
+
+    return os.path.join(_get_options().parsed_cache_dir, slot, digest.hexdigest() + '.pickle')
+
+def _evict_parsed_cache(path:str) -> None:
+    """Removes the other entries of the slot of path, parsed from
+    earlier payloads of the same file. A slot holds one entry, so the
+    cache is bounded by the number of files and formats requested."""
+
+    directory = os.path.dirname(path)
+
+    for name in os.listdir(directory):
+        if name.endswith('.pickle') and name != os.path.basename(path):
+            try:
+                os.remove(os.path.join(directory, name))
+
+            except FileNotFoundError:
+                pass
+
+def _load_station_from_parsed_cache(url:str = None, fieldnames:tuple = None, station:str = None, format:str = 'csv'):
+    """Parses a station file once per distinct payload: a download that
+    is byte-identical to an earlier one costs a hash and an unpickle
+    instead of decompression and parsing."""
+
+    import gzip
+    import pickle
+
+    from meteostat import metrics
+
+    # Counted as a request, like reads through the response cache.
+    _cache.record(url)
+
+    payload = _fetch_payload(url=url, station=station)
+
+    if payload is None:
+        return _parse_station(data="", fieldnames=fieldnames, station=station, format=format)
+
+    path = _get_parsed_cache_path(payload=payload, fieldnames=fieldnames, station=station, format=format, url=url)
+
+    try:
+        with open(path, 'rb') as file:
+            result = pickle.load(file)
+
+        metrics.increment('parsed_cache.hits')
+
+        return result
+
+    except FileNotFoundError:
+        pass
+
+    except Exception as error:
+        # A truncated or foreign entry is replaced below.
+        print('Ignoring unreadable parsed cache entry {}: {}'.format(path, error))
+
+    metrics.increment('parsed_cache.misses')
+
+    data = gzip.decompress(payload).decode('utf-8')
+
+    result = _parse_station(data=data, fieldnames=fieldnames, station=station, format=format)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    tmp = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.get_ident())
+
+    with open(tmp, 'wb') as file:
+        pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    os.replace(tmp, path)
+
+    _evict_parsed_cache(path)
+
+    return result
+
+def _map_stations(function = None, stations:list = None, failed = None):
+    """Yields function(station) for every station, in order, with up to
+    options.max_concurrency calls in flight under an adaptive limit."""
+
+    options = _get_options()
+
+    if options.max_concurrency <= 1:
+        return map(function, stations)
+
+    from meteostat.concurrency import AdaptiveLimiter, map_ordered
+
+    limiter = AdaptiveLimiter(
+        initial=2 if options.adaptive_concurrency else options.max_concurrency,
+        minimum=1 if options.adaptive_concurrency else options.max_concurrency,
+        maximum=options.max_concurrency
+    )
+
+    return map_ordered(function, stations, limiter, failed=failed)
+
+def _get_station_pipeline(action:str = None, budget = None):
+    """Pipeline turning station ids into their rows (prefixed with the
+    id): download -> decompress -> parse, each stage with its own workers
+    so network waits overlap with decompression and parsing."""
+
+    import gzip
+
+    from meteostat.pipeline import Pipeline
+
+    options = _get_options()
+
+    limiter = None
+
+    if options.max_concurrency > 1:
+        from meteostat.concurrency import AdaptiveLimiter
+
+        limiter = AdaptiveLimiter(
+            initial=2 if options.adaptive_concurrency else options.max_concurrency,
+            minimum=1 if options.adaptive_concurrency else options.max_concurrency,
+            maximum=options.max_concurrency
+        )
+
+    def download(station):
+        url = _get_station_url(action=action, station=station)
+
+        _cache.record(url)
+
+        data = _cache.get(url, ttl=options.cache_ttl)
+
+        if data is not None:
+            return station, url, None, data
+
+        _transfer.throttled = False
+
+        # A station that fails (connection reset, timeout, ...) is skipped,
+        # the limiter counts it as an error and the others go on.
+        try:
+            if limiter is None:
+                payload = _fetch_payload(url=url, station=station)
+            else:
+                payload = limiter.call(_fetch_payload, url=url, station=station, failed=lambda payload: _transfer.throttled)
+
+        except OSError as error:
+            print('Invalid request for stations {}. Retrieved: {}'.format(station, error))
+
+            return station, url, None, None
+
+        return station, url, payload, None
+
+    def decompress(item):
+        station, url, payload, data = item
+
+        if data is None and payload is not None:
+            try:
+                data = gzip.decompress(payload).decode('utf-8')
 
-import os
-import csv
-import json
-import gzip
+            except (OSError, EOFError, UnicodeDecodeError) as error:
+                # A truncated or corrupt file, skipped like a failed download.
+                if limiter is not None:
+                    limiter.fail()
 
-import requests
-from requests.exceptions import HTTPError
+                print('Invalid request for stations {}. Retrieved: {}'.format(station, error))
 
-ENDPOINT = '//bulk.meteostat.net/v2/'
+                return station, None
 
-HOURLY_CSV_DATA_HEADER = ('id', 'date', 'hour', 'temp', 'dwpt', 'rhum', 'prcp', 'snow', 'wdir', 'wspd', 'wpgt', 'pres', 'tsun', 'coco')
-DAILY_CSV_DATA_HEADER = ('id', 'date', 'tavg', 'tmin', 'tmax', 'prcp', 'snow', 'wdir', 'wspd', 'wpgt', 'pres', 'tsun')
-MONTHLY_CSV_DATA_HEADER = ('id', 'year', 'month', 'tavg', 'tmin', 'tmax', 'prcp', 'snow', 'wdir', 'wspd', 'wpgt', 'pres', 'tsun')
-NORMALS_CSV_DATA_HEADER = ('id', 'start', 'end', 'month', 'tmin', 'tmax', 'prcp', 'wspd', 'pres', 'tsun')
+            if options.cache_ttl is not None:
+                _cache.put(url, data, max_size=options.cache_max_size)
 
-class OptionsManager(object):
-    """Class for option managment"""
+        return station, data
 
-    def __init__(self) -> None:
+    def parse(item):
+        station, data = item
 
-        self.api_version='0'
-        self.use_https=True
+        return _add_station(data=data, station=station) if data else ""
 
-        proxies={
-            'http': os.environ.get('http_proxy', None),
-            'https': os.environ.get('https_proxy', None)
-        }
+    workers = options.pipeline_workers
 
-        self.requests={'proxies': proxies}
+    return Pipeline([
+        ('download', download, max(1, options.max_concurrency)),
+        ('decompress', decompress, workers.get('decompress', 1)),
+        ('parse', parse, workers.get('parse', 1))
+    ], queue_size=options.pipeline_queue_size, budget=budget)
 
-    def __str__(self) -> str:
-        return "Endpoint: {}, Use https: {}".format(
-            ENDPOINT, self.use_https
-        )
+def _get_all_stations(action:str = None, fieldnames:tuple = None, format:str = 'csv', memory_limit:int = None,
+    shard_index:int = None, shard_count:int = None, balance:bool = False, **kwargs):
+    """Concatenates the given action for every station listed in
+    get_stations_full() (or of one shard of them), spilling to disk past
+    memory_limit."""
 
-    def __repr__(self) -> str:
-        return self.__str__()
+    if memory_limit is None:
+        memory_limit = _get_options().spill_threshold
 
-#    def __getattribute__(self, name: str) -> Any:
-#        return super().__getattribute__(name)
-    
-#    def __setattr__(self, name: str, value: Any) -> None:
-#        return super().__setattr__(name, value)
+    from meteostat.sharding import _check_shard, shard_stations
 
-options=OptionsManager()
+    # Before anything is downloaded.
+    _check_shard(shard_index, shard_count)
 
-def _get_endpoint_url() -> str:
-    """Create the endpoint url."""
+    buffer = _SpillBuffer(threshold=memory_limit, directory=_get_options().spill_dir)
 
-    components = {
-        "http": "https:" if options.use_https else "http:",
-        "endpoint": ENDPOINT
-    }
+    buffer.write(",".join(fieldnames) + '\r\n')
 
-    return "{http}{endpoint}".format(**components)
+    stations = get_stations_full()
 
-def _get_data_from_endpoint(url:str = None, isstation:bool = True, station:str = None, **kwargs) -> str:
-    """Gets data from the stablished endpoint."""
+    if shard_count is not None:
+        stations = shard_stations(stations, shard_index=shard_index, shard_count=shard_count,
+            balance=balance, granularity=action.split('/')[0])
 
-    try:
-        response = requests.get(url)
+    ids = [ line['id'] for line in stations ]
 
-        response.raise_for_status()
-    
-    except HTTPError as http_err:
-        print('Invalid request for stations {}. Retrieved: {}'.format(
-            station, response.text
-            )
-        )
+    from meteostat.memory import MemoryBudget, sample_memory
 
-        return ""
+    budget = MemoryBudget(_get_options().memory_budget)
 
-    else:
-        data = gzip.decompress(response.content)
+    if format == 'compact':
+        from meteostat.compact import CompactTable
+        from meteostat.metrics import set_gauge
 
-        my_string = data.decode('utf-8')
+        # Rows go straight into the table, no text is accumulated. The
+        # table cannot spill, so it is left out of admission control
+        # (new downloads would wait for it forever) and fails once it
+        # alone goes over the budget.
+        table = CompactTable(fieldnames)
 
-        if isstation == True:
+        responses = _get_station_pipeline(action, budget=budget).run(ids)
 
-            result = [ '{},{}'.format( station, row ) for row in my_string.splitlines() ]
+        try:
+            for response in responses:
+                table.append(response)
 
-            return "\r\n".join( result )
+                set_gauge('memory.compact.bytes', table.nbytes)
 
-        return my_string
+                if budget.limit is not None and table.nbytes > budget.limit:
+                    raise MemoryError('The compact result went over options.memory_budget ({} bytes), '
+                        'raise it or use format=\'csv\', which spills'.format(budget.limit))
 
-def _get_json_from_csv(data:str = None, fieldnames:tuple = None, **kwargs) -> list:
-    """Parses data from csv to json dict."""
+        finally:
+            responses.close()
 
-    reader = csv.DictReader(data.splitlines(), fieldnames=fieldnames, delimiter=',', lineterminator='\r\n')
+        sample_memory()
 
-    result = [ row for row in reader ]
+        return table
 
-    return result
+    for response in _get_station_pipeline(action, budget=budget).run(ids):
+        if response:
+            buffer.write(response + '\r\n')
+
+            budget.set('sink', buffer.in_memory)
+
+            # Over budget, the result is the first thing to go to disk.
+            if budget.exceeded and buffer.in_memory:
+                buffer.spill()
+
+                budget.set('sink', 0)
+
+    sample_memory()
+
+    if buffer.file is not None:
+        return SpooledResult(buffer.file, format=format, fieldnames=fieldnames)
+
+    data = buffer.getvalue()
+
+    if format == 'json':
+        # Skip the header, fieldnames are known.
+        return _get_json_from_csv(data=data[data.index('\r\n') + 2:], fieldnames=fieldnames)
+
+    return data
 
 
 def get_stations_full(**kwargs) -> json:
@@ -155,6 +1182,8 @@ def get_stations_full(**kwargs) -> json:
 
     response = _get_data_from_endpoint(url=url, isstation=False, station=None)
 
+    import json
+
     return json.loads(response)
 
 def get_stations_lite(**kwargs) -> json:
@@ -187,6 +1216,8 @@ def get_stations_lite(**kwargs) -> json:
 
     response = _get_data_from_endpoint(url=url, isstation=False, station=None)
 
+    import json
+
     return json.loads(response)    
 
 def get_hourly_full_station(station:str = '47423', format:str = 'csv', **kwargs) -> str:
@@ -198,7 +1229,9 @@ def get_hourly_full_station(station:str = '47423', format:str = 'csv', **kwargs)
         The station identifier to be requested for. Default = 47423.
     
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json, pandas (a DataFrame), arrow (a pyarrow Table) and compact
+        (a CompactTable).
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -206,35 +1239,18 @@ def get_hourly_full_station(station:str = '47423', format:str = 'csv', **kwargs)
     
     Returns
     -------
-    str (json or csv)
+    str (json or csv), DataFrame or Table
         the requested data, always dep
 
     See: 
     
         https://dev.meteostat.net/bulk/hourly.html#endpoints
     
-    for more details"""    
-
-    endpoint = _get_endpoint_url()
-
-    components={
-        "action": "hourly/full/",
-        "station": station,
-        "extension": ".csv.gz"
-    }
-
-    url = "{}{action}{station}{extension}".format(endpoint, **components)
-
-    response = _get_data_from_endpoint(url=url, station=station)
-
-    if format == 'json':
-        data = _get_json_from_csv(data=response, fieldnames=HOURLY_CSV_DATA_HEADER)
+    for more details"""
 
-        return data
-    else:
-        header = ",".join(HOURLY_CSV_DATA_HEADER)
+    action, fieldnames = _get_dataset('hourly', 'full')
 
-        return header + '\r\n' + response
+    return _get_station(action=action, fieldnames=fieldnames, station=station, format=format, **kwargs)
 
 def get_hourly_obs_station(station:str = '47423', format:str = 'csv', **kwargs) -> str:
     """retrieves station hourly observation information.
@@ -245,7 +1261,9 @@ def get_hourly_obs_station(station:str = '47423', format:str = 'csv', **kwargs)
         The station identifier to be requested for. Default = 47423.
     
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json, pandas (a DataFrame), arrow (a pyarrow Table) and compact
+        (a CompactTable).
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -253,35 +1271,18 @@ def get_hourly_obs_station(station:str = '47423', format:str = 'csv', **kwargs)
     
     Returns
     -------
-    str (json or csv)
+    str (json or csv), DataFrame or Table
         the requested data, always dep
 
     See: 
     
         https://dev.meteostat.net/bulk/hourly.html#endpoints
     
-    for more details"""    
-
-    endpoint = _get_endpoint_url()
-
-    components={
-        "action": "hourly/obs/",
-        "station": station,
-        "extension": ".csv.gz"
-    }
-
-    url = "{}{action}{station}{extension}".format(endpoint, **components)
-
-    response = _get_data_from_endpoint(url=url, station=station)
-
-    if format == 'json':
-        data = _get_json_from_csv(data=response, fieldnames=HOURLY_CSV_DATA_HEADER)
+    for more details"""
 
-        return data
-    else:
-        header = ",".join(HOURLY_CSV_DATA_HEADER)
+    action, fieldnames = _get_dataset('hourly', 'obs')
 
-        return header + '\r\n' + response
+    return _get_station(action=action, fieldnames=fieldnames, station=station, format=format, **kwargs)
 
 def get_daily_full_station(station:str = '47423', format:str = 'csv', **kwargs) -> str:
     """retrieves station daily full information. 
@@ -292,7 +1293,9 @@ def get_daily_full_station(station:str = '47423', format:str = 'csv', **kwargs)
         The station identifier to be requested for. Default = 47423.
     
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json, pandas (a DataFrame), arrow (a pyarrow Table) and compact
+        (a CompactTable).
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -300,35 +1303,18 @@ def get_daily_full_station(station:str = '47423', format:str = 'csv', **kwargs)
     
     Returns
     -------
-    str (json or csv)
+    str (json or csv), DataFrame or Table
         the requested data, always dep
 
     See: 
     
         https://dev.meteostat.net/bulk/daily.html
     
-    for more details"""     
-
-    endpoint = _get_endpoint_url()
-
-    components={
-        "action": "daily/full/",
-        "station": station,
-        "extension": ".csv.gz"
-    }
-
-    url = "{}{action}{station}{extension}".format(endpoint, **components)
-
-    response = _get_data_from_endpoint(url=url, station=station)
-
-    if format == 'json':
-        data = _get_json_from_csv(data=response, fieldnames=DAILY_CSV_DATA_HEADER)
+    for more details"""
 
-        return data
-    else:
-        header = ",".join(DAILY_CSV_DATA_HEADER)
+    action, fieldnames = _get_dataset('daily', 'full')
 
-        return header + '\r\n' + response
+    return _get_station(action=action, fieldnames=fieldnames, station=station, format=format, **kwargs)
 
 def get_daily_obs_station(station:str = '47423', format:str = 'csv', **kwargs) -> str:
     """retrieves station daily observation information.
@@ -339,7 +1325,9 @@ def get_daily_obs_station(station:str = '47423', format:str = 'csv', **kwargs) -
         The station identifier to be requested for. Default = 47423.
     
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json, pandas (a DataFrame), arrow (a pyarrow Table) and compact
+        (a CompactTable).
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -347,35 +1335,18 @@ def get_daily_obs_station(station:str = '47423', format:str = 'csv', **kwargs) -
     
     Returns
     -------
-    str (json or csv)
+    str (json or csv), DataFrame or Table
         the requested data, always dep
 
     See: 
     
         https://dev.meteostat.net/bulk/daily.html
     
-    for more details"""  
-
-    endpoint = _get_endpoint_url()
-
-    components={
-        "action": "daily/obs/",
-        "station": station,
-        "extension": ".csv.gz"
-    }
-
-    url = "{}{action}{station}{extension}".format(endpoint, **components)
-
-    response = _get_data_from_endpoint(url=url, station=station)
-
-    if format == 'json':
-        data = _get_json_from_csv(data=response, fieldnames=DAILY_CSV_DATA_HEADER)
+    for more details"""
 
-        return data
-    else:
-        header = ",".join(DAILY_CSV_DATA_HEADER)
+    action, fieldnames = _get_dataset('daily', 'obs')
 
-        return header + '\r\n' + response
+    return _get_station(action=action, fieldnames=fieldnames, station=station, format=format, **kwargs)
 
 def get_monthly_full_station(station:str = '47423', format:str = 'csv', **kwargs) -> str:
     """retrieves station monthly full information.
@@ -386,7 +1357,9 @@ def get_monthly_full_station(station:str = '47423', format:str = 'csv', **kwargs
         The station identifier to be requested for. Default = 47423.
     
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json, pandas (a DataFrame), arrow (a pyarrow Table) and compact
+        (a CompactTable).
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -394,7 +1367,7 @@ def get_monthly_full_station(station:str = '47423', format:str = 'csv', **kwargs
     
     Returns
     -------
-    str (json or csv)
+    str (json or csv), DataFrame or Table
         the requested data, always dep
 
     See: 
@@ -403,26 +1376,9 @@ def get_monthly_full_station(station:str = '47423', format:str = 'csv', **kwargs
     
     for more details"""
 
-    endpoint = _get_endpoint_url()
-
-    components={
-        "action": "monthly/full/",
-        "station": station,
-        "extension": ".csv.gz"
-    }
-
-    url = "{}{action}{station}{extension}".format(endpoint, **components)
-
-    response = _get_data_from_endpoint(url=url, station=station)
-
-    if format == 'json':
-        data = _get_json_from_csv(data=response, fieldnames=MONTHLY_CSV_DATA_HEADER)
-
-        return data
-    else:
-        header = ",".join(MONTHLY_CSV_DATA_HEADER)
+    action, fieldnames = _get_dataset('monthly', 'full')
 
-        return header + '\r\n' + response
+    return _get_station(action=action, fieldnames=fieldnames, station=station, format=format, **kwargs)
 
 def get_monthly_obs_station(station:str = '47423', format:str = 'csv', **kwargs) -> str:
     """retrieves station monthly obs information.
@@ -433,7 +1389,9 @@ def get_monthly_obs_station(station:str = '47423', format:str = 'csv', **kwargs)
         The station identifier to be requested for. Default = 47423.
     
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json, pandas (a DataFrame), arrow (a pyarrow Table) and compact
+        (a CompactTable).
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -441,7 +1399,7 @@ def get_monthly_obs_station(station:str = '47423', format:str = 'csv', **kwargs)
     
     Returns
     -------
-    str (json or csv)
+    str (json or csv), DataFrame or Table
         the requested data, always dep
 
     See: 
@@ -450,26 +1408,9 @@ def get_monthly_obs_station(station:str = '47423', format:str = 'csv', **kwargs)
     
     for more details"""
 
-    endpoint = _get_endpoint_url()
-
-    components={
-        "action": "monthly/obs/",
-        "station": station,
-        "extension": ".csv.gz"
-    }
-
-    url = "{}{action}{station}{extension}".format(endpoint, **components)
-
-    response = _get_data_from_endpoint(url=url, station=station)
-
-    if format == 'json':
-        data = _get_json_from_csv(data=response, fieldnames=MONTHLY_CSV_DATA_HEADER)
-
-        return data
-    else:
-        header = ",".join(MONTHLY_CSV_DATA_HEADER)
+    action, fieldnames = _get_dataset('monthly', 'obs')
 
-        return header + '\r\n' + response
+    return _get_station(action=action, fieldnames=fieldnames, station=station, format=format, **kwargs)
 
 def get_normals_station(station:str = '47423', format:str = 'csv', **kwargs) -> str:
     """retrieves station normals information.
@@ -480,7 +1421,9 @@ def get_normals_station(station:str = '47423', format:str = 'csv', **kwargs) ->
         The station identifier to be requested for. Default = 47423.
     
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json, pandas (a DataFrame), arrow (a pyarrow Table) and compact
+        (a CompactTable).
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -488,7 +1431,7 @@ def get_normals_station(station:str = '47423', format:str = 'csv', **kwargs) ->
     
     Returns
     -------
-    str (json or csv)
+    str (json or csv), DataFrame or Table
         the requested data, always dep
 
     See: 
@@ -497,35 +1440,117 @@ def get_normals_station(station:str = '47423', format:str = 'csv', **kwargs) ->
     
     for more details"""
 
-    endpoint = _get_endpoint_url()
+    action, fieldnames = _get_dataset('normals', None)
 
-    components={
-        "action": "normals/",
-        "station": station,
-        "extension": ".csv.gz"
-    }
+    return _get_station(action=action, fieldnames=fieldnames, station=station, format=format, **kwargs)
 
-    url = "{}{action}{station}{extension}".format(endpoint, **components)
+def _get_bundle_dataset(dataset) -> tuple:
+    """Normalises 'hourly_full', 'hourly/full', ('hourly', 'full') or
+    'normals' to (name, action, fieldnames)."""
 
-    response = _get_data_from_endpoint(url=url, station=station)
+    if isinstance(dataset, str):
+        dataset = tuple(dataset.replace('/', '_').split('_', 1))
 
-    if format == 'json':
-        data = _get_json_from_csv(data=response, fieldnames=NORMALS_CSV_DATA_HEADER)
+    granularity, variant = (tuple(dataset) + (None, ))[:2]
 
-        return data
-    else:
-        header = ",".join(NORMALS_CSV_DATA_HEADER)
+    if granularity == 'normals':
+        variant = None
+
+    action, fieldnames = _get_dataset(granularity, variant)
+
+    name = granularity if variant is None else '{}_{}'.format(granularity, variant)
+
+    return name, action, fieldnames
+
+def get_bundle(stations = '47423', datasets:list = ('hourly_full', 'daily_full', 'monthly_full', 'normals'),
+    format:str = 'csv', **kwargs) -> dict:
+    """retrieves several datasets of one or many stations at once.
+
+    Every (dataset, station) file is requested concurrently over one
+    shared pool, under the adaptive limit of options.max_concurrency,
+    instead of one round-trip after the other.
+
+    Parameters
+    ----------
+    stations: str or list
+        The station identifier(s). Ids are compared as stripped strings,
+        duplicates are requested once. Default = 47423.
+
+    datasets: list
+        The datasets, as 'hourly_full', 'hourly/full' or
+        ('hourly', 'full'); 'normals' has no variant. Default hourly,
+        daily and monthly full data and normals.
+
+    format: str
+        Controls the output format. Default csv, the other options are
+        json, pandas (a DataFrame), arrow (a pyarrow Table) and compact
+        (a CompactTable).
+
+    **kwargs :
+        Optional arguments that ``requests.get()`` takes. For example,
+        `proxies`, `cert` and `verify`.
+
+    Returns
+    -------
+    dict
+        {dataset: {station: data}}, e.g.
+        result['daily_full']['10637'], data as returned by the
+        get_*_station functions.
 
-        return header + '\r\n' + response
+    See:
 
-def get_hourly_full_all_stations(format:str = 'csv',**kwargs) -> str:
+        https://dev.meteostat.net/bulk/
+
+    for more details"""
+
+    if isinstance(stations, (str, int)):
+        stations = [ stations ]
+
+    ids = list(OrderedDict.fromkeys(str(station).strip() for station in stations))
+
+    resolved = OrderedDict()
+
+    for dataset in datasets:
+        name, action, fieldnames = _get_bundle_dataset(dataset)
+
+        resolved[name] = (action, fieldnames)
+
+    tasks = [ (name, station) for name in resolved for station in ids ]
+
+    def load(task):
+        name, station = task
+
+        action, fieldnames = resolved[name]
+
+        return _get_station(action=action, fieldnames=fieldnames, station=station, format=format, **kwargs)
+
+    result = OrderedDict((name, OrderedDict()) for name in resolved)
+
+    for (name, station), data in zip(tasks, _map_stations(load, tasks)):
+        result[name][station] = data
+
+    return result
+
+def get_hourly_full_all_stations(format:str = 'csv', memory_limit:int = None, shard_index:int = None, shard_count:int = None, balance:bool = False, **kwargs) -> str:
     """retrieves station hourly full information for all stations
     listed in get_stations_full().
 
     Parameters
     ----------
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json and compact (a CompactTable, kept in memory).
+
+    memory_limit: int
+        Size, in characters, above which the accumulated data moves to
+        temporary files. Default None, options.spill_threshold.
+
+    shard_index, shard_count: int
+        Only fetch shard shard_index (0 based) of shard_count, see
+        sharding.shard_stations(). Default None, every station.
+
+    balance: bool
+        Balance shards by expected file size. Default False.
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -533,8 +1558,9 @@ def get_hourly_full_all_stations(format:str = 'csv',**kwargs) -> str:
     
     Returns
     -------
-    str (json or csv)
-        the requested data, always dep
+    str (json or csv) or SpooledResult
+        the requested data, always dep. A SpooledResult once the data
+        goes over memory_limit
 
     See: 
     
@@ -542,29 +1568,31 @@ def get_hourly_full_all_stations(format:str = 'csv',**kwargs) -> str:
     
     for more details"""
 
-    response = get_stations_full()
-
-    stations = [ line['id'] for line in response ]
-
-    data = [ get_hourly_full_station ( station = id, format = format ) for id in stations ]
-    
-    if format == 'json':
-        result = _get_json_from_csv(data=data, fieldnames=HOURLY_CSV_DATA_HEADER)
-
-        return result
-    else:
-        header = ",".join(HOURLY_CSV_DATA_HEADER)
+    action, fieldnames = _get_dataset('hourly', 'full')
 
-        return header + '\r\n' + data
+    return _get_all_stations(action=action, fieldnames=fieldnames, format=format, memory_limit=memory_limit,
+        shard_index=shard_index, shard_count=shard_count, balance=balance, **kwargs)
 
-def get_hourly_obs_all_stations(format:str = 'csv',**kwargs) -> str:
+def get_hourly_obs_all_stations(format:str = 'csv', memory_limit:int = None, shard_index:int = None, shard_count:int = None, balance:bool = False, **kwargs) -> str:
     """retrieves station hourly observation information for all stations
     listed in get_stations_full().
 
     Parameters
     ----------
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json and compact (a CompactTable, kept in memory).
+
+    memory_limit: int
+        Size, in characters, above which the accumulated data moves to
+        temporary files. Default None, options.spill_threshold.
+
+    shard_index, shard_count: int
+        Only fetch shard shard_index (0 based) of shard_count, see
+        sharding.shard_stations(). Default None, every station.
+
+    balance: bool
+        Balance shards by expected file size. Default False.
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -572,8 +1600,9 @@ def get_hourly_obs_all_stations(format:str = 'csv',**kwargs) -> str:
     
     Returns
     -------
-    str (json or csv)
-        the requested data, always dep
+    str (json or csv) or SpooledResult
+        the requested data, always dep. A SpooledResult once the data
+        goes over memory_limit
 
     See: 
     
@@ -581,29 +1610,31 @@ def get_hourly_obs_all_stations(format:str = 'csv',**kwargs) -> str:
     
     for more details"""
 
-    response = get_stations_full()
-
-    stations = [ line['id'] for line in response ]
+    action, fieldnames = _get_dataset('hourly', 'obs')
 
-    data = [ get_hourly_obs_station ( station = id, format = format ) for id in stations ]
-    
-    if format == 'json':
-        result = _get_json_from_csv(data=data, fieldnames=HOURLY_CSV_DATA_HEADER)
-
-        return result
-    else:
-        header = ",".join(HOURLY_CSV_DATA_HEADER)
-
-        return header + '\r\n' + data
+    return _get_all_stations(action=action, fieldnames=fieldnames, format=format, memory_limit=memory_limit,
+        shard_index=shard_index, shard_count=shard_count, balance=balance, **kwargs)
 
-def get_daily_full_all_stations(format:str = 'csv',**kwargs) -> str:
+def get_daily_full_all_stations(format:str = 'csv', memory_limit:int = None, shard_index:int = None, shard_count:int = None, balance:bool = False, **kwargs) -> str:
     """retrieves station daily full information for all stations
     listed in get_stations_full().
 
     Parameters
     ----------
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json and compact (a CompactTable, kept in memory).
+
+    memory_limit: int
+        Size, in characters, above which the accumulated data moves to
+        temporary files. Default None, options.spill_threshold.
+
+    shard_index, shard_count: int
+        Only fetch shard shard_index (0 based) of shard_count, see
+        sharding.shard_stations(). Default None, every station.
+
+    balance: bool
+        Balance shards by expected file size. Default False.
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -611,8 +1642,9 @@ def get_daily_full_all_stations(format:str = 'csv',**kwargs) -> str:
     
     Returns
     -------
-    str (json or csv)
-        the requested data, always dep
+    str (json or csv) or SpooledResult
+        the requested data, always dep. A SpooledResult once the data
+        goes over memory_limit
 
     See: 
     
@@ -620,29 +1652,31 @@ def get_daily_full_all_stations(format:str = 'csv',**kwargs) -> str:
     
     for more details"""
 
-    response = get_stations_full()
-
-    stations = [ line['id'] for line in response ]
-
-    data = [ get_daily_full_station ( station = id, format = format ) for id in stations ]
-    
-    if format == 'json':
-        result = _get_json_from_csv(data=data, fieldnames=DAILY_CSV_DATA_HEADER)
-
-        return result
-    else:
-        header = ",".join(DAILY_CSV_DATA_HEADER)
+    action, fieldnames = _get_dataset('daily', 'full')
 
-        return header + '\r\n' + data
+    return _get_all_stations(action=action, fieldnames=fieldnames, format=format, memory_limit=memory_limit,
+        shard_index=shard_index, shard_count=shard_count, balance=balance, **kwargs)
 
-def get_daily_obs_all_stations(format:str = 'csv',**kwargs) -> str:
+def get_daily_obs_all_stations(format:str = 'csv', memory_limit:int = None, shard_index:int = None, shard_count:int = None, balance:bool = False, **kwargs) -> str:
     """retrieves station daily obs information for all stations
     listed in get_stations_full().
 
     Parameters
     ----------
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json and compact (a CompactTable, kept in memory).
+
+    memory_limit: int
+        Size, in characters, above which the accumulated data moves to
+        temporary files. Default None, options.spill_threshold.
+
+    shard_index, shard_count: int
+        Only fetch shard shard_index (0 based) of shard_count, see
+        sharding.shard_stations(). Default None, every station.
+
+    balance: bool
+        Balance shards by expected file size. Default False.
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -650,8 +1684,9 @@ def get_daily_obs_all_stations(format:str = 'csv',**kwargs) -> str:
     
     Returns
     -------
-    str (json or csv)
-        the requested data, always dep
+    str (json or csv) or SpooledResult
+        the requested data, always dep. A SpooledResult once the data
+        goes over memory_limit
 
     See: 
     
@@ -659,29 +1694,31 @@ def get_daily_obs_all_stations(format:str = 'csv',**kwargs) -> str:
     
     for more details"""
 
-    response = get_stations_full()
-
-    stations = [ line['id'] for line in response ]
-
-    data = [ get_daily_obs_station ( station = id, format = format ) for id in stations ]
-    
-    if format == 'json':
-        result = _get_json_from_csv(data=data, fieldnames=DAILY_CSV_DATA_HEADER)
-
-        return result
-    else:
-        header = ",".join(DAILY_CSV_DATA_HEADER)
+    action, fieldnames = _get_dataset('daily', 'obs')
 
-        return header + '\r\n' + data
+    return _get_all_stations(action=action, fieldnames=fieldnames, format=format, memory_limit=memory_limit,
+        shard_index=shard_index, shard_count=shard_count, balance=balance, **kwargs)
 
-def get_monthly_full_all_stations(format:str = 'csv',**kwargs) -> str:
+def get_monthly_full_all_stations(format:str = 'csv', memory_limit:int = None, shard_index:int = None, shard_count:int = None, balance:bool = False, **kwargs) -> str:
     """retrieves station monthly full information for all stations
     listed in get_stations_full().
 
     Parameters
     ----------
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json and compact (a CompactTable, kept in memory).
+
+    memory_limit: int
+        Size, in characters, above which the accumulated data moves to
+        temporary files. Default None, options.spill_threshold.
+
+    shard_index, shard_count: int
+        Only fetch shard shard_index (0 based) of shard_count, see
+        sharding.shard_stations(). Default None, every station.
+
+    balance: bool
+        Balance shards by expected file size. Default False.
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -689,8 +1726,9 @@ def get_monthly_full_all_stations(format:str = 'csv',**kwargs) -> str:
     
     Returns
     -------
-    str (json or csv)
-        the requested data, always dep
+    str (json or csv) or SpooledResult
+        the requested data, always dep. A SpooledResult once the data
+        goes over memory_limit
 
     See: 
     
@@ -698,29 +1736,31 @@ def get_monthly_full_all_stations(format:str = 'csv',**kwargs) -> str:
     
     for more details"""
 
-    response = get_stations_full()
+    action, fieldnames = _get_dataset('monthly', 'full')
 
-    stations = [ line['id'] for line in response ]
+    return _get_all_stations(action=action, fieldnames=fieldnames, format=format, memory_limit=memory_limit,
+        shard_index=shard_index, shard_count=shard_count, balance=balance, **kwargs)
 
-    data = [ get_monthly_full_station ( station = id, format = format ) for id in stations ]
-    
-    if format == 'json':
-        result = _get_json_from_csv(data=data, fieldnames=MONTHLY_CSV_DATA_HEADER)
-
-        return result
-    else:
-        header = ",".join(MONTHLY_CSV_DATA_HEADER)
-
-        return header + '\r\n' + data   
-
-def get_monthly_obs_all_stations(format:str = 'csv',**kwargs) -> str:
+def get_monthly_obs_all_stations(format:str = 'csv', memory_limit:int = None, shard_index:int = None, shard_count:int = None, balance:bool = False, **kwargs) -> str:
     """retrieves station daily observation information for all stations
     listed in get_stations_full().
 
     Parameters
     ----------
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json and compact (a CompactTable, kept in memory).
+
+    memory_limit: int
+        Size, in characters, above which the accumulated data moves to
+        temporary files. Default None, options.spill_threshold.
+
+    shard_index, shard_count: int
+        Only fetch shard shard_index (0 based) of shard_count, see
+        sharding.shard_stations(). Default None, every station.
+
+    balance: bool
+        Balance shards by expected file size. Default False.
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -728,8 +1768,9 @@ def get_monthly_obs_all_stations(format:str = 'csv',**kwargs) -> str:
     
     Returns
     -------
-    str (json or csv)
-        the requested data, always dep
+    str (json or csv) or SpooledResult
+        the requested data, always dep. A SpooledResult once the data
+        goes over memory_limit
 
     See: 
     
@@ -737,29 +1778,31 @@ def get_monthly_obs_all_stations(format:str = 'csv',**kwargs) -> str:
     
     for more details"""
 
-    response = get_stations_full()
-
-    stations = [ line['id'] for line in response ]
-
-    data = [ get_monthly_obs_station ( station = id, format = format ) for id in stations ]
-    
-    if format == 'json':
-        result = _get_json_from_csv(data=data, fieldnames=MONTHLY_CSV_DATA_HEADER)
-
-        return result
-    else:
-        header = ",".join(MONTHLY_CSV_DATA_HEADER)
+    action, fieldnames = _get_dataset('monthly', 'obs')
 
-        return header + '\r\n' + data  
+    return _get_all_stations(action=action, fieldnames=fieldnames, format=format, memory_limit=memory_limit,
+        shard_index=shard_index, shard_count=shard_count, balance=balance, **kwargs)
 
-def get_normals_all_stations(format:str = 'csv',**kwargs) -> str:
+def get_normals_all_stations(format:str = 'csv', memory_limit:int = None, shard_index:int = None, shard_count:int = None, balance:bool = False, **kwargs) -> str:
     """retrieves station normals information for all stations
     listed in get_stations_full().
 
     Parameters
     ----------
     format: str
-        Controls the output format. Default csv, the other option is json.
+        Controls the output format. Default csv, the other options are
+        json and compact (a CompactTable, kept in memory).
+
+    memory_limit: int
+        Size, in characters, above which the accumulated data moves to
+        temporary files. Default None, options.spill_threshold.
+
+    shard_index, shard_count: int
+        Only fetch shard shard_index (0 based) of shard_count, see
+        sharding.shard_stations(). Default None, every station.
+
+    balance: bool
+        Balance shards by expected file size. Default False.
 
     **kwargs :
         Optional arguments that ``requests.get()`` takes. For example,
@@ -767,8 +1810,9 @@ def get_normals_all_stations(format:str = 'csv',**kwargs) -> str:
     
     Returns
     -------
-    str (json or csv)
-        the requested data, always dep
+    str (json or csv) or SpooledResult
+        the requested data, always dep. A SpooledResult once the data
+        goes over memory_limit
 
     See: 
     
@@ -776,21 +1820,10 @@ def get_normals_all_stations(format:str = 'csv',**kwargs) -> str:
     
     for more details"""
 
-    response = get_stations_full()
-
-    stations = [ line['id'] for line in response ]
-
-    data = [ get_normals_station( station = id, format = format ) for id in stations ]
-    
-    if format == 'json':
-        result = _get_json_from_csv(data=data, fieldnames=NORMALS_CSV_DATA_HEADER)
-
-        return result
+    action, fieldnames = _get_dataset('normals', None)
 
-    else:
-        header = ",".join(NORMALS_CSV_DATA_HEADER)
-
-        return header + '\r\n' + data 
+    return _get_all_stations(action=action, fieldnames=fieldnames, format=format, memory_limit=memory_limit,
+        shard_index=shard_index, shard_count=shard_count, balance=balance, **kwargs)
 
 def get_nearby_stations(x_rapidapi_key:str = None, lat:float = None, lon:float = None, limit:int = 10, radius:int = 100000,**kwargs) -> json:
     """retrieves nearby stations by geolocation.
@@ -831,6 +1864,10 @@ def get_nearby_stations(x_rapidapi_key:str = None, lat:float = None, lon:float =
     
     for more details"""
 
+    import json
+
+    import requests
+
     url = 'https://meteostat.p.rapidapi.com/stations/nearby'
 
     querystring = {
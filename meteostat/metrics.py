@@ -0,0 +1,67 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Process-wide metrics of the client"""
+
+__all__ = ['get_metrics', 'reset_metrics']
+
+import threading
+
+_lock = threading.Lock()
+
+_gauges = {}
+_counters = {}
+
+def set_gauge(name:str, value:float) -> None:
+    """Sets a gauge, e.g. the current concurrency limit."""
+
+    with _lock:
+        _gauges[name] = value
+
+def increment(name:str, value:float = 1) -> None:
+    """Adds to a counter, e.g. the number of failed requests."""
+
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + value
+
+def get_metrics() -> dict:
+    """returns a snapshot of every metric.
+
+    Returns
+    -------
+    dict
+        metric name to value, gauges and counters alike. Names are
+        dotted, e.g. 'concurrency.limit' or 'http.errors'."""
+
+    with _lock:
+        result = dict(_counters)
+        result.update(_gauges)
+
+    return result
+
+def reset_metrics() -> None:
+    """Forgets every metric."""
+
+    with _lock:
+        _gauges.clear()
+        _counters.clear()
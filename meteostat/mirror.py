@@ -0,0 +1,265 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Local mirror of the bulk endpoint, shared across nodes"""
+
+__all__ = ['MirrorServer']
+
+import os
+import time
+import shutil
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from email.utils import formatdate, parsedate_to_datetime
+
+from meteostat import meteostat2
+
+class _MirrorHandler(BaseHTTPRequestHandler):
+    """Serves /v2/... paths from the on-disk bulk cache."""
+
+    server_version = 'meteostat2-mirror'
+
+    def _get_relative(self) -> str:
+        """Path below the prefix, None when outside of it or not a bulk
+        file (validators, temporaries and decompressed copies live next
+        to the cached files and are not served)."""
+
+        from urllib.parse import urlsplit, unquote
+
+        path = unquote(urlsplit(self.path).path)
+
+        prefix = self.server.mirror.prefix
+
+        if not path.startswith(prefix) or not path.endswith('.gz'):
+            return None
+
+        return path[len(prefix):]
+
+    def _is_not_modified(self, etag:str, modified:float) -> bool:
+        """Evaluates the request's conditional headers."""
+
+        if_none_match = self.headers.get('If-None-Match')
+
+        if if_none_match is not None:
+            tags = [ tag.strip() for tag in if_none_match.split(',') ]
+
+            return '*' in tags or etag in tags
+
+        if_modified_since = self.headers.get('If-Modified-Since')
+
+        if if_modified_since is not None:
+            try:
+                return int(modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+
+            except (TypeError, ValueError):
+                return False
+
+        return False
+
+    def _serve(self, body:bool = True) -> None:
+
+        relative = self._get_relative()
+
+        path = None if relative is None else self.server.mirror.get_file(relative)
+
+        if path is None:
+            self.send_error(404, 'File not found')
+
+            return
+
+        # Opened first, so the size sent is the one of the file sent even
+        # when a refresh replaces it meanwhile.
+        try:
+            file = open(path, 'rb')
+
+        except OSError:
+            self.send_error(404, 'File not found')
+
+            return
+
+        with file:
+            self._send(file, meteostat2._read_cache_meta(path) or {}, body=body)
+
+    def _send(self, file, meta:dict, body:bool = True) -> None:
+
+        stat = os.fstat(file.fileno())
+
+        etag = meta.get('etag') or '"{:x}-{:x}"'.format(stat.st_size, int(stat.st_mtime))
+
+        modified = stat.st_mtime
+
+        if meta.get('last_modified'):
+            try:
+                modified = parsedate_to_datetime(meta['last_modified']).timestamp()
+
+            except (TypeError, ValueError):
+                pass
+
+        if self._is_not_modified(etag, modified):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/gzip')
+        self.send_header('Content-Length', str(stat.st_size))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', formatdate(modified, usegmt=True))
+        self.end_headers()
+
+        if body:
+            shutil.copyfileobj(file, self.wfile)
+
+    def do_GET(self) -> None:
+        self._serve(body=True)
+
+    def do_HEAD(self) -> None:
+        self._serve(body=False)
+
+    def log_message(self, format:str, *args) -> None:
+
+        if not self.server.mirror.quiet:
+            super().log_message(format, *args)
+
+class MirrorServer(object):
+    """Small HTTP mirror of the bulk endpoint.
+
+    Files are fetched from the configured endpoint into the on-disk bulk
+    cache the first time they are requested, then served from disk with
+    ETag / Last-Modified validators. Files older than ``max_age`` seconds
+    are revalidated upstream with a conditional request, concurrent
+    requests for the same file share one upstream fetch, and a stale copy
+    is served when upstream is unavailable.
+
+    Other nodes only need::
+
+        meteostat2.options.endpoint = '//mirror-host:8080/v2/'
+
+    Parameters
+    ----------
+    cache_dir: str
+        The bulk cache directory. Default None, the current
+        options.cache_dir. Options of the process are left untouched.
+
+    host, port:
+        Where to listen. Default 0.0.0.0:8080.
+
+    max_age: float
+        Seconds a file is served without revalidation. Default 3600."""
+
+    def __init__(self, cache_dir:str = None, host:str = '0.0.0.0', port:int = 8080,
+        max_age:float = 3600, prefix:str = '/v2/', quiet:bool = True) -> None:
+
+        if cache_dir is None:
+            cache_dir = meteostat2._get_options().cache_dir
+
+        if cache_dir is None:
+            raise ValueError('MirrorServer requires a cache_dir')
+
+        self.cache_dir=cache_dir
+        self.max_age=max_age
+        self.prefix=prefix
+        self.quiet=quiet
+
+        self._server=ThreadingHTTPServer((host, port), _MirrorHandler)
+        self._server.daemon_threads=True
+        self._server.mirror=self
+        self._thread=None
+
+    @property
+    def address(self) -> tuple:
+        """The (host, port) the server listens on."""
+
+        return self._server.server_address
+
+    def _is_fresh(self, path:str) -> bool:
+
+        try:
+            return time.time() - os.path.getmtime(path + '.meta') < self.max_age
+
+        except OSError:
+            return False
+
+    def _refresh(self, relative:str) -> bool:
+        """Fetches a file from upstream into the cache."""
+
+        url = meteostat2._get_configured_endpoint_url() + relative
+
+        return meteostat2._download_payload(url=url, station=relative, cache_dir=self.cache_dir) is not None
+
+    def get_file(self, relative:str) -> str:
+        """Local path of a file, fetched or revalidated when needed. None
+        when it is neither cached nor available upstream."""
+
+        path = meteostat2._get_cache_path(meteostat2._get_configured_endpoint_url() + relative, cache_dir=self.cache_dir)
+
+        if path is None:
+            return None
+
+        if not self._is_fresh(path):
+            try:
+                meteostat2._single_flight.do(('mirror', relative), self._refresh, relative)
+
+            except Exception as error:
+                print('Mirror could not refresh {}: {}'.format(relative, error))
+
+        return path if os.path.exists(path) else None
+
+    def serve_forever(self) -> None:
+        """Serves requests until shutdown()."""
+
+        self._server.serve_forever()
+
+    def start(self) -> 'MirrorServer':
+        """Serves requests in a daemon thread."""
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name='meteostat-mirror', daemon=True)
+        self._thread.start()
+
+        return self
+
+    def shutdown(self) -> None:
+
+        self._server.shutdown()
+        self._server.server_close()
+
+        if self._thread is not None:
+            self._thread.join()
+
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.shutdown()
+
+    def __str__(self) -> str:
+        return "MirrorServer: {}:{}{} from {}".format(
+            self.address[0], self.address[1], self.prefix, meteostat2._get_configured_endpoint_url()
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,271 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Sparse date to byte offset index of decompressed station files"""
+
+__all__ = ['build_offset_index', 'read_range']
+
+import os
+import mmap
+import zlib
+import array
+import bisect
+import struct
+
+INDEX_SUFFIX = '.idx'
+
+_MAGIC = b'MSIDX\x01'
+
+# indexed size, crc32 of the indexed tail, last key, offset of the last
+# entry, number of entries.
+_HEADER = struct.Struct('<6sQIiQQ')
+
+_TAIL = 256
+
+def _get_key(line:bytes) -> int:
+    """YYYYMMDD of a raw station row (date first, or year and month for
+    monthly files), None when it has none."""
+
+    fields = line.split(b',', 2)
+
+    first = fields[0].strip()
+
+    try:
+        if len(first) == 10 and first[4:5] == b'-':
+            return int(first[:4] + first[5:7] + first[8:10])
+
+        if len(first) == 4 and len(fields) > 1:
+            return int(first) * 10000 + int(fields[1]) * 100 + 1
+
+    except ValueError:
+        pass
+
+    return None
+
+def _get_tail_crc(view, size:int) -> int:
+
+    return zlib.crc32(view[max(0, size - _TAIL):size])
+
+def _read_index(path:str) -> tuple:
+    """(header fields, keys, offsets) of an index file, None when missing
+    or unreadable."""
+
+    try:
+        with open(path + INDEX_SUFFIX, 'rb') as file:
+            header = file.read(_HEADER.size)
+
+            magic, size, crc, last_key, last_offset, count = _HEADER.unpack(header)
+
+            if magic != _MAGIC:
+                return None
+
+            keys = array.array('i')
+            offsets = array.array('q')
+
+            keys.fromfile(file, count)
+            offsets.fromfile(file, count)
+
+    except (OSError, EOFError, struct.error):
+        return None
+
+    return (size, crc, last_key, last_offset), keys, offsets
+
+def _write_index(path:str, size:int, crc:int, last_key:int, last_offset:int, keys, offsets) -> None:
+
+    import tempfile
+
+    descriptor, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+        prefix=os.path.basename(path) + INDEX_SUFFIX + '.', suffix='.tmp')
+
+    try:
+        with os.fdopen(descriptor, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, size, crc, last_key, last_offset, len(keys)))
+
+            keys.tofile(file)
+            offsets.tofile(file)
+
+        os.replace(tmp, path + INDEX_SUFFIX)
+
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+        raise
+
+def build_offset_index(path:str, stride:int = 4096, **kwargs) -> tuple:
+    """builds or updates the sidecar index (path + '.idx') of a
+    decompressed station file.
+
+    An entry is written at the first row of a day whenever ``stride``
+    bytes were read since the previous entry, so a lookup reads at most
+    about ``stride`` bytes plus one day of rows. When rows were only
+    appended since the last build, only the new rows are read.
+
+    Parameters
+    ----------
+    path: str
+        The decompressed csv file.
+
+    stride: int
+        Bytes between two entries, at least. Default 4096.
+
+    Returns
+    -------
+    tuple
+        (keys, offsets), array('i') of YYYYMMDD and array('q') of the
+        byte offsets of the rows starting them."""
+
+    size = os.path.getsize(path)
+
+    index = _read_index(path)
+
+    with open(path, 'rb') as file:
+        if size == 0:
+            view = b''
+        else:
+            view = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            if index is not None:
+                (indexed, crc, last_key, last_offset), keys, offsets = index
+
+                # Rows were only appended when the indexed part is intact.
+                if indexed > size or crc != _get_tail_crc(view, indexed):
+                    index = None
+
+            if index is None:
+                indexed, last_key, last_offset = 0, None, -stride
+
+                keys, offsets = array.array('i'), array.array('q')
+
+            elif indexed == size:
+                return keys, offsets
+
+            position = indexed
+
+            # Only complete lines are indexed, a partial last line is
+            # picked up by the next build.
+            while position < size:
+                newline = view.find(b'\n', position)
+
+                if newline == -1:
+                    break
+
+                key = _get_key(view[position:newline])
+
+                if key is not None and key != last_key:
+                    if position - last_offset >= stride or not keys:
+                        keys.append(key)
+                        offsets.append(position)
+
+                        last_offset = position
+
+                    last_key = key
+
+                position = newline + 1
+
+            _write_index(path, position, _get_tail_crc(view, position),
+                last_key if last_key is not None else 0, max(last_offset, 0), keys, offsets)
+
+        finally:
+            if isinstance(view, mmap.mmap):
+                view.close()
+
+    return keys, offsets
+
+def _find_row(view, begin:int, stop:int, key:int, inclusive:bool) -> int:
+    """Offset of the first row in [begin, stop) whose key is >= key
+    (> key when not inclusive)."""
+
+    position = begin
+
+    while position < stop:
+        newline = view.find(b'\n', position, stop)
+
+        end = stop if newline == -1 else newline
+
+        row = _get_key(view[position:end])
+
+        if row is not None and (row >= key if inclusive else row > key):
+            return position
+
+        position = end + 1
+
+    return stop
+
+def read_range(path:str, start:int = None, end:int = None, stride:int = 4096, **kwargs) -> str:
+    """reads the rows of a decompressed station file between two days,
+    seeking with its sidecar index.
+
+    The index is built or updated first when needed. The file is mapped
+    in memory, only the index and the rows around the bounds are read.
+
+    Parameters
+    ----------
+    path: str
+        The decompressed csv file.
+
+    start, end: int
+        The inclusive range of days, as YYYYMMDD. Default None,
+        unbounded.
+
+    Returns
+    -------
+    str
+        the matching rows, as in the file."""
+
+    keys, offsets = build_offset_index(path, stride=stride)
+
+    size = os.path.getsize(path)
+
+    if size == 0:
+        return ''
+
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+
+        begin = 0
+
+        if start is not None:
+            entry = bisect.bisect_right(keys, start) - 1
+
+            scan = offsets[entry] if entry >= 0 else 0
+
+            limit = offsets[entry + 1] if entry + 1 < len(offsets) else size
+
+            begin = _find_row(view, scan, limit, start, inclusive=True)
+
+        stop = size
+
+        if end is not None:
+            entry = bisect.bisect_right(keys, end) - 1
+
+            scan = max(begin, offsets[entry] if entry >= 0 else 0)
+
+            limit = offsets[entry + 1] if entry + 1 < len(offsets) else size
+
+            stop = _find_row(view, scan, limit, end, inclusive=False)
+
+        if stop <= begin:
+            return ''
+
+        return view[begin:stop].decode('utf-8')
@@ -0,0 +1,177 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Partitioned Parquet export of station data"""
+
+__all__ = ['export_parquet']
+
+import os
+import tempfile
+
+from meteostat import meteostat2
+from meteostat import columnar
+
+def _get_year_slices(numpy, table, granularity:str) -> list:
+    """(year, offset, length) of the contiguous years of a station
+    table, station files are sorted in time."""
+
+    if granularity == 'monthly':
+        years = table.column('year').to_numpy(zero_copy_only=False)
+    else:
+        # Days since epoch to years.
+        days = table.column('date').cast('int32').to_numpy(zero_copy_only=False)
+
+        years = days.astype('datetime64[D]').astype('datetime64[Y]').astype('int64') + 1970
+
+    if not len(years):
+        return []
+
+    boundaries = [ 0 ] + (numpy.flatnonzero(numpy.diff(years)) + 1).tolist() + [ len(years) ]
+
+    return [ (int(years[begin]), begin, end - begin) for begin, end in zip(boundaries[:-1], boundaries[1:]) ]
+
+def export_parquet(directory:str = None, granularity:str = 'hourly', variant:str = 'full', stations:list = None,
+    row_group_size:int = 65536, compression:str = 'zstd', use_dictionary = True,
+    shard_index:int = None, shard_count:int = None, balance:bool = False, **kwargs) -> list:
+    """exports a dataset as Parquet files partitioned by station and year.
+
+    Every station file is parsed straight into typed Arrow columns (see
+    format='arrow') and written as ``directory/id=<station>/year=<year>/
+    part-0.parquet``, the hive layout readers such as
+    ``pyarrow.dataset``, Spark or DuckDB understand. Nothing is gathered
+    across stations, memory stays around one station file. Requires
+    pyarrow, ``pip install meteostat2[arrow]``.
+
+    Parameters
+    ----------
+    directory: str
+        The root of the dataset.
+
+    granularity: str
+        hourly, daily, monthly or normals (partitioned by station only).
+        Default hourly.
+
+    variant: str
+        full or obs, ignored for normals. Default full.
+
+    stations: str or list
+        The station identifiers. Default None, every station listed in
+        get_stations_full().
+
+    row_group_size: int
+        Maximum rows per row group. Default 65536.
+
+    compression: str
+        Parquet compression codec. Default zstd.
+
+    use_dictionary: bool or list
+        Dictionary encode every column, or only the listed ones. Default
+        True, Parquet falls back to plain encoding for columns with too
+        many distinct values.
+
+    shard_index, shard_count, balance:
+        Export one shard of the stations only, see shard_stations().
+
+    Returns
+    -------
+    list
+        the paths of the written files."""
+
+    try:
+        import pyarrow.parquet
+
+    except ImportError:
+        raise ImportError('export_parquet requires pyarrow, install meteostat2[arrow]')
+
+    import numpy
+
+    if granularity == 'normals':
+        variant = None
+
+    action, header = meteostat2._get_dataset(granularity, variant)
+
+    if stations is None:
+        stations = meteostat2.get_stations_full()
+
+    elif isinstance(stations, str):
+        stations = [ stations ]
+
+    if shard_count is not None:
+        from meteostat.sharding import shard_stations
+
+        stations = shard_stations(stations, shard_index=shard_index or 0, shard_count=shard_count,
+            balance=balance, granularity=granularity)
+
+    ids = [ station['id'] if isinstance(station, dict) else station for station in stations ]
+
+    # Partition columns live in the paths, not in the files.
+    partitions = ('id', 'year') if granularity == 'monthly' else ('id', )
+
+    def download(station):
+        return meteostat2._get_data_from_endpoint(
+            url=meteostat2._get_station_url(action=action, station=station), isstation=False, station=station
+        )
+
+    paths = []
+
+    for station, data in zip(ids, meteostat2._map_stations(download, ids)):
+        if not data:
+            continue
+
+        table = columnar.to_arrow(columnar._parse_columns(data=data, fieldnames=header, station=station))
+
+        if granularity == 'normals':
+            slices = [ (None, 0, table.num_rows) ]
+        else:
+            slices = _get_year_slices(numpy, table, granularity)
+
+        table = table.drop_columns(list(partitions))
+
+        for year, offset, length in slices:
+            parts = [ directory, 'id={}'.format(station) ]
+
+            if year is not None:
+                parts.append('year={}'.format(year))
+
+            os.makedirs(os.path.join(*parts), exist_ok=True)
+
+            path = os.path.join(*parts, 'part-0.parquet')
+
+            descriptor, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix='part-0.parquet.', suffix='.tmp')
+
+            try:
+                with os.fdopen(descriptor, 'wb') as file:
+                    pyarrow.parquet.write_table(table.slice(offset, length), file, row_group_size=row_group_size,
+                        compression=compression, use_dictionary=use_dictionary)
+
+                os.replace(tmp, path)
+
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+
+                raise
+
+            paths.append(path)
+
+    return paths
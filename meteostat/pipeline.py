@@ -0,0 +1,306 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Bounded multi-stage pipeline for bulk jobs"""
+
+__all__ = ['Stage', 'Pipeline']
+
+import time
+import queue
+import threading
+
+from meteostat import metrics
+from meteostat.memory import _get_size, sample_memory
+
+# End of input marker, one per worker of the next stage.
+_DONE = object()
+
+# Seconds between checks of the stop flag while blocked on a queue.
+_POLL = 0.1
+
+class Stage(object):
+    """One step of a Pipeline: function applied to every item by workers
+    threads."""
+
+    def __init__(self, name:str, function = None, workers:int = 1) -> None:
+
+        self.name=name
+        self.function=function
+        self.workers=max(1, workers)
+
+    def __str__(self) -> str:
+        return "Stage: {} ({} workers)".format(self.name, self.workers)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class Pipeline(object):
+    """Stages connected by bounded queues, e.g. download -> decompress ->
+    parse, the consumer of run() being the sink.
+
+    Every stage runs its own workers, so network waits of one stage
+    overlap with CPU work of the others. Queues hold at most queue_size
+    items and no more than max_in_flight items are between the source
+    and the consumer at any time (reordering included), which bounds
+    memory: a slow stage or consumer blocks the ones before it.
+
+    Per stage, 'pipeline.<name>.items', 'pipeline.<name>.busy_seconds'
+    and 'pipeline.<name>.queued' are published as metrics. With a
+    MemoryBudget, the bytes of the results waiting after each stage are
+    accounted to it and no new item is admitted while it is exceeded.
+
+    Parameters
+    ----------
+    stages: list
+        Stage objects, or (name, function, workers) tuples.
+
+    queue_size: int
+        Capacity of each queue. Default 8.
+
+    ordered: bool
+        Hand results out in input order. Default True.
+
+    max_in_flight: int
+        Items admitted but not yet consumed. Default None, the capacity
+        of the queues plus one per worker.
+
+    budget: MemoryBudget
+        Default None, no memory accounting."""
+
+    def __init__(self, stages:list = None, queue_size:int = 8, ordered:bool = True, max_in_flight:int = None,
+        budget = None) -> None:
+
+        self.stages=[ stage if isinstance(stage, Stage) else Stage(*stage) for stage in stages ]
+
+        if not self.stages:
+            raise ValueError('A pipeline needs at least one stage')
+
+        self.queue_size=max(1, queue_size)
+        self.ordered=ordered
+
+        if max_in_flight is None:
+            max_in_flight = self.queue_size * len(self.stages) + sum(stage.workers for stage in self.stages)
+
+        self.max_in_flight=max(1, max_in_flight)
+
+        self.budget=budget
+
+    def run(self, items):
+        """Yields the result of the last stage for every item. The first
+        exception of any stage stops the pipeline and is raised here."""
+
+        stages = self.stages
+        budget = self.budget
+
+        # The output queue is bounded by max_in_flight.
+        queues = [ queue.Queue(self.queue_size) for _ in stages ] + [ queue.Queue() ]
+
+        stop = threading.Event()
+        errors = []
+        slots = threading.Semaphore(self.max_in_flight)
+
+        lock = threading.Lock()
+        remaining = [ stage.workers for stage in stages ]
+
+        def put(target, value) -> bool:
+            while not stop.is_set():
+                try:
+                    target.put(value, timeout=_POLL)
+
+                    return True
+
+                except queue.Full:
+                    pass
+
+            return False
+
+        def fail(error) -> None:
+            errors.append(error)
+
+            stop.set()
+
+        def source() -> None:
+            try:
+                for sequence, item in enumerate(items):
+                    while not slots.acquire(timeout=_POLL):
+                        if stop.is_set():
+                            return
+
+                    # Items are admitted in order, so the one the
+                    # consumer waits for is never held back here.
+                    if budget is not None:
+                        budget.wait_for_room(stop)
+
+                    if not put(queues[0], (sequence, item, 0)):
+                        return
+
+            except BaseException as error:
+                fail(error)
+
+            finally:
+                for _ in range(stages[0].workers):
+                    put(queues[0], _DONE)
+
+        def work(position:int, stage:Stage) -> None:
+            inbox, outbox = queues[position], queues[position + 1]
+
+            following = stages[position + 1].workers if position + 1 < len(stages) else 1
+
+            prefix = 'pipeline.{}.'.format(stage.name)
+
+            previous = stages[position - 1].name if position else None
+
+            while True:
+                try:
+                    value = inbox.get(timeout=_POLL)
+
+                except queue.Empty:
+                    if stop.is_set():
+                        return
+
+                    continue
+
+                if value is _DONE:
+                    with lock:
+                        remaining[position] -= 1
+
+                        last = remaining[position] == 0
+
+                    # The last worker out tells the next stage.
+                    if last:
+                        for _ in range(following):
+                            put(outbox, _DONE)
+
+                    return
+
+                sequence, item, size = value
+
+                metrics.set_gauge(prefix + 'queued', inbox.qsize())
+
+                start = time.monotonic()
+
+                try:
+                    result = stage.function(item)
+
+                except BaseException as error:
+                    fail(error)
+
+                    return
+
+                metrics.increment(prefix + 'items')
+                metrics.increment(prefix + 'busy_seconds', time.monotonic() - start)
+
+                result_size = 0
+
+                if budget is not None:
+                    result_size = _get_size(result)
+
+                    budget.add(stage.name, result_size)
+
+                    if previous is not None:
+                        budget.add(previous, -size)
+
+                if not put(outbox, (sequence, result, result_size)):
+                    return
+
+        threads = [ threading.Thread(target=source, name='meteostat-pipeline-source', daemon=True) ]
+
+        for position, stage in enumerate(stages):
+            for index in range(stage.workers):
+                threads.append(threading.Thread(target=work, args=(position, stage),
+                    name='meteostat-pipeline-{}-{}'.format(stage.name, index), daemon=True))
+
+        for thread in threads:
+            thread.start()
+
+        output = queues[-1]
+
+        last = stages[-1].name
+
+        pending = {}
+        expected = 0
+
+        sampled = time.monotonic()
+
+        def consumed(size) -> None:
+            nonlocal sampled
+
+            slots.release()
+
+            if budget is not None:
+                budget.add(last, -size)
+
+                if time.monotonic() - sampled >= 1:
+                    sampled = time.monotonic()
+
+                    sample_memory()
+
+        try:
+            while True:
+                try:
+                    value = output.get(timeout=_POLL)
+
+                except queue.Empty:
+                    if stop.is_set():
+                        break
+
+                    continue
+
+                if value is _DONE:
+                    break
+
+                sequence, result, size = value
+
+                if not self.ordered:
+                    yield result
+
+                    consumed(size)
+
+                    continue
+
+                pending[sequence] = (result, size)
+
+                while expected in pending:
+                    result, size = pending.pop(expected)
+
+                    expected += 1
+
+                    yield result
+
+                    consumed(size)
+
+            if errors:
+                raise errors[0]
+
+        finally:
+            # Also stops the workers when the consumer gives up early.
+            stop.set()
+
+            for thread in threads:
+                thread.join()
+
+    def __str__(self) -> str:
+        return "Pipeline: {}".format(" -> ".join(stage.name for stage in self.stages))
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,182 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Background prefetch and refresh of hot stations"""
+
+__all__ = ['PrefetchScheduler']
+
+import time
+import threading
+
+from meteostat import meteostat2
+
+class PrefetchScheduler(object):
+    """Keeps the most requested station files warm in the response cache.
+
+    Every ``interval`` seconds the scheduler ranks the urls requested
+    through the get_* functions, takes the ``top`` hottest of each
+    dataset and downloads those that are missing from the cache or
+    within ``refresh_ahead`` (a fraction of options.cache_ttl) of
+    expiring. Downloads go through ``workers`` threads and never exceed
+    ``requests_per_minute``. Access counts are halved after every round
+    so the ranking follows recent traffic.
+
+    Requires the response cache, set options.cache_ttl first."""
+
+    def __init__(self, top:int = 100, requests_per_minute:int = 60, workers:int = 2,
+        interval:float = 60, refresh_ahead:float = 0.2) -> None:
+
+        self.top=top
+        self.requests_per_minute=requests_per_minute
+        self.workers=workers
+        self.interval=interval
+        self.refresh_ahead=refresh_ahead
+
+        self._stop=threading.Event()
+        self._thread=None
+        self._next_request=0.0
+
+    def _get_hot_urls(self) -> list:
+        """The hottest urls of every dataset, hottest first."""
+
+        with meteostat2._cache._lock:
+            hits = dict(meteostat2._cache.hits)
+
+            # Counters decay, urls no longer requested are forgotten.
+            meteostat2._cache.hits = { url: count // 2 for url, count in hits.items() if count > 1 }
+
+        datasets = {}
+
+        for url, count in hits.items():
+            if count:
+                datasets.setdefault(url.rsplit('/', 1)[0], []).append((count, url))
+
+        result = []
+
+        for ranking in datasets.values():
+            ranking.sort(reverse=True)
+
+            result.extend(ranking[:self.top])
+
+        result.sort(reverse=True)
+
+        return [ url for count, url in result ]
+
+    def _is_due(self, url:str, ttl:float) -> bool:
+        """Whether url is missing from the cache or about to expire."""
+
+        age = meteostat2._cache.age(url)
+
+        return age is None or age >= ttl * (1 - self.refresh_ahead)
+
+    def _wait_for_budget(self) -> bool:
+        """Sleeps until the request budget allows one more download, False
+        when the scheduler was stopped meanwhile."""
+
+        delay = self._next_request - time.monotonic()
+
+        if delay > 0 and self._stop.wait(delay):
+            return False
+
+        self._next_request = max(self._next_request, time.monotonic()) + 60 / self.requests_per_minute
+
+        return True
+
+    def run_once(self) -> int:
+        """Runs one prefetch round, returns the number of files fetched."""
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        ttl = meteostat2._get_options().cache_ttl
+
+        if ttl is None:
+            raise ValueError('PrefetchScheduler requires the response cache, set options.cache_ttl')
+
+        due = [ url for url in self._get_hot_urls() if self._is_due(url, ttl) ]
+
+        fetched = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = []
+
+            for url in due:
+                if not self._wait_for_budget():
+                    break
+
+                futures.append(executor.submit(meteostat2._refresh_data_from_endpoint, url=url))
+
+            for future in futures:
+                try:
+                    if future.result() is not None:
+                        fetched += 1
+
+                except Exception as error:
+                    print('Prefetch failed: {}'.format(error))
+
+        return fetched
+
+    def _run(self) -> None:
+
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+
+            except Exception as error:
+                print('Prefetch round failed: {}'.format(error))
+
+            self._stop.wait(self.interval)
+
+    def start(self) -> 'PrefetchScheduler':
+        """Starts prefetching in a daemon thread."""
+
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+
+            self._thread = threading.Thread(target=self._run, name='meteostat-prefetch', daemon=True)
+            self._thread.start()
+
+        return self
+
+    def stop(self, timeout:float = None) -> None:
+        """Stops the scheduler, waiting for the current round."""
+
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    def __str__(self) -> str:
+        return "PrefetchScheduler: top {} per dataset, {} requests/min, {} workers, every {}s".format(
+            self.top, self.requests_per_minute, self.workers, self.interval
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,367 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Unified query entry point with projection and predicate pushdown"""
+
+__all__ = ['fetch']
+
+import io
+import re
+import datetime
+import operator
+
+from meteostat import meteostat2
+
+OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '=': operator.eq,
+    '==': operator.eq,
+    '!=': operator.ne
+}
+
+_PREDICATE = re.compile(r'^\s*(\w+)\s*(<=|>=|==|!=|<|>|=)\s*(\S+)\s*$')
+
+class Query(object):
+    """The plan of a fetch() call: which files to request, which raw
+    csv fields to read and which rows to keep."""
+
+    def __init__(self, granularity:str, variant:str, stations:list, start, end, columns, where) -> None:
+
+        self.granularity=granularity
+        self.action, self.fieldnames = meteostat2._get_dataset(granularity, variant)
+
+        if columns is None:
+            columns = self.fieldnames
+
+        for column in columns:
+            if column not in self.fieldnames:
+                raise ValueError('Unknown column {} for {}'.format(column, self.action))
+
+        self.columns=tuple(columns)
+
+        # Raw station files come without the id column.
+        self.positions=[ self.fieldnames.index(column) - 1 for column in self.columns ]
+
+        self.predicates=[ self._compile(predicate) for predicate in _get_predicates(where) ]
+
+        self.start=None if start is None else self._get_bound(start)
+        self.end=None if end is None else self._get_bound(end, end=True)
+
+        if granularity == 'normals' and (start is not None or end is not None):
+            raise ValueError('normals have no time axis, start and end are not supported')
+
+        self.stations=self._plan_stations(stations, start, end)
+
+    def _compile(self, predicate:tuple) -> tuple:
+        """Resolves a (column, operator, value) predicate to raw fields."""
+
+        column, symbol, value = predicate
+
+        if column not in self.fieldnames or column == 'id':
+            raise ValueError('Cannot filter on {}'.format(column))
+
+        if symbol not in OPERATORS:
+            raise ValueError('Unknown operator {}'.format(symbol))
+
+        if not isinstance(value, (int, float)):
+            value = float(value)
+
+        return (self.fieldnames.index(column) - 1, OPERATORS[symbol], value)
+
+    def _get_bound(self, value, end:bool = False) -> tuple:
+        """Time bound comparable with _get_key(). A partial end bound
+        ('2020', '2020-07', a date without time) covers the whole period,
+        up to its last month, day or hour."""
+
+        # Whether the hour is given.
+        timed = isinstance(value, datetime.datetime)
+
+        if isinstance(value, str):
+            timed = len(value) > 10
+
+            # Accept '2020' and '2020-07' as well.
+            bound = datetime.datetime.fromisoformat(value + '-01-01'[len(value) - 4:] if len(value) < 10 else value)
+
+            if end and len(value) == 4:
+                bound = bound.replace(month=12, day=31)
+
+            elif end and len(value) == 7:
+                # The day before the first of the next month.
+                bound = bound.replace(day=28) + datetime.timedelta(days=4)
+                bound = bound - datetime.timedelta(days=bound.day)
+
+            value = bound
+
+        if self.granularity == 'monthly':
+            return (value.year, value.month)
+
+        if self.granularity == 'daily':
+            return ('{:%Y-%m-%d}'.format(value), )
+
+        if timed:
+            hour = value.hour
+        else:
+            hour = 23 if end else 0
+
+        return ('{:%Y-%m-%d}'.format(value), hour)
+
+    def _plan_stations(self, stations:list, start, end) -> list:
+        """Station ids to request. When the whole network is queried,
+        stations whose inventory does not overlap [start, end] are
+        skipped without a request."""
+
+        if stations is not None:
+            if isinstance(stations, str):
+                stations = [ stations ]
+
+            return list(stations)
+
+        result = []
+
+        for record in meteostat2.get_stations_full():
+            inventory = (record.get('inventory') or {}).get(self.granularity) or {}
+
+            first, last = inventory.get('start'), inventory.get('end')
+
+            if (start is not None or end is not None) and first is None:
+                continue
+
+            if end is not None and _truncate(first, end) > _truncate(end, first):
+                continue
+
+            if start is not None and last is not None and _truncate(start, last) > _truncate(last, start):
+                continue
+
+            result.append(record['id'])
+
+        return result
+
+    def _get_key(self, fields:list) -> tuple:
+        """Time key of a raw csv row."""
+
+        if self.granularity == 'monthly':
+            return (int(fields[0]), int(fields[1]))
+
+        if self.granularity == 'daily':
+            return (fields[0], )
+
+        return (fields[0], int(fields[1]))
+
+    def _seek(self, data:str) -> int:
+        """Offset of the first line at or after start. Station files are
+        sorted in time, so this is a binary search over the text."""
+
+        low, high = 0, len(data)
+
+        while low < high:
+            middle = (low + high) // 2
+
+            begin = data.rfind('\n', 0, middle) + 1
+
+            newline = data.find('\n', begin)
+
+            line = data[begin:newline if newline != -1 else len(data)].rstrip('\r')
+
+            if line and self._get_key(line.split(',')) < self.start:
+                low = newline + 1 if newline != -1 else len(data)
+            else:
+                high = begin
+
+        return low
+
+    def get_days(self) -> tuple:
+        """(start, end) as YYYYMMDD, for meteostat.offsets."""
+
+        def get_day(bound):
+            if bound is None:
+                return None
+
+            if self.granularity == 'monthly':
+                return bound[0] * 10000 + bound[1] * 100 + 1
+
+            return int(bound[0].replace('-', ''))
+
+        return get_day(self.start), get_day(self.end)
+
+    def rows(self, station:str, data:str):
+        """Yields the projected fields of the rows of a raw station file
+        that match the time range and the predicates."""
+
+        offset = 0 if self.start is None or self.granularity == 'normals' else self._seek(data)
+
+        timed = self.granularity != 'normals' and (self.start is not None or self.end is not None)
+
+        text = io.StringIO(data)
+        text.seek(offset)
+
+        # Lines are read one at a time, nothing past end is split.
+        for line in text:
+            line = line.rstrip('\r\n')
+
+            if not line:
+                continue
+
+            fields = line.split(',')
+
+            if timed:
+                key = self._get_key(fields)
+
+                if self.end is not None and key > self.end:
+                    break
+
+                if self.start is not None and key < self.start:
+                    continue
+
+            matched = True
+
+            for position, compare, value in self.predicates:
+                field = fields[position] if position < len(fields) else ''
+
+                # Missing values never match, as NULL in SQL.
+                if not field or not compare(float(field), value):
+                    matched = False
+
+                    break
+
+            if matched:
+                yield [ station if position < 0 else (fields[position] if position < len(fields) else '')
+                    for position in self.positions ]
+
+def _to_iso(bound) -> str:
+    """ISO form of a date, datetime, str or int (a year) bound."""
+
+    if isinstance(bound, (datetime.date, datetime.datetime)):
+        return bound.isoformat()
+
+    return str(bound)
+
+def _truncate(bound, inventory) -> str:
+    """ISO form of a time bound cut to the precision of an inventory
+    value ('2020' for monthly years, '2020-06-01' for dates), or the
+    other way around."""
+
+    bound = _to_iso(bound)
+
+    return bound[:len(_to_iso(inventory))]
+
+def _get_predicates(where) -> list:
+    """Normalises where to a list of (column, operator, value)."""
+
+    if where is None:
+        return []
+
+    if isinstance(where, (str, tuple)):
+        where = [ where ]
+
+    result = []
+
+    for predicate in where:
+        if isinstance(predicate, str):
+            match = _PREDICATE.match(predicate)
+
+            if match is None:
+                raise ValueError('Cannot parse predicate {!r}'.format(predicate))
+
+            predicate = match.groups()
+
+        result.append(tuple(predicate))
+
+    return result
+
+def fetch(granularity:str = 'hourly', variant:str = 'full', stations:list = None, start = None, end = None,
+    columns:list = None, where = None, format:str = 'csv', **kwargs):
+    """retrieves only the requested rows and columns of a dataset.
+
+    Parameters
+    ----------
+    granularity: str
+        hourly, daily, monthly or normals. Default hourly.
+
+    variant: str
+        full or obs, ignored for normals. Default full.
+
+    stations: str or list
+        The station identifiers. Default None, every station listed in
+        get_stations_full() whose inventory overlaps [start, end].
+
+    start, end: datetime, date or str
+        The inclusive time range. Default None, unbounded. A partial
+        end ('2019', '2019-07', a date without time) includes the whole
+        year, month or day.
+
+    columns: list
+        The columns to return, e.g. ['id', 'date', 'temp']. Default None,
+        every column.
+
+    where: str, tuple or list
+        Row filters applied while parsing, e.g. 'temp > 30' or
+        [('temp', '>', 30), 'rhum < 50']. All must hold, missing values
+        never match. Default None.
+
+    format: str
+        Controls the output format. Default csv, the other option is json.
+
+    **kwargs :
+        Optional arguments that ``requests.get()`` takes. For example,
+        `proxies`, `cert` and `verify`.
+
+    Returns
+    -------
+    str (json or csv)
+        the requested data.
+
+    See:
+
+        https://dev.meteostat.net/bulk/
+
+    for more details"""
+
+    query = Query(granularity, variant, stations, start, end, columns, where)
+
+    rows = []
+
+    timed = granularity != 'normals' and (query.start is not None or query.end is not None)
+
+    for station in query.stations:
+        url = meteostat2._get_station_url(action=query.action, station=station)
+
+        if timed:
+            start, end = query.get_days()
+
+            data = meteostat2._get_range_from_endpoint(url=url, station=station, start=start, end=end)
+        else:
+            data = meteostat2._get_data_from_endpoint(url=url, isstation=False, station=station)
+
+        rows.extend(query.rows(station, data))
+
+    if format == 'json':
+        return [ dict(zip(query.columns, row)) for row in rows ]
+
+    lines = [ ",".join(query.columns) ]
+
+    lines.extend(",".join(row) for row in rows)
+
+    return "\r\n".join(lines)
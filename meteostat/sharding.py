@@ -0,0 +1,123 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Deterministic sharding of all-stations jobs"""
+
+__all__ = ['shard_stations']
+
+import zlib
+import heapq
+
+def _get_hash(id:str) -> int:
+    """Stable across processes and machines, unlike hash()."""
+
+    return zlib.crc32(id.encode('utf-8'))
+
+def _get_weight(record:dict, granularity:str) -> int:
+    """Expected relative file size of a station: the number of years of
+    its inventory for the dataset, at least 1."""
+
+    inventory = ((record.get('inventory') or {}).get(granularity) or {}) if isinstance(record, dict) else {}
+
+    start, end = inventory.get('start'), inventory.get('end')
+
+    if start is None or end is None:
+        return 1
+
+    try:
+        return max(1, int(str(end)[:4]) - int(str(start)[:4]) + 1)
+
+    except ValueError:
+        return 1
+
+def _check_shard(shard_index:int = None, shard_count:int = None) -> None:
+    """Raises ValueError unless shard_index and shard_count are both
+    given, with the index in range, or both left out."""
+
+    if (shard_index is None) != (shard_count is None):
+        raise ValueError('shard_index and shard_count go together, pass both or neither')
+
+    if shard_count is not None and (shard_count < 1 or not 0 <= shard_index < shard_count):
+        raise ValueError('shard_index must be in [0, {})'.format(shard_count))
+
+def shard_stations(stations:list, shard_index:int = 0, shard_count:int = 1, balance:bool = False,
+    granularity:str = 'hourly', **kwargs) -> list:
+    """selects the stations of one shard.
+
+    Every machine running the same shard_count with a different
+    shard_index gets a disjoint part of the stations, with no
+    coordination.
+
+    Parameters
+    ----------
+    stations: list
+        Station ids, or get_stations_full() records.
+
+    shard_index: int
+        This shard, from 0 to shard_count - 1. Default 0.
+
+    shard_count: int
+        The number of shards. Default 1.
+
+    balance: bool
+        Default False, a station goes to crc32(id) % shard_count.
+        When True, stations are spread by expected file size (the years
+        of the granularity's inventory, records only) so every shard
+        gets about the same amount of data. Every machine must then use
+        the same station list.
+
+    granularity: str
+        The inventory used to balance. Default hourly.
+
+    Returns
+    -------
+    list
+        the stations of the shard, in their original order."""
+
+    _check_shard(shard_index, shard_count)
+
+    def get_id(station):
+        return station['id'] if isinstance(station, dict) else station
+
+    if not balance:
+        return [ station for station in stations if _get_hash(get_id(station)) % shard_count == shard_index ]
+
+    # Largest first onto the least loaded shard, ties broken by id hash
+    # and shard number so the assignment is the same everywhere.
+    order = sorted(range(len(stations)), key=lambda position: (
+        -_get_weight(stations[position], granularity), _get_hash(get_id(stations[position])), get_id(stations[position])
+    ))
+
+    loads = [ (0, shard) for shard in range(shard_count) ]
+
+    selected = []
+
+    for position in order:
+        load, shard = heapq.heappop(loads)
+
+        if shard == shard_index:
+            selected.append(position)
+
+        heapq.heappush(loads, (load + _get_weight(stations[position], granularity), shard))
+
+    return [ stations[position] for position in sorted(selected) ]
@@ -0,0 +1,190 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+
+"""Sources of the bulk files, remote or local"""
+
+__all__ = ['Source', 'HTTPSource', 'FileSource']
+
+import io
+import os
+import abc
+
+class Source(abc.ABC):
+    """Where bulk files are read from.
+
+    A source resolves the urls built from its ``base`` (datasets are
+    always ``base + 'hourly/full/10637.csv.gz'`` and the like) to the
+    compressed payload or to its decompressed lines."""
+
+    # Downloads are worth keeping in the on-disk bulk cache.
+    remote = True
+
+    base = None
+
+    @abc.abstractmethod
+    def get_payload(self, url:str = None, station:str = None, **kwargs):
+        """The compressed payload of url, bytes-like, None on failure."""
+
+    @abc.abstractmethod
+    def iter_lines(self, url:str = None, station:str = None, **kwargs):
+        """Yields the decompressed, non-empty lines of url."""
+
+    def __str__(self) -> str:
+        return "{}: {}".format(type(self).__name__, self.base)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class HTTPSource(Source):
+    """The bulk endpoint, or a mirror of it, over HTTP(S). The default.
+
+    Parameters
+    ----------
+    base: str
+        Default None, follow meteostat2.options.endpoint."""
+
+    def __init__(self, base:str = None) -> None:
+
+        self._base=base
+
+    @property
+    def base(self) -> str:
+        if self._base is not None:
+            return self._base
+
+        from meteostat.meteostat2 import _get_configured_endpoint_url
+
+        return _get_configured_endpoint_url()
+
+    def get_payload(self, url:str = None, station:str = None, **kwargs):
+
+        from meteostat.meteostat2 import _download_payload
+
+        return _download_payload(url=url, station=station, **kwargs)
+
+    def iter_lines(self, url:str = None, station:str = None, **kwargs):
+
+        from meteostat.meteostat2 import _iter_lines_from_http
+
+        return _iter_lines_from_http(url=url, station=station, **kwargs)
+
+class FileSource(Source):
+    """A directory tree laid out like the bulk endpoint, e.g. files synced
+    to local NVMe or NFS (``root/hourly/full/10637.csv.gz``, ...).
+
+    Files are read with plain buffered reads. Files of at least
+    ``mmap_threshold`` bytes are memory-mapped instead, so the page cache
+    is used without copying them into the process.
+
+    Parameters
+    ----------
+    root: str
+        The directory, or a file: url.
+
+    mmap_threshold: int
+        Default 1 MiB. None never maps files.
+
+    buffer_size: int
+        Default 1 MiB, read buffer when streaming lines."""
+
+    remote = False
+
+    def __init__(self, root:str = None, mmap_threshold:int = 1 << 20, buffer_size:int = 1 << 20) -> None:
+
+        if root.startswith('file:'):
+            from urllib.parse import urlparse
+            from urllib.request import url2pathname
+
+            root = url2pathname(urlparse(root).path)
+
+        self.root=os.path.abspath(root)
+        self.mmap_threshold=mmap_threshold
+        self.buffer_size=buffer_size
+
+    @property
+    def base(self) -> str:
+        from urllib.request import pathname2url
+
+        return 'file://' + pathname2url(self.root).rstrip('/') + '/'
+
+    def get_path(self, url:str = None) -> str:
+        """The file behind url, which must be under this source."""
+
+        from urllib.request import url2pathname
+
+        base = self.base
+
+        if not url.startswith(base):
+            raise ValueError('{} is not under {}'.format(url, base))
+
+        path = os.path.abspath(os.path.join(self.root, url2pathname(url[len(base):])))
+
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise ValueError('{} is not under {}'.format(url, base))
+
+        return path
+
+    def get_payload(self, url:str = None, station:str = None, **kwargs):
+
+        path = self.get_path(url)
+
+        try:
+            file = open(path, 'rb')
+
+        except FileNotFoundError:
+            print('Invalid request for stations {}. Retrieved: {} not found'.format(station, path))
+
+            return None
+
+        with file:
+            size = os.fstat(file.fileno()).st_size
+
+            if self.mmap_threshold is None or size < max(self.mmap_threshold, 1):
+                return file.read()
+
+            import mmap
+
+            # The mapping stays valid once the file is closed.
+            return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def iter_lines(self, url:str = None, station:str = None, **kwargs):
+
+        import gzip
+
+        path = self.get_path(url)
+
+        try:
+            raw = open(path, 'rb', buffering=self.buffer_size)
+
+        except FileNotFoundError:
+            print('Invalid request for stations {}. Retrieved: {} not found'.format(station, path))
+
+            return
+
+        with raw, gzip.GzipFile(fileobj=raw) as file:
+            for line in io.TextIOWrapper(io.BufferedReader(file, self.buffer_size), encoding='utf-8', newline=''):
+                line = line.rstrip('\r\n')
+
+                if line:
+                    yield line
@@ -0,0 +1,364 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""SQLite storage of station data"""
+
+__all__ = ['SQLiteStore']
+
+import threading
+
+from meteostat import meteostat2
+from meteostat.columnar import get_column_type
+
+# (station, time) key of every dataset, the primary key of its table.
+KEY_COLUMNS = {
+    'hourly': ('id', 'date', 'hour'),
+    'daily': ('id', 'date'),
+    'monthly': ('id', 'year', 'month'),
+    'normals': ('id', 'start', 'end', 'month')
+}
+
+SQL_TYPES = {
+    'category': 'TEXT',
+    'date': 'TEXT',
+    'int': 'INTEGER',
+    'float': 'REAL'
+}
+
+# Bulk loading favours speed: the write-ahead log with relaxed syncing
+# stays consistent after a crash, only the last transactions may be
+# lost, which a new load restores.
+PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+    'PRAGMA mmap_size = 268435456'
+)
+
+def _quote(name:str) -> str:
+    """SQL identifier, 'end' is a keyword."""
+
+    return '"{}"'.format(name)
+
+class SQLiteStore(object):
+    """Station data in a SQLite database, one table per dataset
+    (hourly_full, daily_obs, normals, ...).
+
+    Rows are stored clustered by (station, time), the primary key of
+    every table, so the history of a station over a time range is one
+    index range scan. Loads are upserts: loading a station again only
+    rewrites the rows that changed.
+
+    Parameters
+    ----------
+    path: str
+        The database file. Default ':memory:'."""
+
+    def __init__(self, path:str = ':memory:') -> None:
+
+        import sqlite3
+
+        self.path=path
+
+        # Transactions are managed explicitly, see load().
+        self.connection=sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+
+        for pragma in PRAGMAS:
+            self.connection.execute(pragma)
+
+        self._lock=threading.RLock()
+
+    def get_table(self, granularity:str = 'hourly', variant:str = 'full') -> str:
+        """Name of the table of a dataset, created when missing."""
+
+        if granularity == 'normals':
+            variant = None
+
+        action, header = meteostat2._get_dataset(granularity, variant)
+
+        table = granularity if variant is None else '{}_{}'.format(granularity, variant)
+
+        columns = [ '{} {}'.format(_quote(name), SQL_TYPES[get_column_type(name)]) for name in header ]
+
+        with self._lock:
+            self.connection.execute('CREATE TABLE IF NOT EXISTS {} ({}, PRIMARY KEY ({})) WITHOUT ROWID'.format(
+                table, ', '.join(columns), ', '.join(_quote(name) for name in KEY_COLUMNS[granularity])
+            ))
+
+        return table
+
+    def _get_upsert(self, table:str, granularity:str, header:tuple) -> str:
+        """INSERT statement that updates existing rows, only when one of
+        their values changed."""
+
+        keys = KEY_COLUMNS[granularity]
+
+        values = [ name for name in header if name not in keys ]
+
+        return 'INSERT INTO {} ({}) VALUES ({}) ON CONFLICT ({}) DO UPDATE SET {} WHERE {}'.format(
+            table,
+            ', '.join(_quote(name) for name in header),
+            ', '.join('?' for _ in header),
+            ', '.join(_quote(name) for name in keys),
+            ', '.join('{0} = excluded.{0}'.format(_quote(name)) for name in values),
+            ' OR '.join('{0} IS NOT excluded.{0}'.format(_quote(name)) for name in values)
+        )
+
+    def _get_latest(self, table:str, granularity:str, station:str) -> tuple:
+        """Time key of the latest stored row of a station, None when
+        there is none."""
+
+        keys = KEY_COLUMNS[granularity][1:]
+
+        with self._lock:
+            return self.connection.execute('SELECT {} FROM {} WHERE id = ? ORDER BY {} LIMIT 1'.format(
+                ', '.join(_quote(name) for name in keys), table,
+                ', '.join('{} DESC'.format(_quote(name)) for name in keys)
+            ), (station, )).fetchone()
+
+    def load(self, granularity:str = 'hourly', variant:str = 'full', stations:list = None, incremental:bool = False,
+        **kwargs) -> int:
+        """downloads stations and upserts their rows.
+
+        Stations are downloaded concurrently (see options.max_concurrency)
+        while rows are written by executemany() in one transaction per
+        station, values are converted by the column types.
+
+        Parameters
+        ----------
+        granularity: str
+            hourly, daily, monthly or normals. Default hourly.
+
+        variant: str
+            full or obs, ignored for normals. Default full.
+
+        stations: str or list
+            The station identifiers. Default None, every station listed in
+            get_stations_full().
+
+        incremental: bool
+            Default False, every row is upserted. When True only rows from
+            the day (or month) of each station's latest stored row on are,
+            for a cheap periodic refresh.
+
+        Returns
+        -------
+        int
+            the number of rows inserted or changed."""
+
+        if granularity == 'normals':
+            variant = None
+
+        action, header = meteostat2._get_dataset(granularity, variant)
+
+        table = self.get_table(granularity, variant)
+
+        if stations is None:
+            stations = [ record['id'] for record in meteostat2.get_stations_full() ]
+
+        elif isinstance(stations, str):
+            stations = [ stations ]
+
+        statement = self._get_upsert(table, granularity, header)
+
+        # Rows at or after this many leading key fields of the latest
+        # stored row are reloaded: the latest day, or month.
+        prefix = 1 if granularity in ('hourly', 'daily') else 2
+
+        def download(station):
+            return meteostat2._get_data_from_endpoint(
+                url=meteostat2._get_station_url(action=action, station=station), isstation=False, station=station
+            )
+
+        changed = 0
+
+        for station, data in zip(stations, meteostat2._map_stations(download, stations)):
+            if not data:
+                continue
+
+            latest = None
+
+            if incremental and granularity != 'normals':
+                latest = self._get_latest(table, granularity, station)
+
+            rows = _get_rows(station, data, len(header), latest[:prefix] if latest else None, granularity)
+
+            with self._lock:
+                self.connection.execute('BEGIN')
+
+                try:
+                    before = self.connection.total_changes
+
+                    self.connection.executemany(statement, rows)
+
+                    changed += self.connection.total_changes - before
+
+                    self.connection.execute('COMMIT')
+
+                except BaseException:
+                    self.connection.execute('ROLLBACK')
+
+                    raise
+
+        return changed
+
+    def query(self, granularity:str = 'hourly', variant:str = 'full', station:str = None, start = None, end = None,
+        columns:list = None, format:str = 'csv', **kwargs):
+        """reads stored rows of a station, in time order.
+
+        Parameters
+        ----------
+        granularity: str
+            hourly, daily, monthly or normals. Default hourly.
+
+        variant: str
+            full or obs, ignored for normals. Default full.
+
+        station: str
+            The station identifier. Default None, every stored station.
+
+        start, end: str
+            The inclusive range of the first key column after id, e.g.
+            '2020-07-01' for hourly and daily, 2020 for monthly. Default
+            None, unbounded.
+
+        columns: list
+            The columns to return. Default None, every column.
+
+        format: str
+            Default csv. json for a list of dicts, rows for a list of
+            tuples.
+
+        Returns
+        -------
+        str (csv), list (json) or list (rows)
+            the requested data."""
+
+        if granularity == 'normals':
+            variant = None
+
+        action, header = meteostat2._get_dataset(granularity, variant)
+
+        table = self.get_table(granularity, variant)
+
+        if columns is None:
+            columns = header
+
+        for column in columns:
+            if column not in header:
+                raise ValueError('Unknown column {} for {}'.format(column, action))
+
+        time = KEY_COLUMNS[granularity][1]
+
+        conditions, parameters = [], []
+
+        for condition, value in (('id = ?', station), ('{} >= ?'.format(_quote(time)), start), ('{} <= ?'.format(_quote(time)), end)):
+            if value is not None:
+                conditions.append(condition)
+                parameters.append(value)
+
+        sql = 'SELECT {} FROM {}{} ORDER BY {}'.format(
+            ', '.join(_quote(name) for name in columns), table,
+            ' WHERE ' + ' AND '.join(conditions) if conditions else '',
+            ', '.join(_quote(name) for name in KEY_COLUMNS[granularity])
+        )
+
+        with self._lock:
+            rows = self.connection.execute(sql, parameters).fetchall()
+
+        if format == 'rows':
+            return rows
+
+        if format == 'json':
+            return [ dict(zip(columns, row)) for row in rows ]
+
+        lines = [ ",".join(columns) ]
+
+        lines.extend(",".join('' if value is None else str(value) for value in row) for row in rows)
+
+        return "\r\n".join(lines)
+
+    def stations(self, granularity:str = 'hourly', variant:str = 'full') -> list:
+        """Identifiers of the stored stations of a dataset."""
+
+        table = self.get_table(granularity, variant)
+
+        with self._lock:
+            return [ row[0] for row in self.connection.execute('SELECT DISTINCT id FROM {} ORDER BY id'.format(table)) ]
+
+    def execute(self, sql:str, parameters = ()) -> list:
+        """Runs any SQL statement, returns its rows."""
+
+        with self._lock:
+            return self.connection.execute(sql, parameters).fetchall()
+
+    def close(self) -> None:
+
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __str__(self) -> str:
+        return "SQLiteStore: {}".format(self.path)
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+def _get_rows(station:str, data:str, width:int, since:tuple, granularity:str):
+    """Yields parameter tuples of the rows of a raw station file, missing
+    values as NULL, optionally from a time key on."""
+
+    if since is not None:
+        since = tuple(str(value) for value in since)
+
+    for line in data.splitlines():
+        if not line:
+            continue
+
+        fields = line.split(',')
+
+        if since is not None:
+            key = tuple(fields[:len(since)])
+
+            # Years and months compare as numbers, dates as text.
+            if granularity == 'monthly':
+                key, bound = tuple(int(value) for value in key), tuple(int(value) for value in since)
+            else:
+                bound = since
+
+            if key < bound:
+                continue
+
+        # Fields are bound as text, column affinity converts them.
+        row = [ station ]
+
+        row.extend(field if field else None for field in fields[:width - 1])
+
+        row.extend(None for _ in range(width - len(row)))
+
+        yield row
@@ -0,0 +1,313 @@
+# Copyright (c) 2021
+
+#  Permission is hereby granted, free of charge, to any person
+#  obtaining a copy of this software and associated documentation
+#  files (the "Software"), to deal in the Software without
+#  restriction, including without limitation the rights to use,
+#  copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the
+#  Software is furnished to do so, subject to the following
+#  conditions:
+
+#  The above copyright notice and this permission notice shall be
+#  included in all copies or substantial portions of the Software.
+
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+#  EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES
+#  OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+#  NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT
+#  HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY,
+#  WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING
+#  FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR
+#  OTHER DEALINGS IN THE SOFTWARE.
+
+"""Streaming per-station summary statistics"""
+
+__all__ = ['Accumulator', 'StationSummary', 'summarize_all_stations']
+
+import math
+
+from meteostat import meteostat2
+from meteostat.columnar import get_column_type
+
+SUMMARY_FIELDS = ('id', 'variable', 'count', 'missing', 'missing_ratio', 'min', 'max', 'mean', 'std')
+
+class Accumulator(object):
+    """Online count, missing count, min, max, mean and variance of one
+    variable (Welford). Two accumulators merge exactly (Chan et al.), so
+    partial results of several workers combine into the same summary."""
+
+    __slots__ = ('count', 'missing', 'min', 'max', 'mean', 'm2')
+
+    def __init__(self) -> None:
+
+        self.count=0
+        self.missing=0
+        self.min=math.inf
+        self.max=-math.inf
+        self.mean=0.0
+        self.m2=0.0
+
+    def add(self, value:float) -> None:
+        """Adds a value, None for a missing one."""
+
+        if value is None:
+            self.missing += 1
+
+            return
+
+        self.count += 1
+
+        delta = value - self.mean
+
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        if value < self.min:
+            self.min = value
+
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other:'Accumulator') -> 'Accumulator':
+        """Adds the values seen by another accumulator."""
+
+        count = self.count + other.count
+
+        if other.count:
+            delta = other.mean - self.mean
+
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+
+        self.count = count
+        self.missing += other.missing
+
+        return self
+
+    @property
+    def missing_ratio(self) -> float:
+
+        total = self.count + self.missing
+
+        return self.missing / total if total else math.nan
+
+    @property
+    def variance(self) -> float:
+        """Sample variance, NaN below two values."""
+
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+
+        return math.sqrt(self.variance)
+
+    def __getstate__(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __setstate__(self, state:tuple) -> None:
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+    def __str__(self) -> str:
+        return "Accumulator: {} values, {} missing, mean {}".format(
+            self.count, self.missing, self.mean
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class StationSummary(object):
+    """Accumulators of every variable of every station.
+
+    Memory depends on the number of stations and variables only, never
+    on the length of their history. Summaries of disjoint (or sharded)
+    station sets merge into the network summary."""
+
+    def __init__(self, variables:tuple) -> None:
+
+        self.variables=tuple(variables)
+        self.stations={}
+
+    def get(self, station:str) -> dict:
+        """Accumulators of a station, by variable."""
+
+        accumulators = self.stations.get(station)
+
+        if accumulators is None:
+            accumulators = self.stations[station] = { variable: Accumulator() for variable in self.variables }
+
+        return accumulators
+
+    def merge(self, other:'StationSummary') -> 'StationSummary':
+        """Adds the stations of another summary."""
+
+        if other.variables != self.variables:
+            raise ValueError('Cannot merge summaries of different variables')
+
+        for station, accumulators in other.stations.items():
+            current = self.get(station)
+
+            for variable, accumulator in accumulators.items():
+                current[variable].merge(accumulator)
+
+        return self
+
+    def rows(self):
+        """Yields one tuple per station and variable, see SUMMARY_FIELDS.
+        Statistics without values are None."""
+
+        def get(value):
+            return None if value is None or math.isnan(value) or math.isinf(value) else value
+
+        for station, accumulators in self.stations.items():
+            for variable in self.variables:
+                accumulator = accumulators[variable]
+
+                empty = accumulator.count == 0
+
+                yield (station, variable, accumulator.count, accumulator.missing, get(accumulator.missing_ratio),
+                    None if empty else accumulator.min, None if empty else accumulator.max,
+                    None if empty else accumulator.mean, get(accumulator.std))
+
+    def to_csv(self) -> str:
+
+        lines = [ ",".join(SUMMARY_FIELDS) ]
+
+        for row in self.rows():
+            lines.append(",".join('' if value is None else str(value) for value in row))
+
+        return "\r\n".join(lines)
+
+    def to_json(self) -> list:
+
+        return [ dict(zip(SUMMARY_FIELDS, row)) for row in self.rows() ]
+
+    def __len__(self) -> int:
+        return len(self.stations)
+
+    def __str__(self) -> str:
+        return "StationSummary: {} stations, {} variables".format(
+            len(self.stations), len(self.variables)
+        )
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+def _summarize_station(action:str, header:tuple, variables:tuple, station:str) -> StationSummary:
+    """Summary of one station, streamed one row at a time."""
+
+    summary = StationSummary(variables)
+
+    # Raw station files come without the id column.
+    positions = [ header.index(variable) - 1 for variable in variables ]
+
+    accumulators = None
+
+    url = meteostat2._get_station_url(action=action, station=station)
+
+    for line in meteostat2._iter_lines_from_endpoint(url=url, station=station):
+        if accumulators is None:
+            accumulators = [ summary.get(station)[variable] for variable in variables ]
+
+        fields = line.split(',')
+
+        for accumulator, position in zip(accumulators, positions):
+            value = fields[position] if position < len(fields) else ''
+
+            accumulator.add(float(value) if value else None)
+
+    return summary
+
+def summarize_all_stations(granularity:str = 'hourly', variant:str = 'full', variables:tuple = None, stations:list = None,
+    shard_index:int = None, shard_count:int = None, balance:bool = False, format:str = None, **kwargs):
+    """computes count, missing ratio, min, max, mean and standard
+    deviation of every variable at every station, streaming.
+
+    Station files are never materialised: rows update numerically stable
+    online accumulators as they are read, so memory does not grow with
+    the length of the history. Stations are downloaded concurrently under
+    the same adaptive limit as the all-stations getters.
+
+    Parameters
+    ----------
+    granularity: str
+        hourly, daily, monthly or normals. Default hourly.
+
+    variant: str
+        full or obs, ignored for normals. Default full.
+
+    variables: tuple
+        The variables to summarize, e.g. ('temp', 'prcp'). Default None,
+        every measured variable of the dataset.
+
+    stations: list
+        The station identifiers. Default None, every station listed in
+        get_stations_full().
+
+    shard_index, shard_count, balance:
+        Summarize one shard of the stations only, see shard_stations().
+        Merge the summaries of all shards with StationSummary.merge().
+
+    format: str
+        Default None, the StationSummary itself. csv or json for the
+        summary table.
+
+    Returns
+    -------
+    StationSummary, str (csv) or list (json)
+        one row per station and variable: id, variable, count, missing,
+        missing_ratio, min, max, mean, std."""
+
+    if granularity == 'normals':
+        variant = None
+
+    action, header = meteostat2._get_dataset(granularity, variant)
+
+    if variables is None:
+        variables = tuple(name for name in header if get_column_type(name) == 'float')
+
+    if isinstance(variables, str):
+        variables = (variables, )
+
+    variables = tuple(variables)
+
+    for variable in variables:
+        if variable not in header or get_column_type(variable) != 'float':
+            raise ValueError('Cannot summarize {} of {}'.format(variable, action))
+
+    from meteostat.sharding import _check_shard, shard_stations
+
+    _check_shard(shard_index, shard_count)
+
+    if stations is None:
+        stations = meteostat2.get_stations_full()
+
+    elif isinstance(stations, str):
+        stations = [ stations ]
+
+    if shard_count is not None:
+        stations = shard_stations(stations, shard_index=shard_index, shard_count=shard_count,
+            balance=balance, granularity=granularity)
+
+    ids = [ station['id'] if isinstance(station, dict) else station for station in stations ]
+
+    summary = StationSummary(variables)
+
+    def summarize(station):
+        return _summarize_station(action, header, variables, station)
+
+    for part in meteostat2._map_stations(summarize, ids):
+        summary.merge(part)
+
+    if format == 'csv':
+        return summary.to_csv()
+
+    if format == 'json':
+        return summary.to_json()
+
+    return summary
@@ -33,13 +33,19 @@ setup(
     ],
     keywords = 'meteo meteostat meteostat2 weather weatherAPI meteorology',
     install_requires = [ 'requests' ],
+    extras_require = {
+        'numpy' : [ 'numpy' ],
+        'pandas' : [ 'numpy', 'pandas' ],
+        'arrow' : [ 'pyarrow' ],
+        'zstd' : [ 'zstandard' ]
+    },
     entry_points = {
         'console_scripts' : [
             'meteostat2 = meteostat.__main__:main',
             'meteo2 = meteostat.__main__:main'
         ]
     },
-    py_modules = [ 'meteostat.meteostat2' , 'meteostat.__main__' ],
+    py_modules = [ 'meteostat.meteostat2' , 'meteostat.matrix' , 'meteostat.catalog' , 'meteostat.columnar' , 'meteostat.prefetch' , 'meteostat.query' , 'meteostat.geo' , 'meteostat.mirror' , 'meteostat.sharding' , 'meteostat.metrics' , 'meteostat.concurrency' , 'meteostat.pipeline' , 'meteostat.memory' , 'meteostat.offsets' , 'meteostat.summary' , 'meteostat.storage' , 'meteostat.parquet' , 'meteostat.follow' , 'meteostat.compression' , 'meteostat.sources' , 'meteostat.diff' , 'meteostat.compact' , 'meteostat.__main__' ],
     test_require = [
         'pandas'
     ]
@@ -0,0 +1,87 @@
+import meteostat
+
+STATIONS = [
+    {
+        'id': '10637', 'name': { 'en': 'Frankfurt / Main' }, 'country': 'DE', 'region': 'HE',
+        'identifiers': { 'national': '10637', 'wmo': '10637', 'icao': 'EDDF' },
+        'location': { 'latitude': 50.05, 'longitude': 8.6, 'elevation': 111 },
+        'timezone': 'Europe/Berlin',
+        'inventory': {
+            'hourly': { 'start': '1926-01-01', 'end': '2022-04-25' },
+            'daily': { 'start': '1934-01-01', 'end': '2022-04-25' },
+            'monthly': { 'start': 1934, 'end': 2022 },
+            'normals': { 'start': 1961, 'end': 2020 }
+        }
+    },
+    {
+        'id': 'D1424', 'name': { 'en': 'Frankfurt-Westend' }, 'country': 'DE', 'region': 'HE',
+        'identifiers': { 'national': '01424', 'wmo': None, 'icao': None },
+        'location': { 'latitude': 50.1269, 'longitude': 8.6694, 'elevation': None },
+        'timezone': 'Europe/Berlin',
+        'inventory': {
+            'hourly': { 'start': None, 'end': None },
+            'daily': { 'start': '1949-01-01', 'end': '2022-04-24' },
+            'monthly': { 'start': None, 'end': None },
+            'normals': { 'start': None, 'end': None }
+        }
+    }
+]
+
+def test_catalog_lookups():
+    catalog = meteostat.StationCatalog.from_stations( STATIONS )
+
+    assert len( catalog ) == 2
+
+    assert catalog.get( '10637' ) == STATIONS[0]
+
+    assert catalog.get( 'D1424' ) == STATIONS[1]
+
+    assert catalog.by_icao( 'EDDF' )['id'] == '10637'
+
+    assert catalog.by_wmo( '01424' ) is None
+
+    assert catalog.by_country( 'DE' ) == [ '10637', 'D1424' ]
+
+def test_catalog_snapshot(tmp_path):
+    catalog = meteostat.StationCatalog.from_stations( STATIONS )
+
+    snapshot = str( tmp_path / 'stations.bin' )
+
+    catalog.save( snapshot )
+
+    loaded = meteostat.StationCatalog.fetch( snapshot = snapshot )
+
+    assert [ loaded.get( id ) for id in loaded ] == STATIONS
+
+def test_catalog_fetch():
+    catalog = meteostat.StationCatalog.fetch()
+
+    assert '10637' in catalog
+
+def test_catalog_snapshot_max_age( tmp_path ):
+    import os
+
+    from meteostat import meteostat2
+
+    snapshot = str( tmp_path / 'stations.bin' )
+
+    meteostat.StationCatalog.from_stations( STATIONS[ :1 ] ).save( snapshot )
+
+    # Only the snapshot is left in the directory.
+    assert os.listdir( str( tmp_path ) ) == [ 'stations.bin' ]
+
+    os.utime( snapshot, ( 0, 0 ) )
+
+    get_stations_full = meteostat2.get_stations_full
+
+    meteostat2.get_stations_full = lambda **kwargs: STATIONS
+
+    try:
+        assert len( meteostat.StationCatalog.fetch( snapshot = snapshot, max_age = None ) ) == 1
+
+        assert len( meteostat.StationCatalog.fetch( snapshot = snapshot, max_age = 3600 ) ) == 2
+
+    finally:
+        meteostat2.get_stations_full = get_stations_full
+
+    assert len( meteostat.StationCatalog.load( snapshot ) ) == 2
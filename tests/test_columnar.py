@@ -0,0 +1,42 @@
+import numpy as np
+
+import meteostat
+from meteostat import columnar
+
+DATA = '2020-01-01,0,1.5,-2.0,87\r\n2020-01-01,1,,-2.5,\r\n2020-01-02,0,3.0,,90\r\n'
+
+FIELDNAMES = ( 'id', 'date', 'hour', 'temp', 'dwpt', 'rhum' )
+
+def test_parse_columns():
+    buffers = columnar._parse_columns( data = DATA, fieldnames = FIELDNAMES, station = '10637' )
+
+    assert len( buffers ) == 3
+
+    assert list( buffers.values['date'] ) == [ 18262, 18262, 18263 ]
+
+    assert buffers.null_counts == { 'date': 0, 'hour': 0, 'temp': 1, 'dwpt': 1, 'rhum': 1 }
+
+    assert buffers.validity['temp'] == bytearray( [ 0b101 ] )
+
+def test_to_pandas():
+    df = columnar._get_frame_from_csv( data = DATA, fieldnames = FIELDNAMES, station = '10637', format = 'pandas' )
+
+    assert str( df['date'].dtype ).startswith( 'datetime64' )
+
+    assert df['hour'].dtype == np.int64
+
+    assert np.isnan( df['temp'][1] )
+
+    assert list( df['id'].cat.categories ) == [ '10637' ]
+
+def test_to_arrow():
+    table = columnar._get_frame_from_csv( data = DATA, fieldnames = FIELDNAMES, station = '10637', format = 'arrow' )
+
+    assert table.column( 'rhum' ).to_pylist() == [ 87.0, None, 90.0 ]
+
+    assert table.column( 'id' ).to_pylist() == [ '10637' ] * 3
+
+def test_get_hourly_full_station_pandas():
+    df = meteostat.get_hourly_full_station( format = 'pandas' )
+
+    assert df['temp'].dtype == np.float64
@@ -0,0 +1,108 @@
+import meteostat
+from meteostat import meteostat2
+
+DATA = '2020-01-01,0,1.5,,,,,310,,,,,13\r\n2020-01-01,1,,,,,,,,,,,\r\n2020-01-01,2,2.5,,,,,310.0,,,,,4\r\n'
+
+def test_compact_table():
+    table = meteostat.CompactTable( meteostat2.HOURLY_CSV_DATA_HEADER ).append( DATA, station = '10637' )
+
+    assert len( table ) == 3
+
+    assert table.get_dictionary( 'wdir' ) == [ 310.0 ]
+
+    assert table.get_dictionary( 'coco' ) == [ 13, 4 ]
+
+    assert table.get_coco_labels() == [ 'Heavy Sleet', 'Overcast' ]
+
+    assert table.codes[ 'coco' ].tolist() == [ 0, 0, 1 ] and table.is_missing( 'coco', 1 )
+
+    assert table.get_column( 'temp' ) == [ 1.5, None, 2.5 ]
+
+    rows = list( table.rows() )
+
+    assert rows[ 0 ][ 'id' ] == '10637' and rows[ 0 ][ 'hour' ] == 0 and rows[ 0 ][ 'date' ].isoformat() == '2020-01-01'
+
+    assert rows[ 1 ][ 'wdir' ] is None and rows[ 1 ][ 'coco' ] is None
+
+def test_compact_table_stations():
+    # Rows with the id column, as in all-stations results.
+    data = ''.join( '{},2020-01-01,0,1.0,,,,,,,,,,\r\n'.format( station ) for station in range( 300 ) )
+
+    table = meteostat.CompactTable( meteostat2.HOURLY_CSV_DATA_HEADER ).append( data )
+
+    # Codes widen past 256 stations.
+    assert table.codes[ 'id' ].typecode == 'H' and table.get_column( 'id' )[ -1 ] == '299'
+
+    other = meteostat.CompactTable( meteostat2.HOURLY_CSV_DATA_HEADER ).append( DATA, station = '10637' )
+
+    table.extend( other )
+
+    assert len( table ) == 303 and table.get_column( 'id' )[ -1 ] == '10637'
+
+    assert table.get_column( 'coco' )[ -3: ] == [ 13, None, 4 ] and table.get_column( 'coco' )[ 0 ] is None
+
+def test_compact_table_to_arrow():
+    import pyarrow
+
+    # coco and wdir are missing on every row, their dictionaries are empty.
+    data = '2020-01-01,0,1.5,,,,,,,,,,\r\n2020-01-01,1,,,,,,,,,,,\r\n'
+
+    table = meteostat.CompactTable( meteostat2.HOURLY_CSV_DATA_HEADER ).append( data, station = '10637' ).to_arrow()
+
+    assert table.schema.field( 'coco' ).type == pyarrow.dictionary( pyarrow.uint8(), pyarrow.int64() )
+
+    assert table.schema.field( 'wdir' ).type == pyarrow.dictionary( pyarrow.uint8(), pyarrow.float64() )
+
+    assert table.schema.field( 'id' ).type == pyarrow.dictionary( pyarrow.uint8(), pyarrow.string() )
+
+    assert table.column( 'coco' ).null_count == 2 and table.column( 'temp' ).to_pylist() == [ 1.5, None ]
+
+def test_get_coco_label():
+    assert meteostat.get_coco_label( 25 ) == 'Thunderstorm'
+
+    assert meteostat.get_coco_label( None ) is None
+
+def _write_tree( root, count ):
+    import gzip
+    import json
+
+    ( root / 'stations' ).mkdir()
+    ( root / 'daily' / 'full' ).mkdir( parents = True )
+
+    stations = [ { 'id': '{:05d}'.format( station ) } for station in range( count ) ]
+
+    ( root / 'stations' / 'full.json.gz' ).write_bytes( gzip.compress( json.dumps( stations ).encode( 'utf-8' ) ) )
+
+    data = ''.join( '2020-01-{:02d},{}.0,,,,,,,,,,\r\n'.format( day, day ) for day in range( 1, 29 ) )
+
+    for station in stations:
+        ( root / 'daily' / 'full' / '{}.csv.gz'.format( station[ 'id' ] ) ).write_bytes( gzip.compress( data.encode( 'utf-8' ) ) )
+
+def test_compact_all_stations_budget( tmp_path ):
+    _write_tree( tmp_path, 40 )
+
+    endpoint, budget = meteostat2.options.endpoint, meteostat2.options.memory_budget
+
+    meteostat2.options.endpoint = 'file://{}/'.format( tmp_path )
+
+    try:
+        # Over the budget the csv path would spill, the table cannot.
+        meteostat2.options.memory_budget = 2048
+
+        try:
+            meteostat.get_daily_full_all_stations( format = 'compact' )
+
+        except MemoryError:
+            assert True
+
+        else:
+            assert False
+
+        meteostat2.options.memory_budget = 1 << 20
+
+        table = meteostat.get_daily_full_all_stations( format = 'compact' )
+
+    finally:
+        meteostat2.options.endpoint, meteostat2.options.memory_budget = endpoint, budget
+
+    assert len( table ) == 40 * 28 and len( table.get_dictionary( 'id' ) ) == 40
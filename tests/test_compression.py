@@ -0,0 +1,69 @@
+import gzip
+import io
+
+import meteostat
+
+def test_compressed_writer_blocks():
+    data = ''.join( '10637,2020-01-01,{},{}.0\r\n'.format( hour % 24, hour ) for hour in range( 20000 ) )
+
+    output = io.BytesIO()
+
+    with meteostat.CompressedWriter( output, codec = 'gzip', threads = 3, block_size = 4096 ) as writer:
+        for offset in range( 0, len( data ), 1000 ):
+            writer.write( data[ offset:offset + 1000 ] )
+
+    # Several members, still one standard stream.
+    assert output.getvalue().count( b'\x1f\x8b\x08' ) > 1
+
+    assert gzip.decompress( output.getvalue() ).decode( 'utf-8' ) == data
+
+def test_compressed_writer_concatenation( tmp_path ):
+    path = str( tmp_path / 'all.csv.gz' )
+
+    with meteostat.CompressedWriter( path ) as writer:
+        writer.write( 'a,1\r\n' )
+
+    with open( path, 'ab' ) as file, meteostat.CompressedWriter( file, codec = 'gzip', level = 1 ) as writer:
+        writer.write( b'b,2\r\n' )
+
+    assert gzip.open( path, 'rt', newline = '' ).read() == 'a,1\r\nb,2\r\n'
+
+def test_get_codec():
+    assert meteostat.get_codec( 'all.csv.gz' ) == 'gzip'
+
+    assert meteostat.get_codec( 'all.csv.zst' ) == 'zstd'
+
+    assert meteostat.get_codec( 'all.csv' ) is None
+
+    try:
+        meteostat.CompressedWriter( io.BytesIO(), codec = 'lzma' )
+
+    except ValueError:
+        assert True
+
+    else:
+        assert False
+
+def test_compressed_writer_large_write():
+    data = ''.join( '10637,2020-01-01,{},{}.0\r\n'.format( hour % 24, hour ) for hour in range( 20000 ) )
+
+    output = io.BytesIO()
+
+    writer = meteostat.CompressedWriter( output, codec = 'gzip', threads = 2, block_size = 1024 )
+
+    writer.write( data )
+
+    # One write, still at most two blocks per thread held.
+    assert len( writer._pending ) <= 4 and writer._size < 1024
+
+    writer.close()
+
+    assert gzip.decompress( output.getvalue() ).decode( 'utf-8' ) == data
+
+def test_cli_compression_arguments():
+    from meteostat.__main__ import _get_parser
+
+    for command in ( [ 'stations' ], [ 'data', '10637' ], [ 'all' ], [ 'diff', 'old.csv', 'new.csv' ] ):
+        args = _get_parser().parse_args( command + [ '-o', 'out.json.gz', '--level', '1' ] )
+
+        assert args.level == 1 and args.threads is None
@@ -0,0 +1,64 @@
+import time
+import threading
+
+import meteostat
+from meteostat import concurrency
+
+def test_adaptive_limiter_increases_and_backs_off():
+    limiter = meteostat.AdaptiveLimiter( initial = 2, maximum = 4 )
+
+    for _ in range( 20 ):
+        limiter.acquire()
+        limiter.release( latency = 0.01, nbytes = 100 )
+
+    assert 2 < limiter.limit <= 4
+
+    limit = limiter.limit
+
+    limiter.acquire()
+    limiter.release( latency = 0.01, failed = True )
+
+    assert limiter.limit == max( 1, limit // 2 )
+
+    assert meteostat.get_metrics()[ 'concurrency.limit' ] == limiter.limit
+
+    assert meteostat.get_metrics()[ 'concurrency.errors' ] >= 1
+
+def test_adaptive_limiter_backs_off_on_latency():
+    limiter = meteostat.AdaptiveLimiter( initial = 4, maximum = 4 )
+
+    for _ in range( 4 ):
+        limiter.acquire()
+        limiter.release( latency = 0.01 )
+
+    for _ in range( 4 ):
+        limiter.acquire()
+        limiter.release( latency = 1.0 )
+
+    assert limiter.limit == 2
+
+def test_map_ordered_respects_limit_and_order():
+    limiter = meteostat.AdaptiveLimiter( initial = 3, minimum = 3, maximum = 3 )
+
+    lock = threading.Lock()
+    running = [ 0, 0 ]
+
+    def work( item ):
+        with lock:
+            running[0] += 1
+            running[1] = max( running[1], running[0] )
+
+        time.sleep( 0.005 )
+
+        with lock:
+            running[0] -= 1
+
+        return str( item )
+
+    result = list( concurrency.map_ordered( work, range( 50 ), limiter ) )
+
+    assert result == [ str( i ) for i in range( 50 ) ]
+
+    assert running[1] <= 3
+
+    assert limiter.in_flight == 0
@@ -0,0 +1,44 @@
+import gzip
+
+import meteostat
+
+OLD = '2020-01-01,0,1.0,,\r\n2020-01-01,1,2.0,,\r\n2020-01-02,0,3.0,,\r\n2020-01-03,0,4.0,,\r\n'
+NEW = '2020-01-01,0,1.0,,\r\n2020-01-01,1,2.5,,\r\n2020-01-03,0,4.0,,\r\n2020-01-03,1,5.0,,\r\n'
+
+def test_get_block_hashes( tmp_path ):
+    hashes = meteostat.get_block_hashes( OLD )
+
+    assert list( hashes ) == [ '2020-01-01', '2020-01-02', '2020-01-03' ]
+
+    path = tmp_path / '10637.csv.gz'
+
+    path.write_bytes( gzip.compress( OLD.encode( 'utf-8' ) ) )
+
+    assert meteostat.get_block_hashes( path ) == hashes
+
+    assert meteostat.get_block_hashes( NEW )[ '2020-01-01' ] != hashes[ '2020-01-01' ]
+
+def test_diff_snapshots():
+    response = meteostat.diff_snapshots( OLD, NEW, station = '10637', format = 'json' )
+
+    assert [ ( row[ 'change' ], row[ 'date' ], row[ 'hour' ] ) for row in response ] == [
+        ( 'update', '2020-01-01', '1' ),
+        ( 'delete', '2020-01-02', '0' ),
+        ( 'insert', '2020-01-03', '1' )
+    ]
+
+    assert response[ 0 ][ 'id' ] == '10637' and response[ 0 ][ 'temp' ] == '2.5'
+
+    response = meteostat.diff_snapshots( OLD, OLD )
+
+    assert response.splitlines() == [ 'change,id,date,hour,temp,dwpt,rhum,prcp,snow,wdir,wspd,wpgt,pres,tsun,coco' ]
+
+    response = meteostat.diff_snapshots( None, '2019,1,10.0\r\n', granularity = 'monthly' )
+
+    assert response.splitlines()[ 1 ] == 'insert,,2019,1,10.0'
+
+def test_diff_snapshots_one_row():
+    # A single row without newline is data, not a path.
+    response = meteostat.diff_snapshots( '', '2020-01-01,0,1.0,,', format = 'json' )
+
+    assert [ row[ 'change' ] for row in response ] == [ 'insert' ]
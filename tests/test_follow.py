@@ -0,0 +1,105 @@
+import gzip
+
+import meteostat
+from meteostat import follow
+
+class _Response( object ):
+    def __init__( self, status_code, rows = None ):
+        self.status_code = status_code
+        self.headers = { 'ETag': '"{}"'.format( len( rows or [] ) ) }
+        self.content = gzip.compress( '\n'.join( rows or [] ).encode( 'utf-8' ) )
+
+class _Session( object ):
+    def __init__( self ):
+        self.rows = [ '2024-01-01,{},{}.0'.format( hour, hour ) for hour in range( 10 ) ]
+        self.requests = []
+
+    def get( self, url, headers = None, timeout = None ):
+        self.requests.append( headers )
+
+        assert timeout is not None
+
+        if headers.get( 'If-None-Match' ) == '"{}"'.format( len( self.rows ) ):
+            return _Response( 304 )
+
+        return _Response( 200, self.rows )
+
+def test_follower_yields_only_new_rows():
+    follower = meteostat.follow_stations( '10637', interval = 0 )
+
+    session = follower._session = _Session()
+
+    assert follower.poll() == []
+
+    assert follower.poll() == []
+
+    assert session.requests[-1] == { 'If-None-Match': '"10"' }
+
+    session.rows.append( '2024-01-01,10,10.0' )
+
+    assert [ ( row[ 'id' ], row[ 'hour' ] ) for row in follower.poll() ] == [ ( '10637', '10' ) ]
+
+def test_follower_since():
+    follower = meteostat.Follower( [ '10637' ], since = '2024-01-01T08:00', format = 'csv' )
+
+    follower._session = _Session()
+
+    assert follower.poll() == [ '10637,2024-01-01,9,9.0' ]
+
+def test_get_key():
+    assert follow._get_key( 'hourly', '2024-01-01,9,9.0' ) == ( '2024-01-01', 9 )
+
+    assert follow._get_key( 'monthly', '2024,10,9.0' ) > follow._get_since( 'monthly', '2024-09-30' )
+
+class _FailingSession( _Session ):
+    def get( self, url, headers = None, timeout = None ):
+        if self.fail:
+            import requests
+
+            raise requests.ConnectionError( 'down' )
+
+        return _Session.get( self, url, headers = headers, timeout = timeout )
+
+def test_follower_survives_errors():
+    follower = meteostat.Follower( [ '10637' ], since = '2024-01-01T08:00', format = 'csv' )
+
+    session = follower._session = _FailingSession()
+
+    session.fail = True
+
+    assert follower.poll() == [] and '10637' in follower.errors
+
+    session.fail = False
+
+    assert follower.poll() == [ '10637,2024-01-01,9,9.0' ] and follower.errors == {}
+
+def test_follower_file_source( tmp_path ):
+    from meteostat import meteostat2
+
+    directory = tmp_path / 'hourly' / 'obs'
+
+    directory.mkdir( parents = True )
+
+    path = directory / '10637.csv.gz'
+
+    rows = [ '2024-01-01,{},{}.0'.format( hour, hour ) for hour in range( 10 ) ]
+
+    path.write_bytes( gzip.compress( '\n'.join( rows ).encode( 'utf-8' ) ) )
+
+    meteostat2.options.source = meteostat.FileSource( str( tmp_path ) )
+
+    try:
+        follower = meteostat.Follower( [ '10637', '00000' ], since = '2024-01-01T08:00', format = 'csv' )
+
+        assert follower.poll() == [ '10637,2024-01-01,9,9.0' ] and list( follower.errors ) == [ '00000' ]
+
+        assert follower.poll() == []
+
+        rows.append( '2024-01-01,10,10.0' )
+
+        path.write_bytes( gzip.compress( '\n'.join( rows ).encode( 'utf-8' ) ) )
+
+        assert follower.poll() == [ '10637,2024-01-01,10,10.0' ]
+
+    finally:
+        meteostat2.options.source = None
@@ -0,0 +1,51 @@
+import numpy as np
+
+import meteostat
+from meteostat import geo
+
+STATIONS = [
+    { 'id': 'A', 'location': { 'latitude': 50.0, 'longitude': 8.6 }, 'inventory': { 'hourly': { 'start': '1990-01-01', 'end': '2022-01-01' } } },
+    { 'id': 'B', 'location': { 'latitude': 50.1, 'longitude': 8.7 }, 'inventory': { 'hourly': { 'start': '2015-01-01', 'end': '2022-01-01' } } },
+    { 'id': 'C', 'location': { 'latitude': -33.9, 'longitude': 151.2 }, 'inventory': { 'hourly': { 'start': '1990-01-01', 'end': '2022-01-01' } } },
+    { 'id': 'D', 'location': { 'latitude': 89.5, 'longitude': -179.9 }, 'inventory': { 'hourly': { 'start': None, 'end': None } } }
+]
+
+def test_get_nearest_stations():
+    catalog = meteostat.StationCatalog.from_stations( STATIONS )
+
+    ids, distances = meteostat.get_nearest_stations( [ 50.11, -34.0, 89.9 ], [ 8.68, 151.0, 179.0 ], k = 2, catalog = catalog )
+
+    assert ids.tolist() == [ [ 'B', 'A' ], [ 'C', 'D' ], [ 'D', 'B' ] ]
+
+    assert distances[0, 0] < 2000
+
+    assert ( np.diff( distances, axis = 1 ) >= 0 ).all()
+
+def test_get_nearest_stations_filters():
+    catalog = meteostat.StationCatalog.from_stations( STATIONS )
+
+    ids, distances = meteostat.get_nearest_stations( [ 50.11 ], [ 8.68 ], k = 2, catalog = catalog,
+        inventory = 'hourly', start = '2000-01-01', end = '2020-12-31', max_distance = 100000 )
+
+    assert ids.tolist() == [ [ 'A', '' ] ]
+
+    assert distances[0, 1] == np.inf
+
+def test_get_nearest_stations_matches_brute_force():
+    rng = np.random.default_rng( 0 )
+
+    stations = [ { 'id': str( i ), 'location': { 'latitude': float( rng.uniform( -90, 90 ) ), 'longitude': float( rng.uniform( -180, 180 ) ) } } for i in range( 500 ) ]
+
+    catalog = meteostat.StationCatalog.from_stations( stations )
+
+    lat, lon = rng.uniform( -90, 90, 200 ), rng.uniform( -180, 180, 200 )
+
+    ids, distances = meteostat.get_nearest_stations( lat, lon, k = 3, catalog = catalog )
+
+    station_lat = np.radians( np.frombuffer( catalog.latitude ) )
+    station_lon = np.radians( np.frombuffer( catalog.longitude ) )
+
+    for point in range( 200 ):
+        expected = geo._haversine( np, np.radians( lat[point] ), np.radians( lon[point] ), station_lat, station_lon )
+
+        assert ids[point].tolist() == [ str( i ) for i in np.argsort( expected )[:3] ]
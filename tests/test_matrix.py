@@ -0,0 +1,33 @@
+import datetime
+
+import numpy as np
+
+import meteostat
+from meteostat import matrix
+
+def test_matrix_steps():
+    start = datetime.datetime(2019, 12, 31, 22)
+
+    for granularity, when in (
+        ('hourly', datetime.datetime(2020, 1, 2, 3)),
+        ('daily', datetime.datetime(2020, 3, 1)),
+        ('monthly', datetime.datetime(2021, 2, 1))
+    ):
+        origin = start if granularity == 'hourly' else start.replace(hour=0)
+
+        if granularity == 'monthly':
+            origin = origin.replace(day=1)
+
+        step = matrix._get_step(origin, granularity, when)
+
+        assert matrix._get_timestamp(origin, granularity, step) == when
+
+def test_build_station_matrix():
+    data = meteostat.build_station_matrix(
+        stations = [ '10637', '47423' ], columns = 'temp',
+        start = '2020-01-01', end = '2020-12-31 23:00'
+    )
+
+    assert data.values.shape == ( 1, 2, 366 * 24 )
+
+    assert np.isfinite( data['temp'] ).any()
@@ -0,0 +1,54 @@
+import time
+import threading
+
+import meteostat
+
+def test_memory_budget_accounting():
+    budget = meteostat.MemoryBudget( limit = 100 )
+
+    budget.add( 'download', 60 )
+    budget.add( 'parse', 50 )
+    budget.add( 'download', -60 )
+
+    assert budget.total == 50 and budget.peak == 110
+
+    assert not budget.exceeded
+
+    budget.set( 'sink', 70 )
+
+    assert budget.exceeded
+
+    assert meteostat.get_metrics()[ 'memory.sink.bytes' ] == 70
+
+def test_memory_budget_throttles():
+    budget = meteostat.MemoryBudget( limit = 10 )
+
+    budget.add( 'parse', 20 )
+
+    released = []
+
+    def drain():
+        time.sleep( 0.2 )
+
+        released.append( time.monotonic() )
+
+        budget.add( 'parse', -20 )
+
+    threading.Thread( target = drain ).start()
+
+    budget.wait_for_room()
+
+    assert released and budget.total == 0
+
+def test_pipeline_with_budget():
+    budget = meteostat.MemoryBudget( limit = 1000 )
+
+    pipeline = meteostat.Pipeline( [ ( 'download', lambda item: b'x' * 100, 4 ), ( 'parse', lambda item: item.decode(), 2 ) ], budget = budget )
+
+    assert len( list( pipeline.run( range( 50 ) ) ) ) == 50
+
+    # Items admitted before the limit was reached still complete.
+    assert budget.total == 0 and 0 < budget.peak <= 1000 + pipeline.max_in_flight * 200
+
+def test_sample_memory():
+    assert meteostat.sample_memory().get( 'memory.peak_rss_bytes', 1 ) > 0
@@ -264,4 +264,253 @@ def test_get_normals_all_stations():
         assert False
 
     else:
-        assert True
\ No newline at end of file
+        assert True
+
+def test_spooled_result():
+    buffer = meteostat.meteostat2._SpillBuffer( threshold = 10 )
+
+    buffer.write( 'id,date\r\n' )
+
+    assert buffer.file is None
+
+    buffer.write( '10637,2020-01-01\r\n' )
+
+    assert buffer.file is not None
+
+    with meteostat.SpooledResult( buffer.file, format = 'json', fieldnames = ( 'id', 'date' ) ) as result:
+        assert list( result ) == [ { 'id': '10637', 'date': '2020-01-01' } ]
+
+        assert ''.join( result.iter_chunks( 4 ) ) == 'id,date\r\n10637,2020-01-01\r\n'
+
+def test_spooled_result_read():
+    buffer = meteostat.meteostat2._SpillBuffer( threshold = 10 )
+
+    buffer.write( 'id,date\r\n10637,2020-01-01\r\n' )
+
+    with meteostat.SpooledResult( buffer.file, format = 'csv', fieldnames = ( 'id', 'date' ) ) as result:
+        assert result.read( 9 ) == 'id,date\r\n'
+
+        assert result.read() == '10637,2020-01-01\r\n'
+
+def test_get_hourly_obs_all_stations_spill():
+    try:
+        data = meteostat.get_hourly_obs_all_stations ( format = 'csv', memory_limit = 1 << 20 )
+
+        rows = sum( 1 for line in data )
+
+        data.close()
+
+    except:
+        assert False
+
+    else:
+        assert True
+
+def test_get_all_stations_skips_failing_stations():
+    import gzip
+
+    import requests
+
+    def fetch_payload( url = None, station = None, **kwargs ):
+        if station == '10637':
+            raise requests.exceptions.ConnectionError( 'reset' )
+
+        if station == '10638':
+            return b'not gzip'
+
+        return gzip.compress( '2020-01-01,12,1.5\n'.encode( 'utf-8' ) )
+
+    get_stations_full = meteostat.meteostat2.get_stations_full
+    fetch = meteostat.meteostat2._fetch_payload
+
+    meteostat.meteostat2.get_stations_full = lambda **kwargs: [ { 'id': '10635' }, { 'id': '10637' }, { 'id': '10638' }, { 'id': '10639' } ]
+    meteostat.meteostat2._fetch_payload = fetch_payload
+
+    try:
+        data = meteostat.meteostat2._get_all_stations( action = 'hourly/full', fieldnames = ( 'id', 'date', 'hour', 'temp' ) )
+
+    finally:
+        meteostat.meteostat2.get_stations_full = get_stations_full
+        meteostat.meteostat2._fetch_payload = fetch
+
+    assert data == 'id,date,hour,temp\r\n10635,2020-01-01,12,1.5\r\n10639,2020-01-01,12,1.5\r\n'
+
+def test_download_payload_timeout():
+    import requests
+
+    calls = []
+
+    def get( url, **kwargs ):
+        calls.append( kwargs[ 'timeout' ] )
+
+        raise requests.exceptions.Timeout( url )
+
+    get_ = requests.get
+
+    requests.get = get
+
+    try:
+        for timeout in ( None, 5 ):
+            try:
+                meteostat.meteostat2._download_payload( url = 'https://example.invalid/10637.csv.gz', station = '10637', timeout = timeout )
+
+            except requests.exceptions.Timeout:
+                assert True
+
+            else:
+                assert False
+
+    finally:
+        requests.get = get_
+
+    assert calls == [ meteostat.meteostat2.options.timeout, 5 ]
+
+def test_write_cache_file( tmp_path ):
+    import json
+    import os
+
+    path = str( tmp_path / 'hourly' / 'full' / '10637.csv.gz' )
+
+    for payload in ( b'first', b'second' ):
+        meteostat.meteostat2._write_cache_file( path, payload, { 'etag': '"abc"' } )
+
+    with open( path, 'rb' ) as file:
+        assert file.read() == b'second'
+
+    with open( path + '.meta', encoding = 'utf-8' ) as file:
+        assert json.load( file ) == { 'etag': '"abc"' }
+
+    assert sorted( os.listdir( os.path.dirname( path ) ) ) == [ '10637.csv.gz', '10637.csv.gz.meta' ]
+
+def test_single_flight():
+    import threading
+    import time
+
+    flight = meteostat.meteostat2._SingleFlight()
+
+    calls = []
+
+    def load():
+        calls.append( 1 )
+
+        time.sleep( 0.2 )
+
+        return [ 'data' ]
+
+    results = []
+
+    threads = [ threading.Thread( target = lambda: results.append( flight.do( 'key', load ) ) ) for _ in range( 8 ) ]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len( calls ) == 1
+
+    assert all( result is results[0] for result in results )
+
+    assert flight.do( 'key', load ) == [ 'data' ]
+
+    assert len( calls ) == 2
+
+def test_single_flight_errors_are_not_shared_later():
+    flight = meteostat.meteostat2._SingleFlight()
+
+    def fail():
+        raise ValueError( 'boom' )
+
+    try:
+        flight.do( 'key', fail )
+
+    except ValueError:
+        assert True
+
+    else:
+        assert False
+
+    assert flight.do( 'key', lambda: 'ok' ) == 'ok'
+
+def test_parsed_cache_path():
+    meteostat.meteostat2.options.parsed_cache_dir = '/tmp'
+
+    try:
+        path = meteostat.meteostat2._get_parsed_cache_path( payload = b'a', fieldnames = ( 'id', 'date' ), station = '10637', format = 'json' )
+
+        assert path == meteostat.meteostat2._get_parsed_cache_path( payload = b'a', fieldnames = ( 'id', 'date' ), station = '10637', format = 'json' )
+
+        assert path != meteostat.meteostat2._get_parsed_cache_path( payload = b'b', fieldnames = ( 'id', 'date' ), station = '10637', format = 'json' )
+
+        assert path != meteostat.meteostat2._get_parsed_cache_path( payload = b'a', fieldnames = ( 'id', 'date' ), station = '10637', format = 'csv' )
+
+    finally:
+        meteostat.meteostat2.options.parsed_cache_dir = None
+
+def test_get_hourly_full_station_parsed_cache( tmp_path ):
+    meteostat.meteostat2.options.parsed_cache_dir = str( tmp_path )
+
+    try:
+        first = meteostat.get_hourly_full_station( '10637', format = 'json' )
+
+        second = meteostat.get_hourly_full_station( '10637', format = 'json' )
+
+    finally:
+        meteostat.meteostat2.options.parsed_cache_dir = None
+
+    assert first == second
+
+    assert len( list( tmp_path.iterdir() ) ) == 1
+
+def test_parsed_cache_eviction( tmp_path ):
+    import gzip
+
+    source = tmp_path / 'source'
+
+    ( source / 'daily' / 'full' ).mkdir( parents = True )
+
+    path = source / 'daily' / 'full' / '10637.csv.gz'
+
+    meteostat.meteostat2.options.parsed_cache_dir = str( tmp_path / 'parsed' )
+    meteostat.meteostat2.options.source = meteostat.FileSource( str( source ) )
+
+    try:
+        hits = meteostat.get_metrics().get( 'parsed_cache.hits', 0 )
+
+        for days in ( 1, 2, 2 ):
+            path.write_bytes( gzip.compress( ''.join( '2020-01-0{},1.0\r\n'.format( day + 1 ) for day in range( days ) ).encode( 'utf-8' ) ) )
+
+            response = meteostat.get_daily_full_station( '10637', format = 'json' )
+
+        url = meteostat.meteostat2._get_station_url( action = 'daily/full/', station = '10637' )
+
+        assert meteostat.meteostat2._cache.hits[ url ] >= 3
+
+    finally:
+        meteostat.meteostat2.options.parsed_cache_dir = None
+        meteostat.meteostat2.options.source = None
+
+    assert len( response ) == 2
+
+    assert meteostat.get_metrics()[ 'parsed_cache.hits' ] == hits + 1
+
+    # The entry of the first payload was replaced.
+    slots = list( ( tmp_path / 'parsed' ).iterdir() )
+
+    assert len( slots ) == 1 and len( list( slots[ 0 ].iterdir() ) ) == 1
+
+def test_get_bundle_dataset():
+    assert meteostat.meteostat2._get_bundle_dataset( 'hourly/full' )[:2] == ( 'hourly_full', 'hourly/full/' )
+
+    assert meteostat.meteostat2._get_bundle_dataset( ( 'daily', 'obs' ) )[0] == 'daily_obs'
+
+    assert meteostat.meteostat2._get_bundle_dataset( 'normals' )[:2] == ( 'normals', 'normals/' )
+
+def test_get_bundle():
+    response = meteostat.get_bundle( stations = [ '10637', 47423 ], datasets = [ 'daily_full', 'normals' ], format = 'json' )
+
+    assert list( response ) == [ 'daily_full', 'normals' ]
+
+    assert list( response[ 'daily_full' ] ) == [ '10637', '47423' ]
+
+    assert response[ 'daily_full' ][ '10637' ] == meteostat.get_daily_full_station( '10637', format = 'json' )
@@ -0,0 +1,52 @@
+import gzip
+import os
+import urllib.request
+import urllib.error
+
+from meteostat import meteostat2
+from meteostat.mirror import MirrorServer
+
+def _get( url, headers = {} ):
+    try:
+        with urllib.request.urlopen( urllib.request.Request( url, headers = headers ) ) as response:
+            return response.status, response.read(), response.headers
+
+    except urllib.error.HTTPError as error:
+        return error.code, b'', error.headers
+
+def test_mirror_serves_cache_with_validators( tmp_path ):
+    payload = gzip.compress( b'2020-01-01,1.0\n' )
+
+    path = os.path.join( str( tmp_path ), 'daily', 'full', '10637.csv.gz' )
+
+    meteostat2._write_cache_file( path, payload, { 'etag': '"abc"', 'last_modified': 'Wed, 01 Jan 2020 00:00:00 GMT' } )
+
+    options = meteostat2._get_options()
+
+    previous = options.cache_dir
+
+    try:
+        with MirrorServer( cache_dir = str( tmp_path ), host = '127.0.0.1', port = 0, max_age = 3600 ) as server:
+            url = 'http://127.0.0.1:{}/v2/daily/full/10637.csv.gz'.format( server.address[1] )
+
+            status, body, headers = _get( url )
+
+            assert status == 200 and body == payload
+
+            assert headers['ETag'] == '"abc"'
+
+            assert _get( url, { 'If-None-Match': '"abc"' } )[0] == 304
+
+            assert _get( url, { 'If-Modified-Since': 'Thu, 02 Jan 2020 00:00:00 GMT' } )[0] == 304
+
+            assert _get( 'http://127.0.0.1:{}/other/10637.csv.gz'.format( server.address[1] ) )[0] == 404
+
+            assert _get( url + '.meta' )[0] == 404
+
+            assert _get( url[:-3] )[0] == 404
+
+            # The process options are left alone.
+            assert options.cache_dir == previous
+
+    finally:
+        options.cache_dir = previous
@@ -0,0 +1,59 @@
+import os
+import datetime
+
+import meteostat
+from meteostat import offsets
+
+def _get_lines( days ):
+    start = datetime.date( 2019, 1, 1 )
+
+    return [ '{},{},{}.0\n'.format( start + datetime.timedelta( day ), hour, hour ) for day in range( days ) for hour in range( 24 ) ]
+
+def _select( lines, start, end ):
+    return ''.join( line for line in lines if start <= int( line[:10].replace( '-', '' ) ) <= end )
+
+def test_read_range( tmp_path ):
+    lines = _get_lines( 400 )
+
+    path = str( tmp_path / '10637.csv' )
+
+    with open( path, 'w' ) as file:
+        file.write( ''.join( lines ) )
+
+    assert meteostat.read_range( path, start = 20190701, end = 20190731 ) == _select( lines, 20190701, 20190731 )
+
+    assert meteostat.read_range( path, start = 20180101, end = 20190102 ) == _select( lines, 20180101, 20190102 )
+
+    assert meteostat.read_range( path, start = 20200101 ) == _select( lines, 20200101, 99999999 )
+
+    assert meteostat.read_range( path, start = 20300101 ) == ''
+
+    assert os.path.exists( path + offsets.INDEX_SUFFIX )
+
+    assert sorted( os.listdir( str( tmp_path ) ) ) == [ '10637.csv', '10637.csv' + offsets.INDEX_SUFFIX ]
+
+def test_build_offset_index_is_incremental( tmp_path ):
+    lines = _get_lines( 400 )
+
+    path = str( tmp_path / '10637.csv' )
+
+    with open( path, 'w' ) as file:
+        file.write( ''.join( lines[:5000] ) )
+
+    meteostat.build_offset_index( path )
+
+    with open( path, 'a' ) as file:
+        file.write( ''.join( lines[5000:] ) )
+
+    keys, positions = meteostat.build_offset_index( path )
+
+    os.remove( path + offsets.INDEX_SUFFIX )
+
+    assert ( keys, positions ) == meteostat.build_offset_index( path )
+
+    assert meteostat.read_range( path, start = 20200115, end = 20200116 ) == _select( lines, 20200115, 20200116 )
+
+def test_monthly_keys():
+    assert offsets._get_key( b'2019,7,10.0' ) == 20190701
+
+    assert offsets._get_key( b'2019-07-04,13,10.0' ) == 20190704
@@ -0,0 +1,25 @@
+import numpy as np
+
+import meteostat
+from meteostat import columnar
+from meteostat import parquet
+
+def test_get_year_slices():
+    data = '2019-12-31,23,1.0\r\n2020-01-01,0,2.0\r\n2020-06-01,0,3.0\r\n2021-01-01,0,4.0\r\n'
+
+    table = columnar.to_arrow( columnar._parse_columns( data = data, fieldnames = ( 'id', 'date', 'hour', 'temp' ), station = '10637' ) )
+
+    assert parquet._get_year_slices( np, table, 'hourly' ) == [ ( 2019, 0, 1 ), ( 2020, 1, 2 ), ( 2021, 3, 1 ) ]
+
+def test_export_parquet( tmp_path ):
+    import pyarrow.dataset
+
+    paths = meteostat.export_parquet( str( tmp_path ), 'daily', 'full', stations = [ '10637' ] )
+
+    assert paths and all( '/id=10637/year=' in path for path in paths )
+
+    table = pyarrow.dataset.dataset( str( tmp_path ), format = 'parquet', partitioning = 'hive' ).to_table()
+
+    assert table.num_rows > 0
+
+    assert 'tavg' in table.column_names
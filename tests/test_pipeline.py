@@ -0,0 +1,55 @@
+import time
+import random
+import threading
+
+import meteostat
+
+def test_pipeline_order_and_stages():
+    pipeline = meteostat.Pipeline( [
+        ( 'download', lambda item: ( time.sleep( random.random() / 500 ), item )[1], 4 ),
+        ( 'parse', lambda item: item * 2, 2 )
+    ], queue_size = 2 )
+
+    assert list( pipeline.run( range( 100 ) ) ) == [ item * 2 for item in range( 100 ) ]
+
+    assert meteostat.get_metrics()[ 'pipeline.parse.items' ] >= 100
+
+def test_pipeline_backpressure():
+    lock = threading.Lock()
+    admitted = [ 0 ]
+
+    def source():
+        for item in range( 50 ):
+            with lock:
+                admitted[0] += 1
+
+            yield item
+
+    pipeline = meteostat.Pipeline( [ ( 'identity', lambda item: item, 2 ) ], queue_size = 1, max_in_flight = 3 )
+
+    results = pipeline.run( source() )
+
+    assert next( results ) == 0
+
+    time.sleep( 0.3 )
+
+    # Consumed, in flight and the one blocked on a free slot.
+    assert admitted[0] <= 1 + 3 + 1
+
+    assert list( results ) == list( range( 1, 50 ) )
+
+def test_pipeline_errors():
+    def parse( item ):
+        if item == 7:
+            raise ValueError( 'bad row' )
+
+        return item
+
+    try:
+        list( meteostat.Pipeline( [ ( 'parse', parse, 3 ) ] ).run( range( 20 ) ) )
+
+    except ValueError:
+        assert True
+
+    else:
+        assert False
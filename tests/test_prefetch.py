@@ -0,0 +1,52 @@
+import meteostat
+from meteostat import meteostat2
+
+def test_response_cache():
+    cache = meteostat2._ResponseCache()
+
+    cache.put( 'a', 'x' * 10, max_size = 15 )
+    cache.put( 'b', 'y' * 10, max_size = 15 )
+
+    assert cache.get( 'a', ttl = 60 ) is None
+
+    assert cache.get( 'b', ttl = 60 ) == 'y' * 10
+
+    assert cache.get( 'b', ttl = None ) is None
+
+def test_response_cache_drops_evicted_hits():
+    cache = meteostat2._ResponseCache()
+
+    for url in ( 'a', 'b' ):
+        cache.record( url )
+
+        cache.put( url, 'x' * 10, max_size = 15 )
+
+    assert cache.hits == { 'b': 1 }
+
+def test_prefetch_hot_urls():
+    meteostat.clear_cache()
+
+    for url, count in ( ( 'e/hourly/full/1.csv.gz', 5 ), ( 'e/hourly/full/2.csv.gz', 3 ), ( 'e/daily/full/1.csv.gz', 1 ) ):
+        for _ in range( count ):
+            meteostat2._cache.record( url )
+
+    scheduler = meteostat.PrefetchScheduler( top = 1 )
+
+    assert scheduler._get_hot_urls() == [ 'e/hourly/full/1.csv.gz', 'e/daily/full/1.csv.gz' ]
+
+    assert meteostat2._cache.hits['e/hourly/full/1.csv.gz'] == 2
+
+    # Decayed to zero, forgotten.
+    assert 'e/daily/full/1.csv.gz' not in meteostat2._cache.hits
+
+    meteostat.clear_cache()
+
+def test_prefetch_requires_cache():
+    try:
+        meteostat.PrefetchScheduler().run_once()
+
+    except ValueError:
+        assert True
+
+    else:
+        assert False
@@ -0,0 +1,85 @@
+import meteostat
+from meteostat import query
+
+DATA = '\n'.join( [
+    '2020-01-01,22,10.5,,80',
+    '2020-01-01,23,31.0,,40',
+    '2020-01-02,0,32.5,,',
+    '2020-01-02,1,,,50',
+    '2020-01-02,2,35.0,,30',
+    '2020-01-03,0,36.0,,20'
+] ) + '\n'
+
+def _plan( **kwargs ):
+    arguments = dict( granularity = 'hourly', variant = 'full', stations = [ '10637' ], start = None, end = None, columns = None, where = None )
+
+    arguments.update( kwargs )
+
+    return query.Query( **arguments )
+
+def test_query_projection_and_predicates():
+    plan = _plan( columns = [ 'id', 'hour', 'temp' ], where = [ 'temp > 30', ( 'rhum', '<', 45 ) ] )
+
+    assert list( plan.rows( '10637', DATA ) ) == [ [ '10637', '23', '31.0' ], [ '10637', '2', '35.0' ], [ '10637', '0', '36.0' ] ]
+
+def test_query_time_range():
+    plan = _plan( start = '2020-01-01 23:00', end = '2020-01-02 01:00', columns = [ 'date', 'hour' ] )
+
+    assert plan._seek( DATA ) == DATA.index( '2020-01-01,23' )
+
+    assert list( plan.rows( '10637', DATA ) ) == [ [ '2020-01-01', '23' ], [ '2020-01-02', '0' ], [ '2020-01-02', '1' ] ]
+
+def test_query_rejects_unknown_columns():
+    try:
+        _plan( columns = [ 'tavg' ] )
+
+    except ValueError:
+        assert True
+
+    else:
+        assert False
+
+def test_fetch():
+    data = meteostat.fetch( 'daily', 'full', stations = '10637', start = '2020-01-01', end = '2020-01-31',
+        columns = [ 'date', 'tmax' ], where = 'tmax > 0', format = 'json' )
+
+    assert all( row['date'].startswith( '2020-01' ) for row in data )
+
+def test_query_partial_end_bounds():
+    # A date without time ends with its last hour.
+    plan = _plan( start = '2020-01-02', end = '2020-01-02', columns = [ 'hour' ] )
+
+    assert list( plan.rows( '10637', DATA ) ) == [ [ '0' ], [ '1' ], [ '2' ] ]
+
+    assert _plan( end = '2020-02' ).end == ( '2020-02-29', 23 )
+
+    assert _plan( granularity = 'daily', end = '2019-07' ).end == ( '2019-07-31', )
+
+    assert _plan( granularity = 'daily', end = '2019-12' ).end == ( '2019-12-31', )
+
+    assert _plan( granularity = 'monthly', end = '2019' ).end == ( 2019, 12 )
+
+    assert _plan( granularity = 'monthly', start = '2019', end = '2019-07' ).start == ( 2019, 1 )
+
+    assert _plan( granularity = 'daily', end = '2019-07' ).get_days() == ( None, 20190731 )
+
+def test_query_plan_monthly_inventory():
+    from meteostat import meteostat2
+
+    stations = [
+        { 'id': '10637', 'inventory': { 'monthly': { 'start': 1934, 'end': 2022 } } },
+        { 'id': '10638', 'inventory': { 'monthly': { 'start': 2021, 'end': 2022 } } },
+        { 'id': 'D1424', 'inventory': { 'monthly': { 'start': None, 'end': None } } }
+    ]
+
+    get_stations_full = meteostat2.get_stations_full
+
+    meteostat2.get_stations_full = lambda **kwargs: stations
+
+    try:
+        assert _plan( granularity = 'monthly', stations = None, start = '2019', end = '2020-06' ).stations == [ '10637' ]
+
+        assert _plan( granularity = 'monthly', stations = None, start = '2021-03' ).stations == [ '10637', '10638' ]
+
+    finally:
+        meteostat2.get_stations_full = get_stations_full
@@ -0,0 +1,43 @@
+import meteostat
+from meteostat import sharding
+
+def test_shard_stations_partitions():
+    ids = [ str( i ) for i in range( 1000 ) ]
+
+    shards = [ meteostat.shard_stations( ids, shard_index = index, shard_count = 3 ) for index in range( 3 ) ]
+
+    assert sorted( sum( shards, [] ) ) == sorted( ids )
+
+    assert shards[1] == meteostat.shard_stations( list( reversed( ids ) ), shard_index = 1, shard_count = 3 )[::-1]
+
+def test_shard_stations_balance():
+    records = [ { 'id': str( i ), 'inventory': { 'daily': { 'start': '{}-01-01'.format( 1900 + i % 100 ), 'end': '2020-12-31' } } } for i in range( 400 ) ]
+
+    shards = [ meteostat.shard_stations( records, shard_index = index, shard_count = 4, balance = True, granularity = 'daily' ) for index in range( 4 ) ]
+
+    loads = [ sum( sharding._get_weight( record, 'daily' ) for record in shard ) for shard in shards ]
+
+    assert sum( len( shard ) for shard in shards ) == 400
+
+    assert max( loads ) - min( loads ) <= 121
+
+def test_shard_stations_rejects_bad_index():
+    try:
+        meteostat.shard_stations( [ '10637' ], shard_index = 2, shard_count = 2 )
+
+    except ValueError:
+        assert True
+
+    else:
+        assert False
+
+def test_all_stations_rejects_partial_shard_arguments():
+    for arguments in ( { 'shard_index': 1 }, { 'shard_count': 4 }, { 'shard_index': 4, 'shard_count': 4 } ):
+        try:
+            meteostat.get_daily_full_all_stations( format = 'csv', **arguments )
+
+        except ValueError:
+            assert True
+
+        else:
+            assert False
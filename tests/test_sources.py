@@ -0,0 +1,84 @@
+import gzip
+
+import meteostat
+from meteostat import meteostat2
+
+def _write_tree( root ):
+    directory = root / 'daily' / 'full'
+
+    directory.mkdir( parents = True )
+
+    data = ''.join( '2020-01-{:02d},{}.0\r\n'.format( day, day ) for day in range( 1, 29 ) )
+
+    ( directory / '10637.csv.gz' ).write_bytes( gzip.compress( data.encode( 'utf-8' ) ) )
+
+    return data
+
+def test_file_source_payload( tmp_path ):
+    data = _write_tree( tmp_path )
+
+    url = 'file://{}/daily/full/10637.csv.gz'.format( tmp_path )
+
+    for threshold in ( None, 1 ):
+        source = meteostat.FileSource( str( tmp_path ), mmap_threshold = threshold )
+
+        assert gzip.decompress( source.get_payload( url ) ).decode( 'utf-8' ) == data
+
+    assert list( source.iter_lines( url ) ) == data.splitlines()
+
+    assert source.get_payload( 'file://{}/daily/full/00000.csv.gz'.format( tmp_path ) ) is None
+
+    try:
+        source.get_path( 'file://{}/../secret.csv.gz'.format( tmp_path ) )
+
+    except ValueError:
+        assert True
+
+    else:
+        assert False
+
+def test_file_endpoint( tmp_path ):
+    data = _write_tree( tmp_path )
+
+    endpoint = meteostat2.options.endpoint
+
+    meteostat2.options.endpoint = 'file://{}/'.format( tmp_path )
+
+    try:
+        response = meteostat.get_daily_full_station( station = '10637', format = 'json' )
+
+    finally:
+        meteostat2.options.endpoint = endpoint
+
+    assert len( response ) == len( data.splitlines() )
+
+    assert response[ 0 ][ 'id' ] == '10637' and response[ 0 ][ 'date' ] == '2020-01-01'
+
+def test_http_source_option():
+    endpoint = meteostat2.options.endpoint
+
+    meteostat2.options.endpoint = 'http://127.0.0.1:8765/v2/'
+    meteostat2.options.source = meteostat.HTTPSource()
+
+    try:
+        assert meteostat2._get_endpoint_url() == 'http://127.0.0.1:8765/v2/'
+
+        assert meteostat2._get_source() is meteostat2.options.source
+
+    finally:
+        meteostat2.options.endpoint = endpoint
+        meteostat2.options.source = None
+
+def test_source_abstract():
+    class Incomplete( meteostat.Source ):
+        def get_payload( self, url = None, station = None, **kwargs ):
+            return None
+
+    try:
+        Incomplete()
+
+    except TypeError:
+        assert True
+
+    else:
+        assert False
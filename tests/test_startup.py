@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+def test_import_is_lazy():
+    code = 'import sys, meteostat; print(" ".join(sorted(sys.modules)))'
+
+    result = subprocess.run( [ sys.executable, '-c', code ], capture_output = True, text = True, check = True )
+
+    loaded = set( result.stdout.split() )
+
+    for name in ( 'requests', 'csv', 'json', 'gzip', 'numpy' ):
+        assert name not in loaded
+
+def test_cli_help():
+    result = subprocess.run( [ sys.executable, '-m', 'meteostat', '--help' ], capture_output = True, text = True )
+
+    assert result.returncode == 0
+
+    assert 'stations' in result.stdout
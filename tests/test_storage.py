@@ -0,0 +1,42 @@
+import meteostat
+from meteostat import storage
+
+def test_upsert_only_changes_rows():
+    store = meteostat.SQLiteStore()
+
+    table = store.get_table( 'daily', 'full' )
+
+    statement = store._get_upsert( table, 'daily', meteostat.meteostat2.DAILY_CSV_DATA_HEADER )
+
+    data = '2020-01-01,1.5,,2.0\r\n2020-01-02,2.5,,3.0'
+
+    store.connection.executemany( statement, storage._get_rows( '10637', data, 12, None, 'daily' ) )
+
+    before = store.connection.total_changes
+
+    store.connection.executemany( statement, storage._get_rows( '10637', data.replace( '2.5', '4.5' ), 12, None, 'daily' ) )
+
+    assert store.connection.total_changes - before == 1
+
+    assert store.query( 'daily', 'full', '10637', start = '2020-01-02', columns = [ 'date', 'tavg', 'tmin' ], format = 'json' ) == [
+        { 'date': '2020-01-02', 'tavg': 4.5, 'tmin': None }
+    ]
+
+    assert store.stations( 'daily', 'full' ) == [ '10637' ]
+
+def test_get_rows_since():
+    data = '2019,12,1.0\r\n2020,1,2.0\r\n2020,11,3.0'
+
+    rows = list( storage._get_rows( '10637', data, 4, ( 2020, 1 ), 'monthly' ) )
+
+    assert [ row[1:3] for row in rows ] == [ [ '2020', '1' ], [ '2020', '11' ] ]
+
+def test_load():
+    with meteostat.SQLiteStore() as store:
+        assert store.load( 'daily', 'full', '10637' ) > 0
+
+        assert store.load( 'daily', 'full', '10637' ) == 0
+
+        response = store.query( 'daily', 'full', '10637', start = '2020-01-01', end = '2020-01-31', format = 'json' )
+
+        assert len( response ) == 31
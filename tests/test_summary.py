@@ -0,0 +1,60 @@
+import math
+import random
+import statistics
+
+import meteostat
+
+def test_accumulator():
+    values = [ random.gauss( 1e6, 3 ) for _ in range( 1000 ) ]
+
+    accumulator = meteostat.Accumulator()
+
+    for value in values:
+        accumulator.add( value )
+
+    accumulator.add( None )
+
+    assert accumulator.count == 1000 and accumulator.missing == 1
+
+    assert math.isclose( accumulator.mean, statistics.fmean( values ), rel_tol = 1e-12 )
+
+    assert math.isclose( accumulator.std, statistics.stdev( values ), rel_tol = 1e-9 )
+
+    assert accumulator.min == min( values ) and accumulator.max == max( values )
+
+def test_accumulator_merge():
+    values = [ random.random() for _ in range( 500 ) ]
+
+    whole, first, second = meteostat.Accumulator(), meteostat.Accumulator(), meteostat.Accumulator()
+
+    for position, value in enumerate( values ):
+        whole.add( value )
+
+        ( first if position < 123 else second ).add( value )
+
+    first.merge( second )
+
+    assert first.count == whole.count
+
+    assert math.isclose( first.mean, whole.mean ) and math.isclose( first.variance, whole.variance )
+
+def test_station_summary_merge():
+    first, second = meteostat.StationSummary( ( 'temp', ) ), meteostat.StationSummary( ( 'temp', ) )
+
+    first.get( '10637' )[ 'temp' ].add( 1.0 )
+    second.get( '10637' )[ 'temp' ].add( 3.0 )
+    second.get( '47423' )[ 'temp' ].add( None )
+
+    first.merge( second )
+
+    assert first.to_json() == [
+        { 'id': '10637', 'variable': 'temp', 'count': 2, 'missing': 0, 'missing_ratio': 0.0, 'min': 1.0, 'max': 3.0, 'mean': 2.0, 'std': math.sqrt( 2 ) },
+        { 'id': '47423', 'variable': 'temp', 'count': 0, 'missing': 1, 'missing_ratio': 1.0, 'min': None, 'max': None, 'mean': None, 'std': None }
+    ]
+
+def test_summarize_all_stations():
+    response = meteostat.summarize_all_stations( 'daily', 'full', variables = ( 'tavg', 'prcp' ), stations = [ '10637' ], format = 'json' )
+
+    assert [ row[ 'variable' ] for row in response ] == [ 'tavg', 'prcp' ]
+
+    assert response[0][ 'count' ] > 0